@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 from pathlib import Path
+import json
 import os
 from dotenv import load_dotenv
 
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "news",
     "multi_agent_systems",
 ]
@@ -150,3 +152,79 @@ STORAGES = {
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Agent pipelines
+# Shared article prefix caching: "gemini" (provider cache, billed per stored token-hour),
+# "local" (in-memory stand-in) or "off"; opt in per environment
+LLM_CONTEXT_CACHE = os.getenv("LLM_CONTEXT_CACHE", "off")
+LLM_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("LLM_CONTEXT_CACHE_TTL_SECONDS", "900"))
+LLM_CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("LLM_CONTEXT_CACHE_MIN_TOKENS", "4096"))
+
+# Model call governor (per process; set LLM_GOVERNOR_CLUSTER=true to share the limits through the database)
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "120"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))
+LLM_GOVERNOR_CLUSTER = os.getenv("LLM_GOVERNOR_CLUSTER", "False").lower() == "true"
+
+# Model backend: "gemini" (live), "record" (live + write recordings), "replay" (read recordings) or "fake" (synthetic)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+LLM_FAKE_LATENCY_SECONDS = float(os.getenv("LLM_FAKE_LATENCY_SECONDS", "0"))
+LLM_RECORDINGS_PATH = os.getenv("LLM_RECORDINGS_PATH", str(BASE_DIR / "recordings" / "llm_sessions.jsonl"))
+
+# Per-call deadlines (seconds) by agent name, e.g. {"forex_analysis_agent": 45}; calls past their p90 are hedged
+LLM_DEFAULT_DEADLINE_SECONDS = float(os.getenv("LLM_DEFAULT_DEADLINE_SECONDS", "120"))
+LLM_AGENT_DEADLINES = json.loads(os.getenv("LLM_AGENT_DEADLINES", "{}"))
+# Overall ST-MAS deadline: topics still running after it are saved as incomplete
+ST_MAS_DEADLINE_SECONDS = float(os.getenv("ST_MAS_DEADLINE_SECONDS", "180"))
+# ST-MAS fan-out: "per_topic" (one call per topic), "grouped" (ST_MAS_GROUP_SIZE topics per call) or "all_in_one"
+ST_MAS_FAN_OUT = os.getenv("ST_MAS_FAN_OUT", "per_topic")
+ST_MAS_GROUP_SIZE = int(os.getenv("ST_MAS_GROUP_SIZE", "3"))
+# ST-MAS pipelines kept built, one per distinct topic set and prompt versions
+ST_MAS_AGENT_CACHE_SIZE = int(os.getenv("ST_MAS_AGENT_CACHE_SIZE", "32"))
+
+# Model tiers, fastest first. Agents use their tier from LLM_AGENT_TIERS (else LLM_DEFAULT_TIER) and
+# drop to a faster tier in a critical window or when the run is behind its latency budget
+LLM_MODEL_TIERS = json.loads(os.getenv(
+    "LLM_MODEL_TIERS",
+    '{"fast": "gemini-2.5-flash-lite", "standard": "gemini-3-flash-preview", "quality": "gemini-3-pro-preview"}'
+))
+LLM_DEFAULT_TIER = os.getenv("LLM_DEFAULT_TIER", "standard")
+LLM_AGENT_TIERS = json.loads(os.getenv(
+    "LLM_AGENT_TIERS",
+    '{"information_extraction_agent": "fast", "flash_summary_agent": "fast"}'
+))
+LLM_LATENCY_BUDGET_SECONDS = float(os.getenv("LLM_LATENCY_BUDGET_SECONDS", "120"))
+
+# Flash (headline-only) provisional summaries around each FOMC decision
+FOMC_FLASH_MINUTES_BEFORE = int(os.getenv("FOMC_FLASH_MINUTES_BEFORE", "5"))
+FOMC_FLASH_MINUTES_AFTER = int(os.getenv("FOMC_FLASH_MINUTES_AFTER", "60"))
+
+# Burst polling of Event Registry around each FOMC decision (minimal payload, watermark deltas)
+FOMC_BURST_MINUTES_BEFORE = int(os.getenv("FOMC_BURST_MINUTES_BEFORE", "5"))
+FOMC_BURST_MINUTES_AFTER = int(os.getenv("FOMC_BURST_MINUTES_AFTER", "30"))
+FOMC_BURST_MIN_INTERVAL_SECONDS = float(os.getenv("FOMC_BURST_MIN_INTERVAL_SECONDS", "5"))
+FOMC_BURST_MAX_INTERVAL_SECONDS = float(os.getenv("FOMC_BURST_MAX_INTERVAL_SECONDS", "15"))
+# Event Registry request budget shared by every fetch of the process
+EVENTREGISTRY_MAX_REQUESTS_PER_HOUR = int(os.getenv("EVENTREGISTRY_MAX_REQUESTS_PER_HOUR", "300"))
+
+# Near-duplicate (syndicated) articles are only matched within this many days of each other
+NEWS_DUPLICATE_WINDOW_DAYS = int(os.getenv("NEWS_DUPLICATE_WINDOW_DAYS", "3"))
+# Agent window selection: estimated prompt tokens of the selected articles, weight of novelty
+# against quality (maximal marginal relevance) and the half-life of the recency score
+NEWS_SELECTION_TOKEN_BUDGET = int(os.getenv("NEWS_SELECTION_TOKEN_BUDGET", "60000"))
+NEWS_SELECTION_DIVERSITY = float(os.getenv("NEWS_SELECTION_DIVERSITY", "0.3"))
+NEWS_SELECTION_RECENCY_HALF_LIFE_HOURS = float(os.getenv("NEWS_SELECTION_RECENCY_HALF_LIFE_HOURS", "12"))
+# Retention (prune_history): articles published and agent outputs created more than this
+# many days ago are deleted, optionally after being appended to monthly gzip JSONL archives
+NEWS_RETENTION_DAYS = int(os.getenv("NEWS_RETENTION_DAYS", "365"))
+MAS_RETENTION_DAYS = int(os.getenv("MAS_RETENTION_DAYS", "365"))
+
+# Incremental DN-MAS: revise the previous summary when few articles are new, regenerate otherwise
+DN_MAS_INCREMENTAL_MAX_NEW_ARTICLES = int(os.getenv("DN_MAS_INCREMENTAL_MAX_NEW_ARTICLES", "20"))
+DN_MAS_INCREMENTAL_MAX_CHAIN = int(os.getenv("DN_MAS_INCREMENTAL_MAX_CHAIN", "10"))
+
+# DN-MAS narrative clustering: the extraction agent reads one representative article per
+# cluster of similar articles (TF-IDF cosine similarity >= threshold) instead of every article
+DN_MAS_CLUSTER_NARRATIVES = os.getenv("DN_MAS_CLUSTER_NARRATIVES", "True").lower() == "true"
+DN_MAS_CLUSTER_THRESHOLD = float(os.getenv("DN_MAS_CLUSTER_THRESHOLD", "0.3"))
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Summary, Citation, CitationSource,
-    TopicAnalysisGroup, TopicAnalysis, TopicMetric, 
+    AnalysisTopic, TopicAnalysisGroup, TopicAnalysis, TopicMetric, 
     TopicExpert, TopicCitation, TopicCitationSource
 )
 
@@ -9,8 +9,8 @@ from .models import (
 
 @admin.register(Summary)
 class SummaryAdmin(admin.ModelAdmin):
-    list_display = ("uuid", "created_at", "article_count", "agent_name")
-    list_filter = ("agent_name", "created_at")
+    list_display = ("uuid", "created_at", "provided", "cited", "agent_name", "is_provisional")
+    list_filter = ("agent_name", "is_provisional", "created_at")
     search_fields = ("uuid", "summary_text")
     readonly_fields = ("uuid", "created_at")
     
@@ -21,8 +21,25 @@ class SummaryAdmin(admin.ModelAdmin):
         ("Metadata", {
             "fields": ("created_at", "article_count", "date_range_start", "date_range_end", "agent_name")
         }),
+        ("Flash", {
+            "fields": ("is_provisional", "superseded_by")
+        }),
     )
 
+    def get_queryset(self, request):
+        # Both counts come from subqueries of the changelist query, not one query per row
+        return super().get_queryset(request).with_usage_counts()
+
+    def provided(self, obj):
+        return obj.articles_provided_count
+    provided.short_description = "Provided"
+    provided.admin_order_field = "provided_count"
+
+    def cited(self, obj):
+        return obj.articles_used_count
+    cited.short_description = "Cited"
+    cited.admin_order_field = "used_count"
+
 
 @admin.register(Citation)
 class CitationAdmin(admin.ModelAdmin):
@@ -48,16 +65,26 @@ class CitationSourceAdmin(admin.ModelAdmin):
 
 # --- ST-MAS Admin ---
 
+@admin.register(AnalysisTopic)
+class AnalysisTopicAdmin(admin.ModelAdmin):
+    list_display = ("key", "label", "version", "is_active", "position", "updated_at")
+    list_filter = ("is_active",)
+    list_editable = ("is_active", "position")
+    search_fields = ("key", "label", "keywords")
+    readonly_fields = ("version", "created_at", "updated_at")
+
+
 @admin.register(TopicAnalysisGroup)
 class TopicAnalysisGroupAdmin(admin.ModelAdmin):
-    list_display = ("uuid", "created_at")
-    readonly_fields = ("uuid", "created_at")
+    list_display = ("uuid", "created_at", "status", "completed_at")
+    list_filter = ("status",)
+    readonly_fields = ("uuid", "created_at", "completed_at")
 
 
 @admin.register(TopicAnalysis)
 class TopicAnalysisAdmin(admin.ModelAdmin):
-    list_display = ("topic_name", "sentiment", "group", "created_at")
-    list_filter = ("topic_name", "sentiment", "created_at")
+    list_display = ("topic_name", "sentiment", "is_complete", "model_tier", "group", "created_at")
+    list_filter = ("topic_name", "sentiment", "is_complete", "created_at")
 
 
 @admin.register(TopicMetric)
@@ -0,0 +1,86 @@
+"""
+Helpers shared by the benchmark commands: the model backend and article
+window options, and the context cache override.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from .context_cache import context_cache, LocalContextCacheBackend
+from .llm import FakeBackend, ReplayBackend
+
+
+def parse_end_date(value: str) -> datetime:
+    """
+    argparse type for --end-date: an ISO date or datetime, in the current
+    time zone unless it carries an offset.
+    """
+    end_date = datetime.fromisoformat(value)
+    if timezone.is_naive(end_date):
+        end_date = timezone.make_aware(end_date)
+    return end_date
+
+
+def add_backend_arguments(parser) -> None:
+    """Adds --backend, --latency and --recordings (see build_backend)."""
+    parser.add_argument(
+        '--backend',
+        choices=['fake', 'replay'],
+        default='fake',
+        help='Model backend to use (default: fake)'
+    )
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=None,
+        help='Seconds of simulated latency per model call (default: 0 for fake, recorded for replay)'
+    )
+    parser.add_argument(
+        '--recordings',
+        default=settings.LLM_RECORDINGS_PATH,
+        help='Recordings file for the replay backend'
+    )
+
+
+def add_window_arguments(parser) -> None:
+    """Adds --days and --end-date (see get_window)."""
+    parser.add_argument(
+        '--days',
+        type=int,
+        default=7,
+        help='Number of days to look back for articles (default: 7)'
+    )
+    parser.add_argument(
+        '--end-date',
+        type=parse_end_date,
+        default=None,
+        help='End of the article window, ISO date or datetime (default: now); fix it to replay a recording'
+    )
+
+
+def build_backend(options: dict):
+    """The fake or replay backend selected by the command's options."""
+    if options['backend'] == 'replay':
+        return ReplayBackend(options['recordings'], latency=options['latency'])
+    return FakeBackend(latency=options['latency'] or 0.0)
+
+
+def get_window(options: dict) -> Tuple[datetime, datetime]:
+    """The (start_date, end_date) article window selected by the command's options."""
+    end_date = options['end_date'] or timezone.now()
+    return end_date - timedelta(days=options['days']), end_date
+
+
+@contextmanager
+def local_context_cache():
+    """Serves context caches locally in the block: a benchmark never registers the corpus with the provider."""
+    backend = context_cache.backend
+    context_cache.backend = LocalContextCacheBackend()
+    try:
+        yield
+    finally:
+        context_cache.backend = backend
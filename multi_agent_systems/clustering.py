@@ -0,0 +1,122 @@
+"""
+In-process narrative clustering for agent inputs.
+
+Groups the articles of a run into candidate narratives with TF-IDF vectors
+and cosine similarity, so the extraction agent reads one representative per
+narrative plus the narrative's size instead of every article.
+"""
+
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from .retrieval import tokenize
+
+
+# Sparse vector: term -> weight
+Vector = Dict[str, float]
+
+
+@dataclass
+class NarrativeCluster:
+    """Articles telling the same story, by article index."""
+    representative: str
+    members: List[str] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return len(self.members)
+
+
+def tfidf_vectors(texts: List[str]) -> List[Vector]:
+    """L2-normalised TF-IDF vectors (sublinear tf, smoothed idf) of the texts."""
+    counts = [Counter(tokenize(text)) for text in texts]
+    df = Counter(term for terms in counts for term in terms)
+    total = len(texts)
+
+    vectors = []
+    for terms in counts:
+        vector = {
+            term: (1 + math.log(tf)) * (math.log((1 + total) / (1 + df[term])) + 1)
+            for term, tf in terms.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors.append({term: weight / norm for term, weight in vector.items()})
+    return vectors
+
+
+def cosine(a: Vector, b: Vector) -> float:
+    """Cosine similarity of two L2-normalised sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+
+def _normalise(vector: Vector) -> Vector:
+    norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+    return {term: weight / norm for term, weight in vector.items()}
+
+
+def cluster_articles(articles: Dict[str, dict], threshold: float) -> List[NarrativeCluster]:
+    """
+    Single-pass centroid clustering: each article joins the most similar
+    narrative if its cosine similarity to the centroid reaches the threshold,
+    otherwise it starts a new one. The representative of a narrative is the
+    member closest to its centroid.
+
+    Args:
+        articles: Indexed article dict produced by FormattedArticles.to_llm_dict()
+        threshold: Minimum cosine similarity to join a narrative (0-1)
+
+    Returns:
+        The narratives, largest first (ties in article order)
+    """
+    indices = list(articles)
+    vectors = dict(zip(indices, tfidf_vectors([
+        f"{articles[idx].get('title') or ''} {articles[idx].get('text') or ''}" for idx in indices
+    ])))
+
+    clusters: List[List[str]] = []
+    sums: List[Vector] = []
+    # Normalised sums, kept up to date as members join
+    centroids: List[Vector] = []
+    for idx in indices:
+        vector = vectors[idx]
+        scores = [cosine(vector, centroid) for centroid in centroids]
+        best = max(range(len(scores)), key=scores.__getitem__, default=None)
+        if best is not None and scores[best] >= threshold:
+            clusters[best].append(idx)
+            for term, weight in vector.items():
+                sums[best][term] = sums[best].get(term, 0.0) + weight
+            centroids[best] = _normalise(sums[best])
+        else:
+            clusters.append([idx])
+            sums.append(dict(vector))
+            centroids.append(vector)
+
+    narratives = []
+    for members, centroid in zip(clusters, centroids):
+        representative = max(members, key=lambda idx: cosine(vectors[idx], centroid))
+        narratives.append(NarrativeCluster(representative=representative, members=members))
+    return sorted(narratives, key=lambda cluster: cluster.size, reverse=True)
+
+
+def build_narrative_state(articles: Dict[str, dict], clusters: List[NarrativeCluster]) -> Dict[str, dict]:
+    """
+    Formats the narratives for the extraction prompt: the representative
+    article under its own index, with the narrative's size, share of the
+    window and the titles of the other members.
+    """
+    total = sum(cluster.size for cluster in clusters) or 1
+    return {
+        cluster.representative: {
+            **articles[cluster.representative],
+            "narrative_articles": cluster.size,
+            "narrative_share": f"{cluster.size / total:.0%}",
+            "similar_titles": [
+                articles[idx].get("title") for idx in cluster.members if idx != cluster.representative
+            ],
+        }
+        for cluster in clusters
+    }
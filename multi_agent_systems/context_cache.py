@@ -0,0 +1,194 @@
+"""
+Shared-context caching for agent pipelines.
+
+The article corpus is the same prompt prefix for every stage of a run. The
+runners register it once per run as a cached prefix with the model provider
+(or with the in-memory stand-in used in tests), agents reference the handle
+through the session state, and the cache is expired when the run ends.
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from google.genai import types
+
+
+# Session state key holding the handle of the run's cached corpus
+CACHE_STATE_KEY = "context_cache"
+
+# Placeholder injected into prompts in place of the cached corpus
+CACHED_ARTICLES_REFERENCE = (
+    "(The articles are provided in the cached context at the start of this conversation.)"
+)
+
+
+def _corpus_content(corpus: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(text=corpus)])
+
+
+class GeminiContextCacheBackend:
+    """Registers the corpus as a Gemini CachedContent resource."""
+
+    def __init__(self):
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google.genai import Client
+            self._client = Client()
+        return self._client
+
+    async def create(self, model: str, corpus: str, ttl_seconds: int) -> str:
+        cached = await self.client.aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                contents=[_corpus_content(corpus)],
+                ttl=f"{ttl_seconds}s",
+                display_name="fed-django-articles",
+            ),
+        )
+        return cached.name
+
+    def apply(self, llm_request, provider_name: str, corpus: str) -> None:
+        # Cached requests may not set a system instruction, so it is sent as
+        # the first turn after the cached prefix instead.
+        instruction = llm_request.config.system_instruction
+        if instruction:
+            llm_request.contents.insert(
+                0, types.Content(role="user", parts=[types.Part(text=str(instruction))])
+            )
+            llm_request.config.system_instruction = None
+        llm_request.config.cached_content = provider_name
+
+    async def delete(self, provider_name: str) -> None:
+        await self.client.aio.caches.delete(name=provider_name)
+
+
+class LocalContextCacheBackend:
+    """
+    In-memory stand-in for tests and offline runs.
+    Inlines the corpus back into each request so the model sees the same prompt.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, str] = {}
+        self.hits: Dict[str, int] = {}
+
+    async def create(self, model: str, corpus: str, ttl_seconds: int) -> str:
+        provider_name = f"local/{uuid.uuid4()}"
+        self.entries[provider_name] = corpus
+        self.hits[provider_name] = 0
+        return provider_name
+
+    def apply(self, llm_request, provider_name: str, corpus: str) -> None:
+        self.hits[provider_name] += 1
+        llm_request.contents.insert(0, _corpus_content(corpus))
+
+    async def delete(self, provider_name: str) -> None:
+        self.entries.pop(provider_name, None)
+
+
+class ContextCacheManager:
+    """
+    Owns the cached corpora of the running pipelines.
+
+    Handles are opaque strings stored in the session state under
+    CACHE_STATE_KEY; apply_context_cache() resolves them on every model call.
+    """
+
+    def __init__(self, backend=None, ttl_seconds: int = 900, min_tokens: int = 4096):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        # handle -> (model, provider_name, corpus)
+        self.handles: Dict[str, tuple] = {}
+
+    async def register(self, model: str, corpus: str) -> Optional[str]:
+        """
+        Registers the corpus for one run.
+
+        Returns:
+            The handle, or None when caching is disabled or the corpus is below
+            the provider's minimum cacheable size (~4 characters per token).
+        """
+        if self.backend is None or len(corpus) // 4 < self.min_tokens:
+            return None
+
+        try:
+            provider_name = await self.backend.create(model, corpus, self.ttl_seconds)
+        except Exception as e:
+            # Fall back to sending the articles inline
+            print(f"Context cache registration failed, sending articles inline: {e}")
+            return None
+
+        handle = str(uuid.uuid4())
+        self.handles[handle] = (model, provider_name, corpus)
+        return handle
+
+    def apply(self, handle: str, llm_request) -> None:
+        model, provider_name, corpus = self.handles[handle]
+        if llm_request.model and llm_request.model != model:
+            # Caches are bound to a model; other models get the corpus inline.
+            llm_request.contents.insert(0, _corpus_content(corpus))
+            return
+        self.backend.apply(llm_request, provider_name, corpus)
+
+    async def expire(self, handle: str) -> None:
+        _, provider_name, _ = self.handles.pop(handle)
+        try:
+            await self.backend.delete(provider_name)
+        except Exception as e:
+            # The TTL will expire it server-side anyway
+            print(f"Failed to expire context cache {provider_name}: {e}")
+
+    @asynccontextmanager
+    async def cached_articles(self, state: dict, model: str, keys: Iterable[str] = ("articles",)):
+        """
+        Registers state["articles"] for the duration of a run.
+
+        Yields:
+            A copy of the state where the given keys point to the cached corpus
+            instead of carrying the articles inline.
+        """
+        keys = list(keys)
+        corpus = f"**Articles:**\n{state['articles']}"
+        handle = await self.register(model, corpus) if keys else None
+        if handle is None:
+            yield state
+            return
+
+        try:
+            yield {
+                **state,
+                **{key: CACHED_ARTICLES_REFERENCE for key in keys},
+                CACHE_STATE_KEY: handle,
+            }
+        finally:
+            await self.expire(handle)
+
+
+def _build_backend():
+    backend = getattr(settings, "LLM_CONTEXT_CACHE", "off")
+    if backend == "gemini":
+        return GeminiContextCacheBackend()
+    if backend == "local":
+        return LocalContextCacheBackend()
+    return None
+
+
+context_cache = ContextCacheManager(
+    backend=_build_backend(),
+    ttl_seconds=getattr(settings, "LLM_CONTEXT_CACHE_TTL_SECONDS", 900),
+    min_tokens=getattr(settings, "LLM_CONTEXT_CACHE_MIN_TOKENS", 4096),
+)
+
+
+def apply_context_cache(callback_context, llm_request):
+    """before_model_callback that points the request at the run's cached corpus."""
+    handle = callback_context.state.get(CACHE_STATE_KEY)
+    if handle in context_cache.handles:
+        context_cache.apply(handle, llm_request)
+    return None
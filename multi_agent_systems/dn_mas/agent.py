@@ -1,35 +1,51 @@
 from google.adk.agents import SequentialAgent
 from google.adk.agents import LlmAgent
+from google.genai import types
 import os
+from multi_agent_systems.context_cache import apply_context_cache
+from multi_agent_systems.llm import build_model
+from multi_agent_systems.tiers import select_model_tier, get_tier_model, get_default_tier
 from .instructions import *
 from .schemas import *
 
 
-GEMINI_MODEL = "gemini-3-flash-preview"
+# Agents pick their model by tier (see multi_agent_systems.tiers); the shared
+# article cache is registered for the default tier's model
+GEMINI_MODEL = get_tier_model(get_default_tier())
 
 information_extraction_agent = LlmAgent(
     name="information_extraction_agent",
-    model=GEMINI_MODEL,
+    model=build_model(agent_name="information_extraction_agent"),
     instruction=information_extraction_instruction,
     description="Extracts information from the article.",
-    output_key="extracted_information"
+    output_key="extracted_information",
+    before_model_callback=[select_model_tier, apply_context_cache],
 )
 
 information_summarizer_agent = LlmAgent(
     name="information_summarizer_agent",
-    model=GEMINI_MODEL,
+    model=build_model(agent_name="information_summarizer_agent"),
     instruction=information_summarizer_instruction,
     description="Write a summary based on the information extracted.",
     output_key="summary",
+    before_model_callback=[select_model_tier, apply_context_cache],
 )
 
+def skip_deferred_citation(callback_context):
+    """Skips the citation stage of hierarchical batches that are cited after the merge."""
+    if callback_context.state.get("defer_citation"):
+        return types.Content(role="model", parts=[])
+
+
 information_citation_agent = LlmAgent(
     name="information_citation_agent",
-    model=GEMINI_MODEL,
+    model=build_model(agent_name="information_citation_agent"),
     instruction=information_citation_instruction,
     description="Add citations to the summary.",
     output_key="summary_with_citations",
     output_schema=SummaryWithCitations,
+    before_agent_callback=skip_deferred_citation,
+    before_model_callback=[select_model_tier, apply_context_cache],
 )
 
 summarizer_agent = SequentialAgent(
@@ -38,5 +54,53 @@ summarizer_agent = SequentialAgent(
     description="Executes a sequence of information extraction, summarization, and citation.",
 )
 
+# --- Hierarchical (map-reduce) mode ---
+# Batches run the pipeline above; these agents merge the partial results and cite the merged summary.
+
+information_merge_agent = LlmAgent(
+    name="information_merge_agent",
+    model=build_model(agent_name="information_merge_agent"),
+    instruction=information_merge_instruction,
+    description="Merge partial summaries and their citations into one summary.",
+    output_key="summary_with_citations",
+    output_schema=SummaryWithCitations,
+    before_model_callback=select_model_tier,
+)
+
+hierarchical_citation_agent = LlmAgent(
+    name="hierarchical_citation_agent",
+    model=build_model(agent_name="hierarchical_citation_agent"),
+    instruction=information_citation_instruction,
+    description="Add citations to the merged summary from one batch of articles.",
+    output_key="summary_with_citations",
+    output_schema=SummaryWithCitations,
+    before_model_callback=select_model_tier,
+)
+
+# --- Flash mode ---
+# Provisional summary from headlines and lead sentences only, published while the full pipeline runs.
+
+flash_summary_agent = LlmAgent(
+    name="flash_summary_agent",
+    model=build_model(agent_name="flash_summary_agent"),
+    instruction=flash_summary_instruction,
+    description="Write a provisional summary from headlines and lead sentences.",
+    output_key="flash_summary",
+    before_model_callback=select_model_tier,
+)
+
+# --- Incremental mode ---
+# Revises the previous summary with the articles that arrived since, keeping unchanged citations.
+
+summary_update_agent = LlmAgent(
+    name="summary_update_agent",
+    model=build_model(agent_name="summary_update_agent"),
+    instruction=summary_update_instruction,
+    description="Revise the previous summary and its citations with new articles.",
+    output_key="summary_with_citations",
+    output_schema=SummaryWithCitations,
+    before_model_callback=select_model_tier,
+)
+
 # For ADK tools compatibility, the root agent must be named `root_agent`
 dn_mas = summarizer_agent
\ No newline at end of file
@@ -7,8 +7,12 @@ here is the context:
 Here is your Task:
 identify the main narratives discussed in the articles.
 
+Similar articles may be pre-grouped: an entry then stands for a whole narrative, with the number
+of articles telling it (narrative_articles), its share of the coverage (narrative_share) and the
+titles of the other articles (similar_titles). Use these weights to separate consensus from minority narratives.
+
 **Articles:**
-{articles}
+{narratives}
 
 """
 
@@ -86,4 +90,66 @@ You are a citation specialist for financial summaries.
 Your task is to add proper citations to the summary, linking each claim back to its source article.
 Return the summary with citations in the required structured format. The summary must be a fluid, journalistic report without formal citaions.
 The citation should be in the separate pydantic model. 
-"""
\ No newline at end of file
+"""
+
+information_merge_instruction = """
+You are an editor merging partial executive summaries of Federal Reserve/FOMC coverage.
+Each partial summary was written from a different batch of articles and may come with its citations.
+
+here is the context:
+{context}
+
+**Partial Summaries (with citations):**
+{partial_summaries}
+
+Here is your Task:
+Merge the partial summaries into a single executive summary that captures the main narratives across all batches.
+
+1. Present the consensus vs minority narratives and weigh them by how many batches support them.
+2. Merge overlapping statements and remove redundancy; keep conflicting figures only if the sources disagree.
+3. Keep every citation that supports a statement of the merged summary.
+
+## **Core Constraints**
+
+* **Zero Invention:** use only facts present in the partial summaries.
+* **Citations:** copy `sentence`, `article_uuid` and `expert_name` exactly as given. Never renumber or invent article IDs.
+* **Style:** one fluid, journalistic narrative without section headers.
+"""
+
+flash_summary_instruction = """
+You are a wire reporter covering an FOMC decision as it breaks.
+
+here is the context:
+{context}
+
+Using only the headlines and lead sentences below, write a provisional summary of 3 to 5 sentences:
+the decision, the key figures (rate range, vote, guidance) and the first market reaction if reported.
+State only what the headlines support; do not speculate. No citations, no headers.
+
+**Headlines:**
+{headlines}
+"""
+
+summary_update_instruction = """
+You are an editor keeping a live executive summary of Federal Reserve/FOMC coverage up to date.
+
+here is the context:
+{context}
+
+**Current Summary (with citations):**
+{previous_summary}
+
+**New Articles:**
+{articles}
+
+Here is your Task:
+Revise the current summary with the new articles only where they change it.
+
+1. Keep every sentence the new articles do not affect word for word, with its citations unchanged.
+2. Rewrite the sentences the new articles confirm, contradict or update, and add new sentences for genuinely new developments.
+3. Remove statements the new articles show to be outdated.
+4. Cite new facts with the new articles' IDs; never renumber or invent article IDs.
+
+Return the complete revised summary with citations in the required structured format.
+The summary must remain one fluid, journalistic narrative without section headers.
+"""
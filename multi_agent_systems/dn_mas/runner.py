@@ -1,58 +1,220 @@
-import uuid
+import asyncio
+from collections import defaultdict
+from typing import Optional
 
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
+from django.conf import settings
 
-from .agent import dn_mas
+from multi_agent_systems.clustering import cluster_articles, build_narrative_state
+from multi_agent_systems.context_cache import context_cache
+from multi_agent_systems.execution import run_agent
+from multi_agent_systems.governor import Lane
+from multi_agent_systems.tiers import collect_model_tiers, fastest_tier, tier_state_key
+from .agent import (
+    dn_mas, information_merge_agent, hierarchical_citation_agent,
+    flash_summary_agent, summary_update_agent, GEMINI_MODEL
+)
 
 
+# Articles per map batch in hierarchical mode (what the single-shot pipeline handles well)
+BATCH_SIZE = 5
 
 
-async def dn_mas_runner(initial_state):
+def build_narratives(articles: dict) -> dict:
+    """
+    The extraction agent's input: one representative article per cluster of
+    similar articles, with the cluster's size and share of the window.
+    """
+    clusters = cluster_articles(articles, threshold=settings.DN_MAS_CLUSTER_THRESHOLD)
+    return build_narrative_state(articles, clusters)
+
+
+async def dn_mas_runner(
+    initial_state,
+    lane: Lane = Lane.LIVE,
+    cluster_narratives: Optional[bool] = None,
+):
+    """
+    Runs the DN-MAS pipeline on the state's articles. With cluster_narratives
+    (None for DN_MAS_CLUSTER_NARRATIVES) the extraction agent reads one
+    representative per narrative instead of every article.
+    """
+    if cluster_narratives is None:
+        cluster_narratives = settings.DN_MAS_CLUSTER_NARRATIVES
 
     APP_NAME = "dn_mas"
-    USER_ID = "system"
-
-    session_id = str(uuid.uuid4())
-    session_service = InMemorySessionService()
-    
-    await session_service.create_session(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-        session_id=session_id,
-        state=initial_state,
-    )
 
-    agent_runner = Runner(
-        app_name=APP_NAME,
-        agent=dn_mas,
-        session_service=session_service,
-        artifact_service=None,
-        memory_service=None,
-    )
+    articles = initial_state["articles"]
+    state = {**initial_state, "narratives": build_narratives(articles) if cluster_narratives else articles}
+    # The three stages share the article block: register it once for the run
+    keys = ["articles"] if cluster_narratives else ["articles", "narratives"]
 
-    # Create the initial message to trigger the pipeline
-    user_message = types.Content(
-        role="user",
-        parts=[types.Part(text="Please process the articles and provide a cited summary.")]
-    )
+    async with context_cache.cached_articles(state, model=GEMINI_MODEL, keys=keys) as state:
+        # The article block may have been swapped for a cache reference
+        return await run_agent(APP_NAME, dn_mas, state, lane=lane, article_ids=articles)
+
+
+def _split_batches(articles: dict, batch_size: int) -> list[dict]:
+    """Splits the indexed articles into batches, keeping their global indices."""
+    items = list(articles.items())
+    return [dict(items[i:i + batch_size]) for i in range(0, len(items), batch_size)]
+
+
+def _merge_citations(summary_text: str, cite_states: list[dict]) -> dict:
+    """Combines the per-batch citations of the merged summary, grouped by summary sentence."""
+    sources = defaultdict(list)
+    for state in cite_states:
+        for citation in (state.get("summary_with_citations") or {}).get("citations", []):
+            sources[citation["summary_sentence"]].extend(citation["article_sentence_citations"])
+
+    return {
+        "summary_text": summary_text,
+        "citations": [
+            {"summary_sentence": sentence, "article_sentence_citations": cited}
+            for sentence, cited in sources.items()
+        ],
+    }
+
+
+async def dn_mas_hierarchical_runner(
+    initial_state,
+    batch_size: int = BATCH_SIZE,
+    lane: Lane = Lane.LIVE,
+    final_citation: bool = True,
+):
+    """
+    Map-reduce DN-MAS for windows larger than one prompt.
+
+    1. Map: every batch of articles runs the regular pipeline in parallel.
+    2. Reduce: partial summaries are merged pairwise, level by level, in parallel.
+       A failed merge keeps its two partials for the next level; if a whole
+       level fails, the first remaining partial is used.
+    3. Cite: the merged summary is cited against every batch in parallel and
+       the citations are combined. Batches skip their own citation stage,
+       unless final_citation is False, in which case the merged batch
+       citations are returned as they are.
 
-    # Run the agent pipeline to completion
-    async for event in agent_runner.run_async(
-        user_id=USER_ID,
-        session_id=session_id,
-        new_message=user_message,
-    ):
-        pass  # Process all events to completion
+    Article indices are global across batches, so the final citations map
+    back to real UUIDs through the usual idx_to_metadata lookup.
 
+    Returns:
+        State dict with "summary_with_citations" (same shape as dn_mas_runner),
+        the map stage's "partial_summaries" and, per agent, the fastest model
+        tier any of its runs used.
+    """
+    articles = initial_state["articles"]
+    if len(articles) <= batch_size:
+        return await dn_mas_runner(initial_state, lane=lane)
 
-    # Retrieve the session to access the updated state with output_keys
-    completed_session = await session_service.get_session(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-        session_id=session_id,
+    context = initial_state.get("context", "")
+    batches = _split_batches(articles, batch_size)
+
+    # 1. Map
+    batch_states = await asyncio.gather(*(
+        dn_mas_runner({**initial_state, "articles": batch, "defer_citation": final_citation}, lane=lane)
+        for batch in batches
+    ))
+    if final_citation:
+        partials = [
+            {"summary_text": s["summary"], "citations": []}
+            for s in batch_states if s.get("summary")
+        ]
+    else:
+        partials = [s["summary_with_citations"] for s in batch_states if s.get("summary_with_citations")]
+    if not partials:
+        return {"summary_with_citations": None, "partial_summaries": []}
+
+    # 2. Reduce (tree of pairwise merges)
+    states = list(batch_states)
+    level = partials
+    while len(level) > 1:
+        pairs = [level[i:i + 2] for i in range(0, len(level), 2)]
+        merged = await asyncio.gather(*(
+            run_agent(
+                "dn_mas_merge",
+                information_merge_agent,
+                {"partial_summaries": pair, "context": context},
+                lane=lane,
+                message="Please merge the partial summaries.",
+                article_ids=articles,
+            )
+            for pair in pairs if len(pair) == 2
+        ))
+        states.extend(merged)
+
+        next_level = []
+        for pair, state in zip([p for p in pairs if len(p) == 2], merged):
+            next_level.extend([state["summary_with_citations"]] if state.get("summary_with_citations") else pair)
+        next_level.extend(p[0] for p in pairs if len(p) == 1)
+        if len(next_level) == len(level):
+            break
+        level = next_level
+
+    # 3. Cite
+    summary_with_citations = level[0]
+    if final_citation:
+        cite_states = await asyncio.gather(*(
+            run_agent(
+                "dn_mas_cite",
+                hierarchical_citation_agent,
+                {"summary": level[0]["summary_text"], "articles": batch, "context": context},
+                lane=lane,
+            )
+            for batch in batches
+        ))
+        states.extend(cite_states)
+        summary_with_citations = _merge_citations(level[0]["summary_text"], cite_states)
+
+    tiers = defaultdict(list)
+    for state in states:
+        for agent_name, tier in collect_model_tiers(state).items():
+            tiers[agent_name].append(tier)
+
+    return {
+        "summary_with_citations": summary_with_citations,
+        "partial_summaries": partials,
+        **{tier_state_key(agent_name): fastest_tier(used) for agent_name, used in tiers.items()},
+    }
+
+
+async def dn_mas_flash_runner(initial_state, lane: Lane = Lane.CRITICAL):
+    """
+    Runs the single-call flash summary on a headline state
+    ({"headlines": FormattedArticles.to_headlines_dict(), "context": ...}).
+
+    Returns:
+        The final state with the provisional text under "flash_summary".
+    """
+    return await run_agent(
+        "dn_mas_flash",
+        flash_summary_agent,
+        initial_state,
+        lane=lane,
+        message="Please write the flash summary.",
+        article_ids=initial_state["headlines"],
     )
-    
-    return completed_session.state
 
+
+async def dn_mas_update_runner(initial_state, lane: Lane = Lane.LIVE):
+    """
+    Revises a previous summary with new articles in a single call.
+
+    The state holds "previous_summary" (helpers.format_summary_for_update) and
+    only the new "articles", both indexed in one index space, so the prompt
+    grows with the change rather than with the window.
+
+    Returns:
+        The final state with the revised "summary_with_citations".
+    """
+    cited_ids = {
+        source["article_uuid"]
+        for citation in initial_state["previous_summary"]["citations"]
+        for source in citation["article_sentence_citations"]
+    }
+    return await run_agent(
+        "dn_mas_update",
+        summary_update_agent,
+        initial_state,
+        lane=lane,
+        message="Please update the summary with the new articles.",
+        article_ids=[*initial_state["articles"], *sorted(cited_ids, key=int)],
+    )
@@ -0,0 +1,85 @@
+"""
+Shared execution helper for the agent pipelines.
+Runs an ADK agent in a fresh in-memory session and returns the final state.
+"""
+
+import uuid
+from typing import Awaitable, Callable, Iterable, Optional
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from .governor import Lane, use_lane
+from .llm import use_article_ids
+
+
+USER_ID = "system"
+
+
+async def run_agent(
+    app_name: str,
+    agent,
+    initial_state: dict,
+    lane: Lane = Lane.LIVE,
+    message: str = "Please process the articles and provide a cited summary.",
+    on_event: Optional[Callable[[object], Awaitable[None]]] = None,
+    article_ids: Optional[Iterable[str]] = None,
+) -> dict:
+    """
+    Runs the agent to completion in a new session.
+
+    Args:
+        app_name: ADK app name for the session
+        agent: Root agent to run
+        initial_state: Session state the agent instructions are rendered from
+        lane: Governor priority lane for every model call of this run
+        message: User message that triggers the pipeline
+        on_event: Optional coroutine awaited with every ADK event as it arrives
+        article_ids: Indices of the articles the prompts refer to, for the model
+            backends; defaults to the keys of the state's "articles"
+
+    Returns:
+        The session state after the run, including every agent's output_key
+    """
+    session_id = str(uuid.uuid4())
+    session_service = InMemorySessionService()
+
+    await session_service.create_session(
+        app_name=app_name,
+        user_id=USER_ID,
+        session_id=session_id,
+        state=initial_state,
+    )
+
+    agent_runner = Runner(
+        app_name=app_name,
+        agent=agent,
+        session_service=session_service,
+        artifact_service=None,
+        memory_service=None,
+    )
+
+    # Create the initial message to trigger the pipeline
+    user_message = types.Content(role="user", parts=[types.Part(text=message)])
+
+    if article_ids is None and isinstance(initial_state.get("articles"), dict):
+        article_ids = initial_state["articles"]
+
+    with use_lane(lane), use_article_ids(article_ids or ()):
+        # Run the agent pipeline to completion
+        async for event in agent_runner.run_async(
+            user_id=USER_ID,
+            session_id=session_id,
+            new_message=user_message,
+        ):
+            if on_event is not None:
+                await on_event(event)
+
+    # Retrieve the session to access the updated state with output_keys
+    completed_session = await session_service.get_session(
+        app_name=app_name,
+        user_id=USER_ID,
+        session_id=session_id,
+    )
+    return completed_session.state
@@ -0,0 +1,239 @@
+"""
+Concurrency governor for agent model calls.
+
+Bounds in-flight requests, requests per minute and tokens per minute across
+all pipelines of the process, and optionally across the cluster through the
+shared database. Calls are admitted by priority lane, so critical-window live
+runs always go before regular live runs, which go before backfills and
+backtests.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from enum import IntEnum
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+
+class Lane(IntEnum):
+    """Priority lanes, lower values are admitted first."""
+    CRITICAL = 0  # Live runs inside an FOMC critical window
+    LIVE = 1      # Regular scheduled runs
+    BACKFILL = 2  # Backfills and backtests
+
+
+# Share of the cluster-wide limits each lane may consume. The remainder is
+# headroom reserved for higher lanes.
+LANE_SHARES = {
+    Lane.CRITICAL: 1.0,
+    Lane.LIVE: 0.75,
+    Lane.BACKFILL: 0.5,
+}
+
+current_lane: ContextVar[Lane] = ContextVar("llm_lane", default=Lane.LIVE)
+
+
+@contextmanager
+def use_lane(lane: Lane):
+    """Runs the enclosed pipeline's model calls in the given lane."""
+    token = current_lane.set(lane)
+    try:
+        yield
+    finally:
+        current_lane.reset(token)
+
+
+class Lease:
+    """An admitted model call. `tokens` is corrected to the actual usage on release."""
+
+    def __init__(self, lane: Lane, tokens: int):
+        self.lane = lane
+        self.tokens = tokens
+        self.db_id: Optional[int] = None
+
+
+class LLMGovernor:
+    """
+    In-process admission control with strict lane priority.
+
+    Waiters are queued by (lane, arrival order). The head of the queue is
+    admitted as soon as an in-flight slot and the per-minute budgets allow it;
+    lower lanes never overtake a waiting higher lane.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        cluster: bool = False,
+    ):
+        self.max_in_flight = max_in_flight
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.cluster = cluster
+
+        self.in_flight = 0
+        self._window = deque()  # (admitted_at, lease) over the last minute
+        self._waiters = []      # heap of (lane, seq, tokens, future)
+        self._seq = itertools.count()
+        self._timer = None
+        self._timer_loop = None  # Loop the timer was scheduled on
+
+    # --- Local admission ---
+
+    def _prune(self, now: float) -> None:
+        while self._window and now - self._window[0][0] >= 60:
+            self._window.popleft()
+
+    def _retry_after(self, tokens: int, now: float) -> float:
+        """Seconds until the head waiter fits the per-minute budgets (0 if it fits now)."""
+        tokens = min(tokens, self.tokens_per_minute)
+        self._prune(now)
+        if len(self._window) >= self.requests_per_minute:
+            return 60 - (now - self._window[0][0])
+
+        used = sum(lease.tokens for _, lease in self._window)
+        if used + tokens > self.tokens_per_minute:
+            # Wait until enough of the window has expired
+            for admitted_at, lease in self._window:
+                used -= lease.tokens
+                if used + tokens <= self.tokens_per_minute:
+                    return 60 - (now - admitted_at)
+        return 0
+
+    def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._timer = None
+        while self._waiters and self.in_flight < self.max_in_flight:
+            lane, _, tokens, future = self._waiters[0]
+            # Cancelled while waiting, or left behind by an event loop that has finished
+            if future.done() or future.get_loop() is not loop:
+                heapq.heappop(self._waiters)
+                continue
+
+            now = time.monotonic()
+            delay = self._retry_after(tokens, now)
+            if delay > 0:
+                self._timer = loop.call_later(delay, self._dispatch)
+                self._timer_loop = loop
+                return
+
+            heapq.heappop(self._waiters)
+            lease = Lease(lane, tokens)
+            self.in_flight += 1
+            self._window.append((now, lease))
+            future.set_result(lease)
+
+    async def _acquire_local(self, lane: Lane, tokens: int) -> Lease:
+        loop = asyncio.get_running_loop()
+        # The governor outlives event loops (each asyncio.run() creates one), and a
+        # timer scheduled on a finished loop would never fire
+        if self._timer is not None and self._timer_loop is not loop:
+            self._timer.cancel()
+            self._timer = None
+
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (lane, next(self._seq), tokens, future))
+        if self._timer is None:
+            self._dispatch()
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release_local()
+            raise
+
+    def _release_local(self) -> None:
+        self.in_flight -= 1
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+
+    # --- Cluster admission ---
+
+    @sync_to_async
+    def _try_acquire_cluster(self, lease: Lease) -> float:
+        """
+        Records a cluster-wide lease if the lane's share of the limits allows it.
+
+        Returns:
+            0 when admitted, otherwise the number of seconds to wait before retrying.
+        """
+        from .models import LLMLease
+
+        share = LANE_SHARES[lease.lane]
+        now = timezone.now()
+        with transaction.atomic():
+            # Serialize admission decisions across workers
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext('llm_governor'))")
+
+            active = LLMLease.objects.filter(released_at__isnull=True, expires_at__gt=now).count()
+            recent = LLMLease.objects.filter(acquired_at__gt=now - timedelta(minutes=1))
+            recent_count = recent.count()
+            recent_tokens = recent.aggregate(total=Sum("tokens"))["total"] or 0
+
+            if (
+                active >= self.max_in_flight * share
+                or recent_count >= self.requests_per_minute * share
+                or recent_tokens + lease.tokens > self.tokens_per_minute * share
+            ):
+                return 1.0
+
+            lease.db_id = LLMLease.objects.create(
+                lane=int(lease.lane),
+                tokens=lease.tokens,
+                acquired_at=now,
+                expires_at=now + timedelta(minutes=5),
+            ).id
+            return 0
+
+    @sync_to_async
+    def _release_cluster(self, lease: Lease) -> None:
+        from .models import LLMLease
+
+        now = timezone.now()
+        LLMLease.objects.filter(id=lease.db_id).update(released_at=now, tokens=lease.tokens)
+        LLMLease.objects.filter(acquired_at__lt=now - timedelta(hours=1)).delete()
+
+    # --- Public API ---
+
+    @asynccontextmanager
+    async def slot(self, lane: Lane, tokens: int):
+        """
+        Holds an admitted slot for the duration of one model call.
+
+        Yields:
+            The Lease; set lease.tokens to the actual usage before exiting.
+        """
+        lease = await self._acquire_local(lane, tokens)
+        try:
+            if self.cluster:
+                while (delay := await self._try_acquire_cluster(lease)) > 0:
+                    await asyncio.sleep(delay)
+            yield lease
+        finally:
+            if lease.db_id is not None:
+                await self._release_cluster(lease)
+            self._release_local()
+
+
+governor = LLMGovernor(
+    max_in_flight=getattr(settings, "LLM_MAX_IN_FLIGHT", 8),
+    requests_per_minute=getattr(settings, "LLM_REQUESTS_PER_MINUTE", 120),
+    tokens_per_minute=getattr(settings, "LLM_TOKENS_PER_MINUTE", 1_000_000),
+    cluster=getattr(settings, "LLM_GOVERNOR_CLUSTER", False),
+)
@@ -3,9 +3,11 @@ Shared helper functions for all agents.
 These functions prepare and format data for agent consumption.
 """
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from django.db.models import QuerySet
 
+from news.selectors import get_agent_articles
+
 from .schemas import (
     ArticleMetadata,
     ArticleContent,
@@ -22,10 +24,14 @@ from multi_agent_systems.dn_mas.schemas import (
 )
 
 
-def format_articles_for_agent(articles_qs: QuerySet) -> FormattedArticles:
+def format_articles_for_agent(articles_qs) -> FormattedArticles:
     """
-    Converts a queryset of Articles into a Pydantic model suitable for agent processing.
+    Converts Articles or AgentArticle rows into a Pydantic model suitable for agent processing.
+    A queryset is read as AgentArticle rows, so only the prompt columns are fetched.
     """
+    if isinstance(articles_qs, QuerySet):
+        articles_qs = get_agent_articles(articles_qs)
+
     articles = []
     metadata_list = []
     
@@ -34,7 +40,8 @@ def format_articles_for_agent(articles_qs: QuerySet) -> FormattedArticles:
             id=str(article.uuid),
             source=str(article.source) if article.source else "Unknown",
             title=article.title,
-            url=article.url
+            url=article.url,
+            syndicated_by=getattr(article, "syndicated_by", None)
         )
         content = ArticleContent(
             text=article.body or ""
@@ -89,3 +96,59 @@ def enrich_summary_to_app_model(
         summary_text=summary.summary_text,
         citations=enriched_citations
     )
+
+
+def format_summary_for_update(summary_obj, first_idx: int = 0) -> Tuple[dict, List[dict]]:
+    """
+    Converts a saved Summary and its citations back into the agent's raw format.
+
+    The cited articles are re-indexed from first_idx on, so they can follow the
+    new articles of an incremental update in one index space.
+
+    Returns:
+        (summary payload with indexed citations, metadata of the cited articles in index order)
+    """
+    metadata_list = []
+    uuid_to_idx = {}
+    citations = []
+
+    for citation in summary_obj.citations.prefetch_related("sources"):
+        sources = []
+        for source in citation.sources.all():
+            if source.article_uuid not in uuid_to_idx:
+                uuid_to_idx[source.article_uuid] = str(first_idx + len(metadata_list))
+                metadata_list.append(ArticleMetadata(
+                    id=source.article_uuid,
+                    source=source.article_source or "Unknown",
+                    title=source.article_title,
+                    url=source.article_url
+                ).model_dump())
+            sources.append({
+                "sentence": source.sentence,
+                "article_uuid": uuid_to_idx[source.article_uuid],
+                "expert_name": source.expert_name,
+            })
+        citations.append({
+            "summary_sentence": citation.summary_sentence,
+            "article_sentence_citations": sources,
+        })
+
+    return {"summary_text": summary_obj.summary_text, "citations": citations}, metadata_list
+
+
+def build_update_state(previous_summary, new_articles, context: str) -> Tuple[dict, List[dict]]:
+    """
+    Builds the incremental-update state: the new articles first, then the
+    previous summary with its cited articles indexed after them.
+
+    Returns:
+        (agent state, metadata list covering both for create_idx_to_metadata_map)
+    """
+    formatted = format_articles_for_agent(new_articles)
+    previous_payload, cited_metadata = format_summary_for_update(previous_summary, first_idx=len(formatted))
+    state = {
+        "articles": formatted.to_llm_dict(),
+        "previous_summary": previous_payload,
+        "context": context,
+    }
+    return state, formatted.get_metadata_list() + cited_metadata
@@ -0,0 +1,406 @@
+"""
+Model backends shared by all agents.
+
+Agents get their model through build_model() instead of a bare model name, so
+every call goes through the same wrapper, which applies the global
+concurrency governor and then dispatches to the configured backend:
+
+* gemini: the live Gemini endpoint
+* record: the live endpoint, appending every response to a recordings file
+* replay: responses read back from a recordings file, keyed by request fingerprint
+* fake: deterministic, schema-valid synthetic responses with configurable latency
+
+The backend is chosen by the LLM_BACKEND setting and can be overridden for a
+block of code with use_backend(), e.g. by the benchmark command.
+
+Each agent has its own model instance, which bounds the agent's calls by a
+deadline and hedges stragglers: once a call has run longer than the agent's
+p90 latency, a duplicate request is sent and the first valid response wins.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import statistics
+import time
+import typing
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from types import UnionType
+from typing import Optional
+
+from django.conf import settings
+from google.adk.models import Gemini, LlmResponse
+from google.genai import types
+from pydantic import BaseModel
+
+from .governor import current_lane, governor
+
+
+# Allowance for the response when estimating a request's token cost
+OUTPUT_TOKENS_ESTIMATE = 1024
+
+# Latencies kept per agent, and the number needed before hedging kicks in
+LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 10
+
+# Timestamps that change from run to run over the same articles (e.g. the
+# scheduler's "Automated scheduler run at ..." context), masked in fingerprints
+TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?")
+
+# Article indices the current run's prompts refer to (see use_article_ids)
+current_article_ids: ContextVar[tuple] = ContextVar("llm_article_ids", default=())
+
+
+@contextmanager
+def use_article_ids(article_ids):
+    """Exposes the indices of the articles in the enclosed run's prompts to the backends."""
+    token = current_article_ids.set(tuple(str(idx) for idx in article_ids))
+    try:
+        yield
+    finally:
+        current_article_ids.reset(token)
+
+
+def _request_text(llm_request) -> str:
+    text = str(llm_request.config.system_instruction or "") if llm_request.config else ""
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            text += part.text or ""
+    return text
+
+
+def estimate_request_tokens(llm_request) -> int:
+    """Rough token estimate (~4 characters per token) of a request's prompt plus its response."""
+    return len(_request_text(llm_request)) // 4 + OUTPUT_TOKENS_ESTIMATE
+
+
+def request_fingerprint(llm_request) -> str:
+    """
+    Stable key of a request's prompt and output schema, used for record/replay.
+
+    The model is left out, as the tier policy may route the same prompt to
+    another model, and timestamps are masked, so a recording replays for the
+    same articles whenever it is run.
+    """
+    schema = llm_request.config.response_schema if llm_request.config else None
+    payload = json.dumps(
+        [
+            getattr(schema, "__name__", None),
+            str(llm_request.config.system_instruction or "") if llm_request.config else "",
+            [
+                [part.text for part in content.parts or [] if part.text]
+                for content in llm_request.contents
+            ],
+        ]
+    )
+    return hashlib.sha256(TIMESTAMP_PATTERN.sub("<timestamp>", payload).encode()).hexdigest()
+
+
+def _text_response(text: str, prompt_tokens: int) -> LlmResponse:
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=len(text) // 4,
+            total_token_count=prompt_tokens + len(text) // 4,
+        ),
+    )
+
+
+# --- Backends ---
+
+class GeminiBackend:
+    """The live Gemini endpoint."""
+
+    async def generate(self, model: Gemini, llm_request, stream: bool):
+        async for response in Gemini.generate_content_async(model, llm_request, stream):
+            yield response
+
+
+class RecordingBackend(GeminiBackend):
+    """The live Gemini endpoint, appending each final response to a JSONL recordings file."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    async def generate(self, model: Gemini, llm_request, stream: bool):
+        key = request_fingerprint(llm_request)
+        started = time.monotonic()
+        async for response in super().generate(model, llm_request, stream):
+            if not response.partial and response.content:
+                usage = response.usage_metadata
+                record = {
+                    "key": key,
+                    "model": llm_request.model,
+                    "latency": round(time.monotonic() - started, 3),
+                    "text": "".join(part.text or "" for part in response.content.parts or []),
+                    "prompt_tokens": usage.prompt_token_count if usage else None,
+                }
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open("a") as f:
+                    f.write(json.dumps(record) + "\n")
+            yield response
+
+
+class ReplayBackend:
+    """
+    Replays responses from a recordings file.
+    Repeated identical requests are served in recording order.
+    """
+
+    def __init__(self, path: str, latency: Optional[float] = None):
+        self.latency = latency
+        self.records = defaultdict(deque)
+        with Path(path).open() as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self.records[record["key"]].append(record)
+
+    async def generate(self, model: Gemini, llm_request, stream: bool):
+        key = request_fingerprint(llm_request)
+        queue = self.records.get(key)
+        if not queue:
+            raise LookupError(f"No recorded response for request {key[:12]} ({llm_request.model})")
+
+        # Keep the last recording available for further repeats
+        record = queue.popleft() if len(queue) > 1 else queue[0]
+        await asyncio.sleep(record["latency"] if self.latency is None else self.latency)
+        prompt_tokens = record.get("prompt_tokens") or len(_request_text(llm_request)) // 4
+        yield _text_response(record["text"], prompt_tokens)
+
+
+class FakeBackend:
+    """
+    Deterministic synthetic responses.
+
+    Structured agents get a schema-valid instance of their output_schema whose
+    citations point at the run's article indices (use_article_ids); free-text agents
+    get a short synthetic narrative. The same request always yields the same output.
+    """
+
+    def __init__(self, latency: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.seed = seed
+
+    async def generate(self, model: Gemini, llm_request, stream: bool):
+        text = _request_text(llm_request)
+        rng = random.Random(f"{self.seed}:{request_fingerprint(llm_request)}")
+        article_ids = list(current_article_ids.get()) or ["0"]
+
+        schema = llm_request.config.response_schema if llm_request.config else None
+        if isinstance(schema, type) and issubclass(schema, BaseModel):
+            output = schema.model_validate(synthesize(schema, rng, article_ids)).model_dump_json()
+        else:
+            output = " ".join(
+                f"Synthetic narrative {i} drawn from article {rng.choice(article_ids)}."
+                for i in range(1, 4)
+            )
+
+        await asyncio.sleep(self.latency)
+        yield _text_response(output, len(text) // 4)
+
+
+def synthesize(annotation, rng: random.Random, article_ids: list, field_name: str = ""):
+    """Builds plain data that validates against the given type annotation."""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return {
+            name: synthesize(field.annotation, rng, article_ids, name)
+            for name, field in annotation.model_fields.items()
+        }
+    if origin is typing.Literal:
+        return rng.choice(args)
+    if origin in (typing.Union, UnionType):
+        return synthesize(next(a for a in args if a is not type(None)), rng, article_ids, field_name)
+    if origin in (list, typing.List):
+        return [synthesize(args[0], rng, article_ids, field_name) for _ in range(rng.randint(1, 2))]
+    if origin in (dict, typing.Dict):
+        return {"synthetic": synthesize(args[1], rng, article_ids, field_name)}
+    if annotation is bool:
+        return rng.random() < 0.5
+    if annotation is int:
+        return rng.randint(1, 500)
+    if annotation is float:
+        return round(rng.uniform(0, 10), 2)
+    if field_name == "article_uuid":
+        return rng.choice(article_ids)
+    return f"Synthetic {field_name.replace('_', ' ') or 'text'} {rng.randint(1, 999)}."
+
+
+def _backend_from_settings():
+    name = getattr(settings, "LLM_BACKEND", "gemini")
+    if name == "fake":
+        return FakeBackend(latency=getattr(settings, "LLM_FAKE_LATENCY_SECONDS", 0.0))
+    if name == "replay":
+        return ReplayBackend(settings.LLM_RECORDINGS_PATH)
+    if name == "record":
+        return RecordingBackend(settings.LLM_RECORDINGS_PATH)
+    return GeminiBackend()
+
+
+_backend_override: ContextVar = ContextVar("llm_backend", default=None)
+_default_backend = None
+
+
+def get_backend():
+    """The backend for the current context: an active use_backend() override or the configured one."""
+    global _default_backend
+    backend = _backend_override.get()
+    if backend is not None:
+        return backend
+    if _default_backend is None:
+        _default_backend = _backend_from_settings()
+    return _default_backend
+
+
+@contextmanager
+def use_backend(backend):
+    """Routes every model call made inside the block to the given backend."""
+    token = _backend_override.set(backend)
+    try:
+        yield backend
+    finally:
+        _backend_override.reset(token)
+
+
+# --- Latency tracking ---
+
+class LatencyTracker:
+    """Recent successful call latencies per "agent/model" key, for hedging and tier decisions."""
+
+    def __init__(self, window: int = LATENCY_WINDOW, min_samples: int = HEDGE_MIN_SAMPLES):
+        self.min_samples = min_samples
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, key: str, seconds: float) -> None:
+        self._samples[key].append(seconds)
+
+    def quantile(self, key: str, q: float = 0.9) -> Optional[float]:
+        """The key's q-quantile latency, or None until enough calls were observed."""
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        return statistics.quantiles(samples, n=100, method="inclusive")[round(q * 100) - 1]
+
+
+latency_tracker = LatencyTracker()
+
+
+def is_valid_response(response: LlmResponse, llm_request) -> bool:
+    """Whether a final response has content that conforms to the request's output schema."""
+    if response.error_code or not response.content or not response.content.parts:
+        return False
+
+    schema = llm_request.config.response_schema if llm_request.config else None
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        try:
+            schema.model_validate_json("".join(part.text or "" for part in response.content.parts))
+        except ValueError:
+            return False
+    return True
+
+
+# --- Agent model ---
+
+class GovernedGemini(Gemini):
+    """
+    Gemini model whose calls are admitted by the LLM governor and served by the active backend.
+
+    Non-streaming calls are hedged after the agent's p90 latency and bounded
+    by `deadline`; a call that misses its deadline returns a DEADLINE_EXCEEDED
+    error response, so the agent produces no output instead of failing its
+    siblings in a ParallelAgent.
+    """
+
+    agent_name: Optional[str] = None
+    deadline: Optional[float] = None
+    hedge: bool = True
+
+    def _latency_key(self, llm_request) -> str:
+        # Per agent and model, as the tier policy may route an agent to another model
+        return f"{self.agent_name}/{llm_request.model or self.model}"
+
+    async def _governed_call(self, llm_request, stream: bool):
+        backend = get_backend()
+        async with governor.slot(current_lane.get(), estimate_request_tokens(llm_request)) as lease:
+            async for response in backend.generate(self, llm_request, stream):
+                if response.usage_metadata and response.usage_metadata.total_token_count:
+                    lease.tokens = response.usage_metadata.total_token_count
+                yield response
+
+    async def _final_response(self, llm_request) -> LlmResponse:
+        started = time.monotonic()
+        response = None
+        async for response in self._governed_call(llm_request, stream=False):
+            pass
+        if response is not None and not response.error_code:
+            latency_tracker.record(self._latency_key(llm_request), time.monotonic() - started)
+        return response
+
+    async def _hedged_response(self, llm_request) -> LlmResponse:
+        """Returns the first valid response of the primary call and, if it straggles, its hedge."""
+        hedge_after = latency_tracker.quantile(self._latency_key(llm_request)) if self.hedge else None
+        pending = {asyncio.create_task(self._final_response(llm_request))}
+        try:
+            if hedge_after is not None:
+                done, _ = await asyncio.wait(pending, timeout=hedge_after)
+                if not done:
+                    pending.add(asyncio.create_task(self._final_response(llm_request)))
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and is_valid_response(task.result(), llm_request):
+                        return task.result()
+                    last = task
+            # Neither call produced a valid response: surface the last outcome as is
+            return last.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        if stream:
+            async for response in self._governed_call(llm_request, stream):
+                yield response
+            return
+
+        try:
+            async with asyncio.timeout(self.deadline):
+                response = await self._hedged_response(llm_request)
+        except TimeoutError:
+            yield LlmResponse(
+                error_code="DEADLINE_EXCEEDED",
+                error_message=f"{self.agent_name or self.model} exceeded its {self.deadline}s deadline",
+            )
+            return
+        yield response
+
+
+def build_model(model_name: Optional[str] = None, agent_name: Optional[str] = None) -> GovernedGemini:
+    """
+    Returns the model instance an agent should use.
+
+    Without a model name the agent's configured tier model is used (see tiers).
+    The agent's call deadline comes from LLM_AGENT_DEADLINES, falling back to
+    LLM_DEFAULT_DEADLINE_SECONDS.
+    """
+    if model_name is None:
+        from .tiers import get_agent_tier, get_tier_model
+        model_name = get_tier_model(get_agent_tier(agent_name))
+
+    deadlines = getattr(settings, "LLM_AGENT_DEADLINES", {})
+    return GovernedGemini(
+        model=model_name,
+        agent_name=agent_name,
+        deadline=deadlines.get(agent_name, getattr(settings, "LLM_DEFAULT_DEADLINE_SECONDS", None)),
+    )
@@ -0,0 +1,140 @@
+"""
+Management command to benchmark the DN-MAS and ST-MAS pipelines offline.
+
+Model calls are served by the fake or replay backend, so the timings cover
+selection, formatting, orchestration, enrichment and persistence without any
+provider latency.
+"""
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.selectors import get_articles_from_db, get_agent_articles
+from multi_agent_systems.benchmarking import (
+    add_backend_arguments, add_window_arguments, build_backend, get_window, local_context_cache
+)
+from multi_agent_systems.helpers import (
+    format_articles_for_agent,
+    create_idx_to_metadata_map,
+    enrich_summary_to_app_model
+)
+from multi_agent_systems.llm import use_backend
+from multi_agent_systems.dn_mas.runner import dn_mas_runner
+from multi_agent_systems.dn_mas.schemas import SummaryWithCitations
+from multi_agent_systems.st_mas.runner import st_mas_runner
+from multi_agent_systems.st_mas.schemas import convert_topic_analysis_indexes_to_uuids
+from multi_agent_systems.services import save_dn_mas_summary, save_st_mas_collection
+
+
+class Command(BaseCommand):
+    help = "Benchmark the agent pipelines end-to-end against the fake or replay model backend"
+
+    def add_arguments(self, parser):
+        add_backend_arguments(parser)
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=5,
+            help='Number of benchmark iterations (default: 5)'
+        )
+        add_window_arguments(parser)
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=5,
+            help='Maximum number of articles to process (default: 5)'
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the saved rows instead of rolling them back'
+        )
+
+    def handle(self, *args, **options):
+        backend = build_backend(options)
+
+        self.stdout.write(self.style.HTTP_INFO("=" * 50))
+        self.stdout.write(self.style.HTTP_INFO(f"⏱️  MAS Pipeline Benchmark ({options['backend']} backend)"))
+        self.stdout.write(self.style.HTTP_INFO("=" * 50))
+
+        timings = defaultdict(list)
+
+        @contextmanager
+        def timed(stage):
+            started = time.perf_counter()
+            yield
+            timings[stage].append(time.perf_counter() - started)
+
+        start_date, end_date = get_window(options)
+
+        with use_backend(backend), local_context_cache():
+            for _ in range(options['iterations']):
+                with timed("select"):
+                    articles_list = get_agent_articles(get_articles_from_db(start_date, end_date)[:options['limit']])
+
+                if not articles_list:
+                    self.stdout.write(self.style.WARNING("⚠️  No articles found."))
+                    return
+
+                with timed("format"):
+                    formatted = format_articles_for_agent(articles_list)
+                    metadata_list = formatted.get_metadata_list()
+                    idx_to_metadata = create_idx_to_metadata_map(metadata_list)
+                    initial_state = {
+                        "articles": formatted.to_llm_dict(),
+                        "context": "benchmark run",
+                    }
+
+                with timed("dn_mas.run"):
+                    dn_state = asyncio.run(dn_mas_runner(initial_state))
+
+                with timed("dn_mas.enrich"):
+                    raw_result = SummaryWithCitations(**dn_state["summary_with_citations"])
+                    enriched_summary = enrich_summary_to_app_model(raw_result, idx_to_metadata)
+
+                with timed("st_mas.run"):
+                    st_state = asyncio.run(st_mas_runner(initial_state))
+
+                # Topics that failed or missed the deadline come back as None
+                missing = [key for key, value in st_state.items() if value is None]
+                if missing:
+                    self.stdout.write(self.style.WARNING(f"⚠️  Missing topics: {', '.join(missing)}"))
+
+                with timed("st_mas.convert"):
+                    topic_collection = convert_topic_analysis_indexes_to_uuids(
+                        llm_output={key: value for key, value in st_state.items() if value is not None},
+                        article_uuids=metadata_list
+                    )
+
+                with transaction.atomic():
+                    with timed("dn_mas.persist"):
+                        save_dn_mas_summary(
+                            enriched_summary=enriched_summary,
+                            articles_list=articles_list,
+                            start_date=start_date,
+                            end_date=end_date,
+                            agent_name="benchmark"
+                        )
+                    with timed("st_mas.persist"):
+                        save_st_mas_collection(
+                            collection=topic_collection,
+                            articles_list=articles_list,
+                            agent_name="benchmark"
+                        )
+                    if not options['keep']:
+                        transaction.set_rollback(True)
+
+        self.stdout.write(f"\n📰 {len(articles_list)} articles, {options['iterations']} iterations\n")
+        self.stdout.write(f"{'stage':<18}{'mean ms':>10}{'p50 ms':>10}{'max ms':>10}")
+        for stage, values in timings.items():
+            self.stdout.write(
+                f"{stage:<18}"
+                f"{statistics.mean(values) * 1000:>10.1f}"
+                f"{statistics.median(values) * 1000:>10.1f}"
+                f"{max(values) * 1000:>10.1f}"
+            )
@@ -0,0 +1,157 @@
+"""
+Management command to compare the ST-MAS fan-out strategies.
+
+Every strategy (one call per topic, grouped, all topics in one call) runs on
+the same article windows, per window size, and reports its latency, token
+usage and schema-failure rate. Model calls are served by the fake or replay
+backend; record each strategy once with LLM_BACKEND=record to replay real
+latencies and outputs.
+"""
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pydantic import ValidationError
+
+from news.selectors import get_articles_from_db, get_agent_articles
+from multi_agent_systems.benchmarking import (
+    add_backend_arguments, add_window_arguments, build_backend, get_window, local_context_cache
+)
+from multi_agent_systems.helpers import format_articles_for_agent
+from multi_agent_systems.llm import use_backend
+from multi_agent_systems.st_mas.runner import st_mas_runner, FanOut, PASSAGES_PER_TOPIC
+from multi_agent_systems.st_mas.schemas import TopicSummaryAndAnalysisLLM
+
+
+class MeteredBackend:
+    """Delegates to another backend, counting its calls and tokens."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.tokens = 0
+
+    async def generate(self, model, llm_request, stream: bool):
+        self.calls += 1
+        async for response in self.backend.generate(model, llm_request, stream):
+            if not response.partial and response.usage_metadata:
+                self.tokens += response.usage_metadata.total_token_count or 0
+            yield response
+
+
+def count_schema_failures(results: dict) -> int:
+    """Topics without an output that validates against the topic schema."""
+    failures = 0
+    for value in results.values():
+        try:
+            TopicSummaryAndAnalysisLLM.model_validate(value)
+        except ValidationError:
+            failures += 1
+    return failures
+
+
+class Command(BaseCommand):
+    help = "Benchmark the ST-MAS fan-out strategies (latency, tokens, schema failures) per window size"
+
+    def add_arguments(self, parser):
+        add_backend_arguments(parser)
+        parser.add_argument(
+            '--fan-outs',
+            default=",".join(f.value for f in FanOut),
+            help='Comma-separated strategies to compare (default: all)'
+        )
+        parser.add_argument(
+            '--group-size',
+            type=int,
+            default=settings.ST_MAS_GROUP_SIZE,
+            help=f'Topics per call for the grouped strategy (default: {settings.ST_MAS_GROUP_SIZE})'
+        )
+        parser.add_argument(
+            '--sizes',
+            default="5,10,20",
+            help='Comma-separated window sizes in articles (default: 5,10,20)'
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=PASSAGES_PER_TOPIC,
+            help=f'Number of retrieved passages per topic, 0 sends the full articles (default: {PASSAGES_PER_TOPIC})'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=3,
+            help='Runs per strategy and window size (default: 3)'
+        )
+        add_window_arguments(parser)
+
+    def handle(self, *args, **options):
+        meter = MeteredBackend(build_backend(options))
+
+        fan_outs = [FanOut(name.strip()) for name in options['fan_outs'].split(",")]
+        sizes = [int(size) for size in options['sizes'].split(",")]
+        top_k = options['top_k'] or None
+
+        self.stdout.write(self.style.HTTP_INFO("=" * 50))
+        self.stdout.write(self.style.HTTP_INFO(f"⏱️  ST-MAS Fan-out Benchmark ({options['backend']} backend)"))
+        self.stdout.write(self.style.HTTP_INFO("=" * 50))
+
+        start_date, end_date = get_window(options)
+        articles = get_agent_articles(get_articles_from_db(start_date, end_date)[:max(sizes)])
+        if not articles:
+            self.stdout.write(self.style.WARNING("⚠️  No articles found."))
+            return
+
+        rows = []
+        with use_backend(meter), local_context_cache():
+            for size in sizes:
+                formatted = format_articles_for_agent(articles[:size])
+                initial_state = {
+                    "articles": formatted.to_llm_dict(),
+                    "context": "benchmark run",
+                }
+
+                for fan_out in fan_outs:
+                    stats = defaultdict(list)
+                    for _ in range(options['iterations']):
+                        meter.reset()
+                        started = time.perf_counter()
+                        try:
+                            results = asyncio.run(st_mas_runner(
+                                initial_state,
+                                top_k=top_k,
+                                fan_out=fan_out,
+                                group_size=options['group_size'],
+                            ))
+                            failures = count_schema_failures(results)
+                        except Exception as e:
+                            self.stdout.write(self.style.ERROR(f"❌ {fan_out.value} ({size} articles) failed: {e}"))
+                            results, failures = {}, None
+                        stats["latency"].append(time.perf_counter() - started)
+                        stats["calls"].append(meter.calls)
+                        stats["tokens"].append(meter.tokens)
+                        # A failed run loses every topic; a run without topics has none to lose
+                        if failures is None:
+                            stats["failure_rate"].append(1.0)
+                        else:
+                            stats["failure_rate"].append(failures / len(results) if results else 0.0)
+                    rows.append((len(formatted.articles), fan_out.value, stats))
+
+        self.stdout.write(
+            f"\n{'articles':>8}  {'fan-out':<12}{'mean s':>9}{'max s':>9}{'calls':>7}{'tokens':>10}{'failed':>9}"
+        )
+        for size, fan_out, stats in rows:
+            self.stdout.write(
+                f"{size:>8}  {fan_out:<12}"
+                f"{statistics.mean(stats['latency']):>9.2f}"
+                f"{max(stats['latency']):>9.2f}"
+                f"{statistics.mean(stats['calls']):>7.1f}"
+                f"{statistics.mean(stats['tokens']):>10.0f}"
+                f"{statistics.mean(stats['failure_rate']):>9.1%}"
+            )
@@ -0,0 +1,60 @@
+"""
+Management command applying the retention policy to articles and agent outputs.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from news.services import prune_articles
+from multi_agent_systems.services import prune_agent_outputs
+
+
+class Command(BaseCommand):
+    help = "Delete (and optionally archive) articles and agent outputs older than the retention period"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--article-days',
+            type=int,
+            default=settings.NEWS_RETENTION_DAYS,
+            help=f'Keep articles published in the last N days (default: {settings.NEWS_RETENTION_DAYS})'
+        )
+        parser.add_argument(
+            '--output-days',
+            type=int,
+            default=settings.MAS_RETENTION_DAYS,
+            help=f'Keep summaries and topic groups created in the last N days (default: {settings.MAS_RETENTION_DAYS})'
+        )
+        parser.add_argument(
+            '--archive-dir',
+            help='Append expired rows to monthly gzip JSONL archives in this directory before deleting them'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Articles deleted per transaction; agent outputs use a tenth (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        batch_size = options['batch_size']
+
+        # Outputs first: articles they still reference are kept
+        summaries, groups = prune_agent_outputs(
+            now - timedelta(days=options['output_days']),
+            batch_size=max(batch_size // 10, 1),
+            archive_dir=options['archive_dir']
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ Pruned {summaries} summaries and {groups} topic groups."))
+
+        articles = prune_articles(
+            now - timedelta(days=options['article_days']),
+            batch_size=batch_size,
+            archive_dir=options['archive_dir']
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ Pruned {articles} articles."))
+        if options['archive_dir']:
+            self.stdout.write(f"   ∟ Archived to {options['archive_dir']}")
@@ -7,15 +7,19 @@ from datetime import timedelta
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
-from news.selectors import get_articles_from_db
+from news.selectors import get_articles_from_db, get_agent_articles
 from multi_agent_systems.helpers import (
     format_articles_for_agent,
     create_idx_to_metadata_map,
-    enrich_summary_to_app_model
+    enrich_summary_to_app_model,
+    build_update_state
+)
+from multi_agent_systems.dn_mas.runner import (
+    dn_mas_runner, dn_mas_hierarchical_runner, dn_mas_update_runner, BATCH_SIZE
 )
-from multi_agent_systems.dn_mas.runner import dn_mas_runner
 from multi_agent_systems.dn_mas.schemas import SummaryWithCitations
-from multi_agent_systems.services import save_dn_mas_summary
+from multi_agent_systems.services import save_dn_mas_summary, plan_incremental_update
+from multi_agent_systems.tiers import collect_model_tiers
 
 
 class Command(BaseCommand):
@@ -44,12 +48,29 @@ class Command(BaseCommand):
             action='store_true',
             help='Save the summary and citations to the database'
         )
+        parser.add_argument(
+            '--hierarchical',
+            action='store_true',
+            help='Summarize batches in parallel and merge them (map-reduce)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help=f'Articles per batch in hierarchical mode (default: {BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Revise the latest saved test_dn_mas summary with the articles it has not seen'
+        )
 
     def handle(self, *args, **options):
         days = options['days']
         filter_sources = options['filter_sources']
         limit = options['limit']
         save_to_db = options['save']
+        hierarchical = options['hierarchical']
         
         self.stdout.write(self.style.HTTP_INFO("=" * 50))
         self.stdout.write(self.style.HTTP_INFO("🧪 DN-MAS Pipeline Test"))
@@ -62,7 +83,7 @@ class Command(BaseCommand):
         self.stdout.write(f"\n📅 Date range: {start_date.date()} to {end_date.date()}")
         
         articles_qs = get_articles_from_db(start_date, end_date, filter_sources)
-        articles_list = list(articles_qs[:limit])
+        articles_list = get_agent_articles(articles_qs[:limit])
         
         if not articles_list:
             self.stdout.write(self.style.WARNING("⚠️  No articles found."))
@@ -78,14 +99,37 @@ class Command(BaseCommand):
             "articles": formatted.to_llm_dict(),
             "context": "those are fomc articles",
         }
+
+        previous_summary = None
+        if options['incremental']:
+            plan = plan_incremental_update(articles_list, agent_name="test_dn_mas")
+            if plan is None:
+                self.stdout.write("ℹ️  No summary to update (or too many changes): running in full")
+            else:
+                previous_summary, new_articles = plan
+                if not new_articles:
+                    self.stdout.write(self.style.WARNING(f"⚠️  No new articles since Summary {previous_summary.uuid}."))
+                    return
+                self.stdout.write(f"🔁 Updating Summary {previous_summary.uuid} with {len(new_articles)} new articles")
+                initial_state, update_metadata = build_update_state(
+                    previous_summary, new_articles, initial_state["context"]
+                )
+                idx_to_metadata = create_idx_to_metadata_map(update_metadata)
         
         # Step 3: Run the agent pipeline
         self.stdout.write("\n🤖 Running DN-MAS pipeline...")
         
         try:
-            final_state = asyncio.run(dn_mas_runner(initial_state))
+            if previous_summary is not None:
+                final_state = asyncio.run(dn_mas_update_runner(initial_state))
+            elif hierarchical:
+                final_state = asyncio.run(
+                    dn_mas_hierarchical_runner(initial_state, batch_size=options['batch_size'])
+                )
+            else:
+                final_state = asyncio.run(dn_mas_runner(initial_state))
             
-            if "summary_with_citations" in final_state:
+            if final_state.get("summary_with_citations"):
                 # 1. RAW Agent Output (Indices)
                 raw_result = SummaryWithCitations(**final_state["summary_with_citations"])
                 
@@ -120,7 +164,9 @@ class Command(BaseCommand):
                         articles_list=articles_list,
                         start_date=start_date,
                         end_date=end_date,
-                        agent_name="test_dn_mas"
+                        agent_name="test_dn_mas",
+                        model_tiers=collect_model_tiers(final_state),
+                        previous=previous_summary
                     )
                     self.stdout.write(self.style.SUCCESS(f"✅ Saved Summary: {summary_obj.uuid}"))
             
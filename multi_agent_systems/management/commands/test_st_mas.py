@@ -4,15 +4,16 @@ Management command to test the ST-MAS (Static Topic Multi-Agent System) pipeline
 import asyncio
 from datetime import timedelta
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
-from news.selectors import get_articles_from_db
+from news.selectors import get_articles_from_db, get_agent_articles
 from multi_agent_systems.helpers import (
     format_articles_for_agent,
     create_idx_to_metadata_map,
 )
-from multi_agent_systems.st_mas.runner import st_mas_runner
+from multi_agent_systems.st_mas.runner import st_mas_runner, FanOut, PASSAGES_PER_TOPIC
 from multi_agent_systems.st_mas.schemas import (
     convert_topic_analysis_indexes_to_uuids,
     print_topic_summary
@@ -46,12 +47,31 @@ class Command(BaseCommand):
             action='store_true',
             help='Save the analysis collection to the database'
         )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=PASSAGES_PER_TOPIC,
+            help=f'Number of retrieved passages per topic agent, 0 sends the full articles (default: {PASSAGES_PER_TOPIC})'
+        )
+        parser.add_argument(
+            '--fan-out',
+            choices=[f.value for f in FanOut],
+            default=settings.ST_MAS_FAN_OUT,
+            help=f'Topics per model call: one, a group or all of them (default: {settings.ST_MAS_FAN_OUT})'
+        )
+        parser.add_argument(
+            '--group-size',
+            type=int,
+            default=settings.ST_MAS_GROUP_SIZE,
+            help=f'Topics per call with --fan-out grouped (default: {settings.ST_MAS_GROUP_SIZE})'
+        )
 
     def handle(self, *args, **options):
         days = options['days']
         filter_sources = options['filter_sources']
         limit = options['limit']
         save_to_db = options['save']
+        top_k = options['top_k'] or None
         
         self.stdout.write(self.style.HTTP_INFO("=" * 50))
         self.stdout.write(self.style.HTTP_INFO("🧪 ST-MAS Pipeline Test"))
@@ -64,7 +84,7 @@ class Command(BaseCommand):
         self.stdout.write(f"\n📅 Date range: {start_date.date()} to {end_date.date()}")
         
         articles_qs = get_articles_from_db(start_date, end_date, filter_sources)
-        articles_list = list(articles_qs[:limit])
+        articles_list = get_agent_articles(articles_qs[:limit])
         
         if not articles_list:
             self.stdout.write(self.style.WARNING("⚠️  No articles found."))
@@ -87,11 +107,21 @@ class Command(BaseCommand):
         
         try:
             # 1. Run the agent
-            final_state = asyncio.run(st_mas_runner(initial_state))
+            final_state = asyncio.run(st_mas_runner(
+                initial_state,
+                top_k=top_k,
+                fan_out=FanOut(options['fan_out']),
+                group_size=options['group_size'],
+            ))
             
+            # Topics that failed or missed the deadline come back as None
+            missing = [key for key, value in final_state.items() if value is None]
+            if missing:
+                self.stdout.write(self.style.WARNING(f"⚠️  Missing topics: {', '.join(missing)}"))
+
             # 2. Convert indices to UUIDs and enrich with metadata
             topic_analysis_collection = convert_topic_analysis_indexes_to_uuids(
-                llm_output=final_state,
+                llm_output={key: value for key, value in final_state.items() if value is not None},
                 article_uuids=metadata_list
             )
             
@@ -0,0 +1,24 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multi_agent_systems', '0002_topicanalysisgroup_topicanalysis_topiccitation_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lane', models.IntegerField()),
+                ('tokens', models.IntegerField(default=0)),
+                ('acquired_at', models.DateTimeField(db_index=True)),
+                ('expires_at', models.DateTimeField()),
+                ('released_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multi_agent_systems', '0003_llmlease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topicanalysisgroup',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='topicanalysisgroup',
+            name='status',
+            field=models.CharField(choices=[('in_progress', 'In progress'), ('complete', 'Complete'), ('partial', 'Partial')], default='complete', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multi_agent_systems', '0004_topicanalysisgroup_status_completed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topicanalysis',
+            name='is_complete',
+            field=models.BooleanField(default=True),
+        ),
+    ]
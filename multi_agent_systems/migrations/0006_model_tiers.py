@@ -0,0 +1,23 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multi_agent_systems', '0005_topicanalysis_is_complete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summary',
+            name='model_tiers',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='topicanalysis',
+            name='model_tier',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multi_agent_systems', '0006_model_tiers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summary',
+            name='is_provisional',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='summary',
+            name='superseded_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='supersedes', to='multi_agent_systems.summary'),
+        ),
+    ]
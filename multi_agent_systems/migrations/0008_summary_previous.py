@@ -0,0 +1,19 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multi_agent_systems', '0007_summary_provisional'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summary',
+            name='previous',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updates', to='multi_agent_systems.summary'),
+        ),
+    ]
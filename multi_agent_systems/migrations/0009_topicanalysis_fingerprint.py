@@ -0,0 +1,24 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multi_agent_systems', '0008_summary_previous'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topicanalysis',
+            name='input_fingerprint',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='topicanalysis',
+            name='reused_from',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reuses', to='multi_agent_systems.topicanalysis'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:52
+
+import django.core.validators
+from django.db import migrations, models
+
+
+# Frozen seed: the predefined topics (formerly the Topic enum) when the registry was introduced
+PREDEFINED_TOPICS = [
+    ("housing", "Real Estate & Housing Market", "housing home prices mortgage rates real estate sales construction rent"),
+    ("labor", "Labor Market & Unemployment", "labor jobs employment unemployment payrolls wages hiring workers"),
+    ("inflation", "Inflation & Price Stability", "inflation prices cpi pce core price stability tariffs costs"),
+    ("gdp", "Economic Growth & GDP", "economy growth gdp recession output expansion slowdown"),
+    ("consumer", "Consumer Spending & Retail", "consumer spending retail sales households demand confidence"),
+    ("interest_rate", "Interest Rate & Monetary Policy", "fed rate cut hike funds rate monetary policy powell fomc basis points"),
+    ("forex", "Foreign Exchange & Currency Markets", "dollar currency exchange euro yen forex"),
+    ("equity", "Equity Markets & Stock Performance", "stocks equities shares s&p nasdaq dow market rally selloff"),
+    ("bonds", "Fixed Income & Bond Markets", "treasury bonds yields notes fixed income curve"),
+]
+
+
+def seed_topics(apps, schema_editor):
+    AnalysisTopic = apps.get_model("multi_agent_systems", "AnalysisTopic")
+    AnalysisTopic.objects.bulk_create([
+        AnalysisTopic(key=key, label=label, keywords=keywords, position=position)
+        for position, (key, label, keywords) in enumerate(PREDEFINED_TOPICS)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multi_agent_systems', '0009_topicanalysis_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisTopic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.SlugField(unique=True, validators=[django.core.validators.RegexValidator('^[a-z][a-z0-9_]*$', 'Use lowercase letters, digits and underscores.')])),
+                ('label', models.CharField(max_length=200)),
+                ('keywords', models.TextField(blank=True, help_text='Retrieval query terms')),
+                ('prompt', models.TextField(blank=True, help_text='Custom analysis instructions, blank for the default prompt. Curly braces are not allowed.')),
+                ('version', models.PositiveIntegerField(default=1, editable=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['position', 'key'],
+            },
+        ),
+        migrations.RunPython(seed_topics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.1.2 on 2026-10-19 06:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multi_agent_systems', '0010_analysistopic'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summary',
+            name='snapshot',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='topicanalysisgroup',
+            name='snapshot',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
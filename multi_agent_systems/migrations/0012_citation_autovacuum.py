@@ -0,0 +1,29 @@
+# Generated by Django 6.1.2 on 2026-10-19 06:10
+
+from django.db import migrations
+
+
+# Same autovacuum thresholds as news_article (news 0008): the largest agent-output
+# tables shrink in retention batches and should be vacuumed in small passes
+AUTOVACUUM = "autovacuum_vacuum_scale_factor = 0.02, autovacuum_analyze_scale_factor = 0.01"
+TABLES = [
+    "multi_agent_systems_citation",
+    "multi_agent_systems_citationsource",
+    "multi_agent_systems_topiccitation",
+    "multi_agent_systems_topiccitationsource",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multi_agent_systems', '0011_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f"ALTER TABLE {table} SET ({AUTOVACUUM})",
+            f"ALTER TABLE {table} RESET (autovacuum_vacuum_scale_factor, autovacuum_analyze_scale_factor)",
+        )
+        for table in TABLES
+    ]
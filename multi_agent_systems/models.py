@@ -1,9 +1,56 @@
 import uuid
+from django.core.exceptions import ValidationError
+from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 
 from news.models import Article
 
 
+class SummaryQuerySet(models.QuerySet):
+
+    def with_usage_counts(self):
+        """
+        Annotates provided_count and used_count (distinct cited articles) with
+        one subquery each, read by articles_provided_count / articles_used_count.
+        """
+        provided = (
+            Summary.articles_provided.through.objects
+            .filter(summary=OuterRef("pk"))
+            .order_by()
+            .values("summary")
+            .annotate(count=Count("*"))
+            .values("count")
+        )
+        used = (
+            CitationSource.objects
+            .filter(citation__summary=OuterRef("pk"), article__isnull=False)
+            .order_by()
+            .values("citation__summary")
+            .annotate(count=Count("article", distinct=True))
+            .values("count")
+        )
+        return self.annotate(
+            provided_count=Coalesce(Subquery(provided), 0),
+            used_count=Coalesce(Subquery(used), 0),
+        )
+
+    def with_articles_used(self):
+        """
+        Prefetches the cited articles of every summary in one batch, read by articles_used.
+        """
+        return self.prefetch_related(Prefetch(
+            "citations",
+            queryset=Citation.objects.prefetch_related(Prefetch(
+                "sources",
+                queryset=CitationSource.objects.filter(article__isnull=False).select_related("article").order_by("id"),
+                to_attr="cited_sources",
+            )),
+            to_attr="used_citations",
+        ))
+
+
 class Summary(models.Model):
     """
     Stores the generated summary from the DN-MAS pipeline.
@@ -23,6 +70,31 @@ class Summary(models.Model):
     
     # Agent info
     agent_name = models.TextField(default="dn_mas")
+    # Model tier that produced each stage's output, e.g. {"information_citation_agent": "standard"}
+    model_tiers = models.JSONField(default=dict, blank=True)
+
+    # Immutable EnrichedSummaryWithCitations payload written at save time, so a
+    # summary reads as one row; the citation tables remain for analytics
+    snapshot = models.JSONField(null=True, blank=True, editable=False)
+
+    # Flash summaries are provisional until the full DN-MAS result supersedes them
+    is_provisional = models.BooleanField(default=False)
+    superseded_by = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        related_name="supersedes",
+        null=True,
+        blank=True
+    )
+
+    # Incremental updates revise their predecessor instead of starting from scratch
+    previous = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        related_name="updates",
+        null=True,
+        blank=True
+    )
     
     # All articles provided to the agent (input)
     articles_provided = models.ManyToManyField(
@@ -32,6 +104,8 @@ class Summary(models.Model):
         help_text="All articles provided to the agent for processing"
     )
     
+    objects = SummaryQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
         verbose_name_plural = "Summaries"
@@ -41,8 +115,16 @@ class Summary(models.Model):
     
     @property
     def articles_used(self):
-        """Returns articles that were actually cited in the summary."""
-        from django.db.models import Q
+        """
+        Returns articles that were actually cited in the summary.
+        A list in citation order when prefetched with Summary.objects.with_articles_used().
+        """
+        if hasattr(self, "used_citations"):
+            return list({
+                source.article_id: source.article
+                for citation in self.used_citations
+                for source in citation.cited_sources
+            }.values())
         cited_article_ids = CitationSource.objects.filter(
             citation__summary=self,
             article__isnull=False
@@ -51,10 +133,17 @@ class Summary(models.Model):
     
     @property
     def articles_provided_count(self):
+        # Annotated by Summary.objects.with_usage_counts()
+        if hasattr(self, "provided_count"):
+            return self.provided_count
         return self.articles_provided.count()
     
     @property
     def articles_used_count(self):
+        if hasattr(self, "used_count"):
+            return self.used_count
+        if hasattr(self, "used_citations"):
+            return len(self.articles_used)
         return self.articles_used.count()
 
 
@@ -119,13 +208,69 @@ class CitationSource(models.Model):
 
 # --- ST-MAS (Static Topic MAS) Models ---
 
+class AnalysisTopic(models.Model):
+    """
+    A topic analysed by ST-MAS. Topics live in this registry (seeded by
+    migration 0010), so they can be added or reworded without a deploy.
+    """
+    # Prefix of the topic's agent name and state keys, e.g. "labor" -> "labor_analysis"
+    key = models.SlugField(
+        max_length=50,
+        unique=True,
+        validators=[RegexValidator(r"^[a-z][a-z0-9_]*$", "Use lowercase letters, digits and underscores.")]
+    )
+    label = models.CharField(max_length=200)  # e.g. "Labor Market & Unemployment"
+    keywords = models.TextField(blank=True, help_text="Retrieval query terms")
+    prompt = models.TextField(
+        blank=True,
+        help_text="Custom analysis instructions, blank for the default prompt. Curly braces are not allowed."
+    )
+    # Bumped whenever the label, keywords or prompt change; keys the agent cache
+    version = models.PositiveIntegerField(default=1, editable=False)
+    is_active = models.BooleanField(default=True)
+    position = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["position", "key"]
+
+    def __str__(self):
+        return f"{self.label} (v{self.version})"
+
+    def clean(self):
+        # ADK reads {name} in instructions as a session state placeholder
+        if "{" in self.prompt or "}" in self.prompt:
+            raise ValidationError({"prompt": "Curly braces are reserved for state placeholders."})
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            previous = AnalysisTopic.objects.filter(pk=self.pk).values("label", "keywords", "prompt").first()
+            if previous and previous != {"label": self.label, "keywords": self.keywords, "prompt": self.prompt}:
+                self.version += 1
+        super().save(*args, **kwargs)
+
+
 class TopicAnalysisGroup(models.Model):
     """
     Parent container for a collection of topic analyses (ST-MAS run).
+    Topics are saved as each agent finishes, so a group is visible while
+    the run is still in progress.
     """
+    class Status(models.TextChoices):
+        IN_PROGRESS = "in_progress", "In progress"
+        COMPLETE = "complete", "Complete"
+        PARTIAL = "partial", "Partial"  # Finished with some topics missing
+
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     agent_name = models.TextField(default="st_mas")
     created_at = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.COMPLETE)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    # Immutable TopicAnalysisCollection payload of the complete topics, written
+    # when the group finishes (null while in progress)
+    snapshot = models.JSONField(null=True, blank=True, editable=False)
     
     # Articles used for this whole run
     articles_provided = models.ManyToManyField(
@@ -153,6 +298,19 @@ class TopicAnalysis(models.Model):
     topic_name = models.TextField()  # Housing, Labor, etc.
     sentiment = models.CharField(max_length=20)  # hawkish, dovish, neutral
     summary_text = models.TextField()
+    # False for a topic whose agent failed or missed the run's deadline
+    is_complete = models.BooleanField(default=True)
+    model_tier = models.CharField(max_length=20, blank=True)  # fast, standard, quality
+    # Hash of the topic's prompt and evidence: unchanged inputs reuse the analysis
+    input_fingerprint = models.CharField(max_length=64, blank=True, db_index=True)
+    # Set on copies reused from an earlier group instead of re-running the agent
+    reused_from = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        related_name="reuses",
+        null=True,
+        blank=True
+    )
     
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -259,3 +417,20 @@ class TopicCitationSource(models.Model):
 
     def __str__(self):
         return f"Topic Source from {self.article_source}"
+
+
+# --- LLM Governor ---
+
+class LLMLease(models.Model):
+    """
+    A model call admitted by the cluster-wide LLM governor.
+    Rows from the last minute make up the shared rate-limit window.
+    """
+    lane = models.IntegerField()
+    tokens = models.IntegerField(default=0)
+    acquired_at = models.DateTimeField(db_index=True)
+    expires_at = models.DateTimeField()
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Lease lane={self.lane} ({self.acquired_at.strftime('%H:%M:%S')})"
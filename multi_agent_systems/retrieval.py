@@ -0,0 +1,116 @@
+"""
+In-process passage retrieval for agent inputs.
+
+Splits the articles of a run into sentence passages and ranks them with BM25,
+so an agent can be given only the passages relevant to its task instead of
+the full article payload.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+STOPWORDS = frozenset(
+    """
+    a an and are as at be been but by for from had has have he her his i in
+    is it its of on or our said she that the their they this to was we were
+    which will with would you
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases and splits text into terms, dropping stopwords."""
+    return [
+        token for token in TOKEN_PATTERN.findall((text or "").lower())
+        if token not in STOPWORDS
+    ]
+
+
+def split_sentences(text: str) -> List[str]:
+    """Splits an article body into non-empty sentences."""
+    return [s.strip() for s in SENTENCE_PATTERN.split(text or "") if s.strip()]
+
+
+class PassageRetriever:
+    """
+    BM25 retriever over the sentences of a run's articles.
+
+    Built once per run from the indexed article dict produced by
+    FormattedArticles.to_llm_dict(), then queried once per topic.
+    """
+
+    def __init__(self, articles: Dict[str, dict], k1: float = 1.5, b: float = 0.75):
+        self.articles = articles
+        self.k1 = k1
+        self.b = b
+
+        # passage_id -> (article_idx, position, sentence)
+        self.passages: List[Tuple[str, int, str]] = []
+        self.lengths: List[int] = []
+        # term -> list of (passage_id, term_frequency)
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+        for idx, article in articles.items():
+            for position, sentence in enumerate(split_sentences(article.get("text"))):
+                passage_id = len(self.passages)
+                terms = Counter(tokenize(sentence))
+                self.passages.append((idx, position, sentence))
+                self.lengths.append(sum(terms.values()))
+                for term, tf in terms.items():
+                    self.postings[term].append((passage_id, tf))
+
+        total = len(self.passages)
+        self.avg_length = (sum(self.lengths) / total) if total else 0.0
+        self.idf = {
+            term: math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """
+        Scores passages against the query.
+
+        Returns:
+            Up to top_k (passage_id, score) pairs with a positive score, best first.
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for passage_id, tf in self.postings[term]:
+                norm = 1 - self.b + self.b * (self.lengths[passage_id] / self.avg_length)
+                scores[passage_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
+
+    def retrieve(self, query: str, top_k: int) -> Dict[str, dict]:
+        """
+        Returns the top-k passages for the query in the same indexed format as
+        the full article payload, keeping the original article indices so that
+        citations can still be mapped back to UUIDs.
+
+        Passages are grouped per article and kept in reading order.
+        """
+        selected: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+        for passage_id, _ in self.search(query, top_k):
+            idx, position, sentence = self.passages[passage_id]
+            selected[idx].append((position, sentence))
+
+        return {
+            idx: {
+                "source": self.articles[idx].get("source"),
+                "title": self.articles[idx].get("title"),
+                "published": self.articles[idx].get("published"),
+                "passages": [sentence for _, sentence in sorted(selected[idx])],
+            }
+            for idx in self.articles
+            if idx in selected
+        }
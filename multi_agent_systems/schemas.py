@@ -6,6 +6,8 @@ These models define the structure of data passed to and from agents.
 from typing import List, Dict, Optional
 from pydantic import BaseModel
 
+from .retrieval import split_sentences
+
 
 class ArticleMetadata(BaseModel):
     """Metadata for later enrichment (citations, links)."""
@@ -13,6 +15,8 @@ class ArticleMetadata(BaseModel):
     source: str
     title: Optional[str] = None
     url: Optional[str] = None
+    # Sources carrying the same story when near-duplicates were collapsed
+    syndicated_by: Optional[List[str]] = None
 
 
 class ArticleContent(BaseModel):
@@ -43,6 +47,17 @@ class FormattedArticles(BaseModel):
             for idx, a in enumerate(self.articles)
         }
     
+    def to_headlines_dict(self, lead_sentences: int = 2) -> Dict[str, dict]:
+        """Convert to indexed dict of titles and lead sentences only (flash prompts)."""
+        return {
+            str(idx): {
+                "source": a.metadata.source,
+                "title": a.metadata.title,
+                "lead": " ".join(split_sentences(a.content.text)[:lead_sentences]),
+            }
+            for idx, a in enumerate(self.articles)
+        }
+    
     def get_metadata_list(self) -> List[dict]:
         """Get just the metadata for enrichment."""
         return [a.metadata.model_dump() for a in self.articles]
@@ -0,0 +1,116 @@
+"""
+Selectors for the multi_agent_systems app.
+These functions query the local database and return Summary/TopicAnalysis objects.
+"""
+
+from typing import List, Optional
+
+from .models import AnalysisTopic, CitationSource, Summary, TopicAnalysis, TopicAnalysisGroup
+from .st_mas.instructions import TopicSpec
+
+
+def get_latest_summary(agent_name: str) -> Optional[Summary]:
+    """
+    Returns the latest full (non-provisional) summary written by an agent.
+    """
+    return (
+        Summary.objects
+        .filter(agent_name=agent_name, is_provisional=False)
+        .order_by("-created_at")
+        .first()
+    )
+
+
+def get_update_chain_length(summary_obj: Summary, limit: int) -> int:
+    """
+    Counts the incremental updates leading to a summary, up to limit.
+    """
+    length = 0
+    while summary_obj.previous_id is not None and length < limit:
+        summary_obj = Summary.objects.only("previous_id").get(id=summary_obj.previous_id)
+        length += 1
+    return length
+
+
+def get_cited_article_uuids(summary_obj: Summary) -> set:
+    """
+    Returns the article UUIDs (as stored, i.e. strings) cited by a summary.
+    """
+    return set(
+        CitationSource.objects
+        .filter(citation__summary=summary_obj)
+        .values_list("article_uuid", flat=True)
+        .distinct()
+    )
+
+
+def get_reusable_topic_analyses(fingerprints: dict) -> dict:
+    """
+    Finds, per topic, the latest complete analysis produced from the same input fingerprint.
+    Only analyses whose group snapshot holds the topic qualify, so the copy can carry its payload over.
+
+    Args:
+        fingerprints: Dict of topic name to input fingerprint
+
+    Returns:
+        Dict of topic name to the reusable TopicAnalysis, with its group (topics without one are absent)
+    """
+    candidates = (
+        TopicAnalysis.objects
+        .filter(is_complete=True, input_fingerprint__in=fingerprints.values(), group__snapshot__isnull=False)
+        .select_related("group")
+        .order_by("topic_name", "-created_at")
+        .distinct("topic_name")
+    )
+    return {
+        analysis.topic_name: analysis
+        for analysis in candidates
+        if fingerprints.get(analysis.topic_name) == analysis.input_fingerprint
+        and analysis.topic_name in analysis.group.snapshot.get("topics", {})
+    }
+
+
+def get_active_topics(keys: Optional[List[str]] = None) -> List[TopicSpec]:
+    """
+    Returns the active ST-MAS topics from the AnalysisTopic registry, in display order.
+
+    Args:
+        keys: Optional subset of topic keys for a per-request topic set
+    """
+    topics = AnalysisTopic.objects.filter(is_active=True)
+    if keys is not None:
+        topics = topics.filter(key__in=keys)
+    return [
+        TopicSpec(
+            key=topic.key,
+            label=topic.label,
+            keywords=topic.keywords,
+            prompt=topic.prompt,
+            version=topic.version,
+        )
+        for topic in topics
+    ]
+
+
+def get_summary_snapshot(summary_uuid) -> Optional[dict]:
+    """
+    Returns a summary's header and snapshot with one indexed row fetch.
+    """
+    return (
+        Summary.objects
+        .filter(uuid=summary_uuid)
+        .values("uuid", "created_at", "agent_name", "is_provisional", "snapshot")
+        .first()
+    )
+
+
+def get_topic_group_snapshot(group_uuid) -> Optional[dict]:
+    """
+    Returns a finished group's header and snapshot with one indexed row fetch.
+    """
+    return (
+        TopicAnalysisGroup.objects
+        .filter(uuid=group_uuid)
+        .values("uuid", "status", "created_at", "completed_at", "snapshot")
+        .first()
+    )
@@ -1,25 +1,66 @@
-from typing import List
+import uuid
+from typing import List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
 from .models import (
     Summary, Citation, CitationSource,
     TopicAnalysisGroup, TopicAnalysis, TopicMetric, 
     TopicExpert, TopicCitation, TopicCitationSource
 )
 from news.models import Article
+from news.selectors import AgentArticle
+from news.utils import append_to_archive
+from .dn_mas.runner import dn_mas_flash_runner
 from .dn_mas.schemas import EnrichedSummaryWithCitations
-from .st_mas.schemas import TopicAnalysisCollection
+from .governor import Lane
+from .schemas import FormattedArticles
+from .selectors import (
+    get_latest_summary, get_update_chain_length, get_reusable_topic_analyses, get_active_topics,
+    get_cited_article_uuids
+)
+from .st_mas.agent_helper_functions import get_output_key
+from .st_mas.instructions import TopicSpec
+from .st_mas.runner import (
+    st_mas_runner,
+    build_topic_articles_state,
+    compute_topic_fingerprints,
+    plan_topic_groups,
+    PASSAGES_PER_TOPIC
+)
+from .st_mas.schemas import (
+    TopicAnalysisCollection, TopicSummaryAndAnalysis, convert_topic_analysis_indexes_to_uuids
+)
+from .tiers import collect_model_tiers
+
+
+def get_flash_agent_name(agent_name: str) -> str:
+    """
+    Returns the agent name the flash summaries of a DN-MAS agent are saved under.
+    """
+    return f"{agent_name}_flash"
 
 
 def save_dn_mas_summary(
     enriched_summary: EnrichedSummaryWithCitations, 
-    articles_list: List[Article], 
+    articles_list: List[AgentArticle], 
     start_date=None, 
     end_date=None, 
-    agent_name: str = "dn_mas"
+    agent_name: str = "dn_mas",
+    model_tiers: Optional[dict] = None,
+    previous: Optional[Summary] = None
 ) -> Summary:
     """
     Saves a DN-MAS summary and its citations to the database.
     Uses a transaction to ensure atomicity.
+    model_tiers records which model tier produced each stage (see tiers.collect_model_tiers);
+    previous links an incremental update to the summary it revised.
+    It supersedes the provisional flash summaries of the same agent whose window
+    falls inside [start_date, end_date].
     """
     with transaction.atomic():
         # 1. Create the parent Summary object
@@ -28,41 +69,172 @@ def save_dn_mas_summary(
             article_count=len(articles_list),
             date_range_start=start_date,
             date_range_end=end_date,
-            agent_name=agent_name
+            agent_name=agent_name,
+            model_tiers=model_tiers or {},
+            previous=previous,
+            snapshot=enriched_summary.model_dump(mode="json")
         )
         
         # 2. Link all Articles provided to the agent
-        summary_obj.articles_provided.set(articles_list)
+        ArticlesProvided = Summary.articles_provided.through
+        ArticlesProvided.objects.bulk_create([
+            ArticlesProvided(summary=summary_obj, article_id=article.id) for article in articles_list
+        ])
         
         # 3. Create Citations and their Sources
-        for i, citation_data in enumerate(enriched_summary.citations):
-            citation_obj = Citation.objects.create(
-                summary=summary_obj,
-                summary_sentence=citation_data.summary_sentence,
-                order=i
+        article_ids = _resolve_articles(
+            articles_list,
+            [source.article_uuid for citation in enriched_summary.citations for source in citation.sources]
+        )
+        citation_objs = Citation.objects.bulk_create([
+            Citation(summary=summary_obj, summary_sentence=citation_data.summary_sentence, order=i)
+            for i, citation_data in enumerate(enriched_summary.citations)
+        ])
+        CitationSource.objects.bulk_create([
+            CitationSource(
+                citation=citation_obj,
+                article_id=article_ids.get(source_data.article_uuid),
+                sentence=source_data.sentence,
+                expert_name=source_data.expert_name,
+                article_uuid=source_data.article_uuid,
+                article_source=source_data.article_source,
+                article_title=source_data.article_title,
+                article_url=source_data.article_url
             )
-            
-            for source_data in citation_data.sources:
-                # Try to find the actual Article object using the UUID
-                article_obj = Article.objects.filter(uuid=source_data.article_uuid).first()
-                
-                CitationSource.objects.create(
-                    citation=citation_obj,
-                    article=article_obj,
-                    sentence=source_data.sentence,
-                    expert_name=source_data.expert_name,
-                    article_uuid=source_data.article_uuid,
-                    article_source=source_data.article_source,
-                    article_title=source_data.article_title,
-                    article_url=source_data.article_url
-                )
+            for citation_obj, citation_data in zip(citation_objs, enriched_summary.citations)
+            for source_data in citation_data.sources
+        ])
+
+        # 4. Supersede this agent's provisional flash summaries whose window this result covers
+        provisional = Summary.objects.filter(
+            agent_name=get_flash_agent_name(agent_name),
+            is_provisional=True,
+            superseded_by__isnull=True
+        )
+        if start_date is not None:
+            provisional = provisional.filter(date_range_start__gte=start_date)
+        if end_date is not None:
+            provisional = provisional.filter(date_range_end__lte=end_date)
+        provisional.update(superseded_by=summary_obj)
                 
     return summary_obj
 
 
+def _resolve_articles(articles_list: List[AgentArticle], article_uuids: List[str]) -> dict:
+    """
+    Internal helper mapping cited article UUIDs to article ids: from the articles
+    provided to the agent, then in one query for any others.
+    """
+    article_ids = {str(article.uuid): article.id for article in articles_list}
+    missing = set()
+    for article_uuid in article_uuids:
+        if article_uuid in article_ids:
+            continue
+        try:
+            missing.add(str(uuid.UUID(article_uuid)))
+        except ValueError:
+            # An index the agent did not resolve; kept as text only
+            continue
+    if missing:
+        article_ids.update(
+            (str(key), article_id)
+            for key, article_id in Article.objects.filter(uuid__in=missing).values_list("uuid", "id")
+        )
+    return article_ids
+
+
+def plan_incremental_update(
+    articles_list: List[AgentArticle],
+    agent_name: str
+) -> Optional[Tuple[Summary, List[AgentArticle]]]:
+    """
+    Decides whether the next DN-MAS run can revise the agent's previous summary.
+
+    Returns:
+        (previous summary, articles it has not seen yet), or None when a full
+        run is needed: no previous summary, a previous summary citing articles
+        that have left the window, too many new articles, or too long a chain
+        of updates since the last full run.
+    """
+    previous = get_latest_summary(agent_name)
+    if previous is None:
+        return None
+
+    # The window moves on every run: an update would carry forward sentences backed
+    # by articles the new summary was not given, so those need a full run
+    window_uuids = {str(article.uuid) for article in articles_list}
+    if not get_cited_article_uuids(previous) <= window_uuids:
+        return None
+
+    seen_ids = set(previous.articles_provided.values_list("id", flat=True))
+    new_articles = [article for article in articles_list if article.id not in seen_ids]
+    if len(new_articles) > settings.DN_MAS_INCREMENTAL_MAX_NEW_ARTICLES:
+        return None
+    if get_update_chain_length(previous, settings.DN_MAS_INCREMENTAL_MAX_CHAIN) >= settings.DN_MAS_INCREMENTAL_MAX_CHAIN:
+        return None
+    return previous, new_articles
+
+
+def save_flash_summary(
+    summary_text: str,
+    articles_list: List[AgentArticle],
+    start_date=None,
+    end_date=None,
+    agent_name: str = "dn_mas_flash",
+    model_tiers: Optional[dict] = None
+) -> Summary:
+    """
+    Saves a provisional, citation-less flash summary.
+    It is superseded by the next full DN-MAS summary covering its window.
+    """
+    with transaction.atomic():
+        summary_obj = Summary.objects.create(
+            summary_text=summary_text,
+            article_count=len(articles_list),
+            date_range_start=start_date,
+            date_range_end=end_date,
+            agent_name=agent_name,
+            model_tiers=model_tiers or {},
+            is_provisional=True,
+            snapshot=EnrichedSummaryWithCitations(summary_text=summary_text, citations=[]).model_dump(mode="json")
+        )
+        summary_obj.articles_provided.set([article.id for article in articles_list])
+    return summary_obj
+
+
+async def publish_flash_summary(
+    formatted: FormattedArticles,
+    articles_list: List[AgentArticle],
+    start_date=None,
+    end_date=None,
+    context: str = "",
+    agent_name: str = "dn_mas_flash",
+    lane: Lane = Lane.CRITICAL
+) -> Optional[Summary]:
+    """
+    Runs the headline-only flash pipeline and saves its provisional summary.
+    Meant to run alongside DN-MAS and to finish before the full result is saved.
+    """
+    final_state = await dn_mas_flash_runner(
+        {"headlines": formatted.to_headlines_dict(), "context": context},
+        lane=lane
+    )
+    if not final_state.get("flash_summary"):
+        return None
+
+    return await sync_to_async(save_flash_summary)(
+        summary_text=final_state["flash_summary"],
+        articles_list=articles_list,
+        start_date=start_date,
+        end_date=end_date,
+        agent_name=agent_name,
+        model_tiers=collect_model_tiers(final_state)
+    )
+
+
 def save_st_mas_collection(
     collection: TopicAnalysisCollection,
-    articles_list: List[Article],
+    articles_list: List[AgentArticle],
     agent_name: str = "st_mas"
 ) -> TopicAnalysisGroup:
     """
@@ -70,51 +242,284 @@ def save_st_mas_collection(
     """
     with transaction.atomic():
         # 1. Create the Group
-        group_obj = TopicAnalysisGroup.objects.create(agent_name=agent_name)
-        group_obj.articles_provided.set(articles_list)
+        group_obj = create_topic_analysis_group(articles_list, agent_name)
         
         # 2. Process each Topic
-        for topic_name, analysis in collection.items():
-            topic_obj = TopicAnalysis.objects.create(
+        save_topic_analyses(group_obj, collection)
+        finish_topic_analysis_group(group_obj, expected_topics=collection.keys(), collection=collection)
+            
+    return group_obj
+
+
+def create_topic_analysis_group(
+    articles_list: List[AgentArticle],
+    agent_name: str = "st_mas"
+) -> TopicAnalysisGroup:
+    """
+    Creates an empty, in-progress group that topics are streamed into.
+    """
+    with transaction.atomic():
+        group_obj = TopicAnalysisGroup.objects.create(
+            agent_name=agent_name,
+            status=TopicAnalysisGroup.Status.IN_PROGRESS
+        )
+        ArticlesProvided = TopicAnalysisGroup.articles_provided.through
+        ArticlesProvided.objects.bulk_create([
+            ArticlesProvided(topicanalysisgroup=group_obj, article_id=article.id) for article in articles_list
+        ])
+    return group_obj
+
+
+def save_topic_analyses(
+    group_obj: TopicAnalysisGroup,
+    collection: TopicAnalysisCollection,
+    model_tiers: Optional[dict] = None,
+    fingerprints: Optional[dict] = None
+) -> None:
+    """
+    Saves the topics of a collection (one or many) into an existing group.
+    model_tiers and fingerprints map topic names to the model tier that
+    produced them and to their input fingerprint.
+    """
+    model_tiers = model_tiers or {}
+    fingerprints = fingerprints or {}
+    analyses = list(collection.items())
+    with transaction.atomic():
+        # The tree is built in memory and inserted level by level, one bulk insert per table
+        topic_objs = TopicAnalysis.objects.bulk_create([
+            TopicAnalysis(
                 group=group_obj,
                 topic_name=topic_name,
                 sentiment=analysis.sentiment,
-                summary_text=analysis.executive_summary.summary_text
+                summary_text=analysis.executive_summary.summary_text,
+                model_tier=model_tiers.get(topic_name) or "",
+                input_fingerprint=fingerprints.get(topic_name, "")
             )
-            
-            # 3. Save Metrics
-            for metric in analysis.key_metrics:
-                metric_obj = TopicMetric.objects.create(
-                    topic_analysis=topic_obj,
-                    name=metric.metric_name,
-                    value=str(metric.value),
-                    period=metric.metric_period,
-                    discussion=metric.metric_discussion,
-                    sentiment=metric.sentiment
-                )
-                # Metric Citations
-                _save_topic_citations(metric_obj, metric.citations, "metric")
-            
-            # 4. Save Experts
-            for expert in analysis.expert_analyses:
-                expert_obj = TopicExpert.objects.create(
-                    topic_analysis=topic_obj,
-                    expert_name=expert.expert_name,
-                    organization=expert.expert_organization,
-                    opinion=expert.expert_opinion,
-                    sentiment=expert.sentiment
-                )
-                # Expert Citations
-                _save_topic_citations(expert_obj, expert.citations, "expert")
-                
-            # 5. Save Summary Citations
-            _save_topic_citations(topic_obj, analysis.executive_summary.citations, "analysis")
-            
+            for topic_name, analysis in analyses
+        ])
+        
+        # 3. Save Metrics
+        metrics = [
+            (TopicMetric(
+                topic_analysis=topic_obj,
+                name=metric.metric_name,
+                value=str(metric.value),
+                period=metric.metric_period,
+                discussion=metric.metric_discussion,
+                sentiment=metric.sentiment
+            ), metric)
+            for topic_obj, (_, analysis) in zip(topic_objs, analyses)
+            for metric in analysis.key_metrics
+        ]
+        TopicMetric.objects.bulk_create([metric_obj for metric_obj, _ in metrics])
+        
+        # 4. Save Experts
+        experts = [
+            (TopicExpert(
+                topic_analysis=topic_obj,
+                expert_name=expert.expert_name,
+                organization=expert.expert_organization,
+                opinion=expert.expert_opinion,
+                sentiment=expert.sentiment
+            ), expert)
+            for topic_obj, (_, analysis) in zip(topic_objs, analyses)
+            for expert in analysis.expert_analyses
+        ]
+        TopicExpert.objects.bulk_create([expert_obj for expert_obj, _ in experts])
+        
+        # 5. Save Metric, Expert and Summary Citations
+        citations = []
+        for metric_obj, metric in metrics:
+            citations += _build_topic_citations(metric_obj, metric.citations, "metric")
+        for expert_obj, expert in experts:
+            citations += _build_topic_citations(expert_obj, expert.citations, "expert")
+        for topic_obj, (_, analysis) in zip(topic_objs, analyses):
+            citations += _build_topic_citations(topic_obj, analysis.executive_summary.citations, "analysis")
+        TopicCitation.objects.bulk_create([citation_obj for citation_obj, _ in citations])
+        
+        # 6. Save Sources
+        article_ids = _resolve_articles(
+            [], [src.article_uuid for _, sources in citations for src in sources]
+        )
+        TopicCitationSource.objects.bulk_create([
+            TopicCitationSource(
+                topic_citation=citation_obj,
+                article_id=article_ids.get(src.article_uuid),
+                sentence=src.sentence,
+                expert_name=src.expert_name,
+                article_uuid=src.article_uuid,
+                article_source=src.article_source,
+                article_title=src.article_title,
+                article_url=src.article_url
+            )
+            for citation_obj, sources in citations
+            for src in sources
+        ])
+
+
+def copy_topic_analysis(source: TopicAnalysis, group_obj: TopicAnalysisGroup) -> TopicAnalysis:
+    """
+    Copies an unchanged topic analysis, with its metrics, experts and citations,
+    into a new group using one bulk insert per table.
+    """
+    with transaction.atomic():
+        topic_obj = TopicAnalysis.objects.create(
+            group=group_obj,
+            topic_name=source.topic_name,
+            sentiment=source.sentiment,
+            summary_text=source.summary_text,
+            model_tier=source.model_tier,
+            input_fingerprint=source.input_fingerprint,
+            reused_from_id=source.reused_from_id or source.pk
+        )
+
+        metrics = _bulk_copy(list(source.metrics.all()), topic_analysis=topic_obj)
+        experts = _bulk_copy(list(source.experts.all()), topic_analysis=topic_obj)
+        citations = _bulk_copy(
+            list(TopicCitation.objects.filter(
+                Q(topic_analysis=source) | Q(metric__topic_analysis=source) | Q(expert__topic_analysis=source)
+            )),
+            topic_analysis=lambda c: topic_obj if c.topic_analysis_id else None,
+            metric=lambda c: metrics[c.metric_id] if c.metric_id else None,
+            expert=lambda c: experts[c.expert_id] if c.expert_id else None,
+        )
+        _bulk_copy(
+            list(TopicCitationSource.objects.filter(topic_citation_id__in=citations)),
+            topic_citation=lambda src: citations[src.topic_citation_id],
+        )
+    return topic_obj
+
+
+def save_incomplete_topics(group_obj: TopicAnalysisGroup, expected_topics) -> None:
+    """
+    Saves an empty, incomplete row for every expected topic the group is missing,
+    so readers can tell a failed or timed-out topic from one still running.
+    """
+    saved_topics = set(group_obj.topics.values_list("topic_name", flat=True))
+    TopicAnalysis.objects.bulk_create([
+        TopicAnalysis(group=group_obj, topic_name=topic_name, sentiment="", summary_text="", is_complete=False)
+        for topic_name in expected_topics
+        if topic_name not in saved_topics
+    ])
+
+
+def finish_topic_analysis_group(
+    group_obj: TopicAnalysisGroup,
+    expected_topics,
+    collection: Optional[TopicAnalysisCollection] = None
+) -> TopicAnalysisGroup:
+    """
+    Marks a group complete, or partial if some expected topics are missing or incomplete,
+    and writes its snapshot from the collection of the topics that were saved.
+    """
+    saved_topics = set(group_obj.topics.filter(is_complete=True).values_list("topic_name", flat=True))
+    group_obj.status = (
+        TopicAnalysisGroup.Status.COMPLETE
+        if set(expected_topics) <= saved_topics
+        else TopicAnalysisGroup.Status.PARTIAL
+    )
+    group_obj.completed_at = timezone.now()
+    group_obj.snapshot = (collection or TopicAnalysisCollection(topics={})).model_dump(mode="json")
+    group_obj.save(update_fields=["status", "completed_at", "snapshot"])
     return group_obj
 
 
-def _save_topic_citations(parent_obj, citations_data, parent_type: str):
-    """Internal helper to save ST-MAS citations."""
+async def stream_st_mas_collection(
+    initial_state: dict,
+    metadata_list: List[dict],
+    articles_list: List[AgentArticle],
+    agent_name: str = "st_mas",
+    reuse: bool = True,
+    topics: Optional[List[TopicSpec]] = None,
+    **runner_options
+) -> TopicAnalysisGroup:
+    """
+    Runs ST-MAS and persists each topic as soon as its agent finishes.
+
+    The group is created up front with status "in progress", so readers see
+    the fast topics while the slower agents are still running. Topics whose
+    input fingerprint (prompt + the evidence its call receives) matches an earlier complete
+    analysis are copied into the group instead of being re-run.
+
+    Args:
+        initial_state: Runner state with the indexed "articles" payload
+        metadata_list: Article metadata used to convert indices to UUIDs
+        articles_list: Articles provided to the agents (only id and uuid are read)
+        agent_name: Name stored on the group
+        reuse: Copy unchanged topics instead of re-running their agents
+        topics: Topics to analyse, None for the active AnalysisTopic registry
+        **runner_options: Passed through to st_mas_runner (top_k, lane, ...)
+    """
+    group_obj = await sync_to_async(create_topic_analysis_group)(articles_list, agent_name)
+    save_topics = sync_to_async(save_topic_analyses)
+
+    if topics is None:
+        topics = await sync_to_async(get_active_topics)()
+    output_keys = [get_output_key(topic) for topic in topics]
+
+    topic_articles = build_topic_articles_state(
+        initial_state["articles"], topics, runner_options.get("top_k", PASSAGES_PER_TOPIC)
+    )
+    fingerprints = compute_topic_fingerprints(
+        topic_articles, metadata_list, topics, runner_options.get("fan_out"), runner_options.get("group_size")
+    )
+    reusable = await sync_to_async(get_reusable_topic_analyses)(fingerprints) if reuse else {}
+    # Only whole groups are reused, so the re-run topics are grouped as they were fingerprinted
+    for group in plan_topic_groups(topics, runner_options.get("fan_out"), runner_options.get("group_size")):
+        group_keys = [get_output_key(topic) for topic in group]
+        if not all(key in reusable for key in group_keys):
+            for key in group_keys:
+                reusable.pop(key, None)
+    # Payloads of the saved topics, for the group's snapshot; reused topics carry theirs over
+    payloads = {
+        topic_name: TopicSummaryAndAnalysis.model_validate(source.group.snapshot["topics"][topic_name])
+        for topic_name, source in reusable.items()
+    }
+
+    async def on_topic_result(output_key, result, model_tier):
+        try:
+            topic = convert_topic_analysis_indexes_to_uuids(
+                llm_output={output_key: result},
+                article_uuids=metadata_list
+            )
+            await save_topics(group_obj, topic, {output_key: model_tier}, {output_key: fingerprints.get(output_key)})
+            payloads.update(topic.items())
+        except Exception as e:
+            # One bad topic must not abort the others; the group ends up partial
+            print(f"Failed to save {output_key} for group {group_obj.uuid}: {e}")
+
+    try:
+        for source in reusable.values():
+            await sync_to_async(copy_topic_analysis)(source, group_obj)
+
+        changed_topics = [topic for topic in topics if get_output_key(topic) not in reusable]
+        if changed_topics:
+            await st_mas_runner(
+                initial_state,
+                on_topic_result=on_topic_result,
+                topics=changed_topics,
+                topic_articles=topic_articles,
+                **runner_options
+            )
+    finally:
+        # Topics that failed or missed the deadline are recorded as incomplete
+        await sync_to_async(save_incomplete_topics)(group_obj, output_keys)
+        collection = TopicAnalysisCollection(topics={
+            output_key: payloads[output_key] for output_key in output_keys if output_key in payloads
+        })
+        await sync_to_async(finish_topic_analysis_group)(group_obj, output_keys, collection)
+
+    return group_obj
+
+
+def _build_topic_citations(parent_obj, citations_data, parent_type: str) -> list:
+    """
+    Internal helper to build (unsaved) ST-MAS citations.
+
+    Returns:
+        List of (TopicCitation, its sources) pairs
+    """
+    citations = []
     for i, citation in enumerate(citations_data):
         # Handle the different structure of executive summary citations vs metric/expert citations
         # Metrics/Experts have a direct list of ArticleSentenceCitation
@@ -130,7 +535,7 @@ def _save_topic_citations(parent_obj, citations_data, parent_type: str):
             summary_sentence = f"Source for {parent_obj}"
             sources = [citation] if not isinstance(citation, list) else citation
 
-        topic_citation = TopicCitation.objects.create(
+        topic_citation = TopicCitation(
             summary_sentence=summary_sentence,
             order=i
         )
@@ -142,18 +547,67 @@ def _save_topic_citations(parent_obj, citations_data, parent_type: str):
         elif parent_type == "expert":
             topic_citation.expert = parent_obj
             
-        topic_citation.save()
-        
-        # Save sources
-        for src in sources:
-            article_obj = Article.objects.filter(uuid=src.article_uuid).first()
-            TopicCitationSource.objects.create(
-                topic_citation=topic_citation,
-                article=article_obj,
-                sentence=src.sentence,
-                expert_name=src.expert_name,
-                article_uuid=src.article_uuid,
-                article_source=src.article_source,
-                article_title=src.article_title,
-                article_url=src.article_url
-            )
+        citations.append((topic_citation, sources))
+    return citations
+
+
+def _bulk_copy(rows, **overrides):
+    """
+    Internal helper to bulk-insert copies of rows with some fields overridden
+    (a value, or a callable of the original row).
+
+    Returns:
+        Dict of original id to the new row
+    """
+    if not rows:
+        return {}
+    old_ids = [row.id for row in rows]
+    for row in rows:
+        row.id = None
+        for field, value in overrides.items():
+            setattr(row, field, value(row) if callable(value) else value)
+    return dict(zip(old_ids, type(rows[0]).objects.bulk_create(rows)))
+
+
+def prune_agent_outputs(cutoff, batch_size: int = 100, archive_dir=None) -> Tuple[int, int]:
+    """
+    Deletes summaries and topic analysis groups created before the cutoff, with
+    their citations and topics, oldest first, one batch per transaction.
+
+    Args:
+        cutoff: Outputs created before this datetime expire
+        batch_size: Summaries or groups deleted per transaction
+        archive_dir: If set, their snapshots are appended to monthly
+            `summaries-YYYY-MM.jsonl.gz` / `topic_groups-YYYY-MM.jsonl.gz` archives first
+
+    Returns:
+        (summaries deleted, groups deleted)
+    """
+    summaries = _prune_batches(
+        Summary.objects.filter(created_at__lt=cutoff),
+        ("uuid", "created_at", "agent_name", "summary_text", "article_count", "date_range_start",
+         "date_range_end", "model_tiers", "is_provisional", "snapshot"),
+        "summaries", batch_size, archive_dir
+    )
+    groups = _prune_batches(
+        TopicAnalysisGroup.objects.filter(created_at__lt=cutoff),
+        ("uuid", "created_at", "agent_name", "status", "completed_at", "snapshot"),
+        "topic_groups", batch_size, archive_dir
+    )
+    return summaries, groups
+
+
+def _prune_batches(expired, archive_fields, archive_name: str, batch_size: int, archive_dir) -> int:
+    expired = expired.order_by("created_at", "id")
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            batch = list(expired.values_list("id", flat=True)[:batch_size])
+            if not batch:
+                break
+            if archive_dir:
+                rows = expired.filter(id__in=batch).values(*archive_fields)
+                append_to_archive(archive_dir, archive_name, [(row["created_at"], row) for row in rows])
+            expired.model.objects.filter(id__in=batch).delete()
+        deleted += len(batch)
+    return deleted
@@ -1,21 +1,32 @@
 """
 FOMC Topic Analysis Agents.
 
-Supports both predefined topics and dynamic user-defined topics at runtime.
+The topic set is dynamic (AnalysisTopic registry, or per request), so the
+parallel pipeline is built on demand and memoized per topic set.
 """
-from google.adk.agents import ParallelAgent, LlmAgent
+from functools import lru_cache
 
-from .agent_helper_functions import (
-    create_all_predefined_agents,
-)
+from django.conf import settings
+from google.adk.agents import ParallelAgent
 
-# Default: Create predefined agents
-predefined_agents = create_all_predefined_agents()
+from .agent_helper_functions import create_topic_agent, create_topic_group_agent
+from .instructions import TopicSpec
 
 
-# Default pipeline with predefined topics
-st_mas = ParallelAgent(
-    name="st_mas",
-    sub_agents=predefined_agents,
-    description="Executes parallel analysis of FOMC topics across multiple economic areas.",
-)
+@lru_cache(maxsize=settings.ST_MAS_AGENT_CACHE_SIZE)
+def get_st_mas_agent(groups: tuple[tuple[TopicSpec, ...], ...]) -> ParallelAgent:
+    """
+    Returns the parallel pipeline for the given topic groups (one model call each).
+
+    Memoized by topic keys and prompt versions (TopicSpec equality), so a
+    repeated topic set costs no agent construction and an edited topic
+    gets a fresh agent.
+    """
+    return ParallelAgent(
+        name="st_mas",
+        sub_agents=[
+            create_topic_agent(group[0]) if len(group) == 1 else create_topic_group_agent(list(group))
+            for group in groups
+        ],
+        description="Executes parallel analysis of FOMC topics across multiple economic areas.",
+    )
@@ -5,35 +5,98 @@ Factory functions for creating topic-specific analysis agents.
 """
 from google.adk.agents import LlmAgent
 
-from .instructions import create_analysis_prompt, Topic
-from .schemas import TopicSummaryAndAnalysisLLM
+from multi_agent_systems.context_cache import apply_context_cache
+from multi_agent_systems.llm import build_model
+from multi_agent_systems.tiers import select_model_tier, get_tier_model, get_default_tier
+from .instructions import create_analysis_prompt, create_grouped_analysis_prompt, TopicSpec
+from .schemas import TopicSummaryAndAnalysisLLM, create_topic_group_schema
 
 
-GEMINI_MODEL = "gemini-3-flash-preview"
+# Topic agents pick their model by tier (LLM_AGENT_TIERS); the shared article
+# cache is registered for the default tier's model
+GEMINI_MODEL = get_tier_model(get_default_tier())
 
 
-def create_topic_agent(topic: Topic) -> LlmAgent:
+def get_articles_key(topic: TopicSpec) -> str:
+    """State key holding the passages retrieved for a topic."""
+    return f"{topic.key}_articles"
+
+
+def get_agent_name(topic: TopicSpec) -> str:
+    """Name of the topic's agent, the key of its tier and deadline settings."""
+    return f"{topic.key}_analysis_agent"
+
+
+def get_output_key(topic: TopicSpec) -> str:
+    """State key the topic agent writes its analysis to."""
+    return f"{topic.key}_analysis"
+
+
+def create_topic_agent(topic: TopicSpec) -> LlmAgent:
     """
     Factory function to create a topic-specific analysis agent.
     
     Args:
-        topic: The Topic enum value for this agent.
+        topic: The topic for this agent.
         
     Returns:
         A configured LlmAgent for the specified topic with structured output.
     """
+    name = get_agent_name(topic)
     return LlmAgent(
-        name=f"{topic.name.lower()}_analysis_agent",
-        model=GEMINI_MODEL,
-        instruction=create_analysis_prompt(topic),
-        description=f"Analyze {topic.value} content from FOMC related articles",
-        output_key=f"{topic.name.lower()}_analysis",
+        name=name,
+        model=build_model(agent_name=name),
+        instruction=create_analysis_prompt(topic, articles_key=get_articles_key(topic)),
+        description=f"Analyze {topic.label} content from FOMC related articles",
+        output_key=get_output_key(topic),
         output_schema=TopicSummaryAndAnalysisLLM,
+        before_model_callback=[select_model_tier, apply_context_cache],
     )
 
 
-def create_all_predefined_agents() -> list[LlmAgent]:
-    """Create agents for all predefined topics in the Topic enum."""
-    return [create_topic_agent(topic) for topic in Topic]
+def get_group_name(topics: list[TopicSpec]) -> str:
+    """Name shared by a topic group's agent and state keys."""
+    return "_".join(topic.key for topic in topics)
+
+
+def get_group_agent_name(topics: list[TopicSpec]) -> str:
+    """Name of a topic group's agent, the key of its tier and deadline settings."""
+    return f"{get_group_name(topics)}_group_analysis_agent"
+
+
+def get_group_articles_key(topics: list[TopicSpec]) -> str:
+    """State key holding the passages retrieved for a topic group."""
+    return f"{get_group_name(topics)}_group_articles"
+
+
+def get_group_output_key(topics: list[TopicSpec]) -> str:
+    """State key the group agent writes its analyses to."""
+    return f"{get_group_name(topics)}_group_analysis"
+
+
+def create_topic_group_agent(topics: list[TopicSpec]) -> LlmAgent:
+    """
+    Factory function to create an agent analysing several topics in one call.
+
+    Its output holds one field per topic, named by the topic's output key.
+
+    Args:
+        topics: The topics covered by the agent.
+
+    Returns:
+        A configured LlmAgent for the group with structured output.
+    """
+    name = get_group_agent_name(topics)
+    output_keys = [get_output_key(topic) for topic in topics]
+    return LlmAgent(
+        name=name,
+        model=build_model(agent_name=name),
+        instruction=create_grouped_analysis_prompt(
+            topics, output_keys, articles_key=get_group_articles_key(topics)
+        ),
+        description=f"Analyze {', '.join(topic.label for topic in topics)} content from FOMC related articles",
+        output_key=get_group_output_key(topics),
+        output_schema=create_topic_group_schema(output_keys),
+        before_model_callback=[select_model_tier, apply_context_cache],
+    )
 
-# we need to be able to change the TOPIC list dynamically according to the user's choice
@@ -3,37 +3,33 @@ Prompt templates for FOMC topic analysis agents.
 
 Uses a factory pattern for scalable, type-safe prompt generation.
 """
-from enum import Enum
+from dataclasses import dataclass, field
 
 
-class Topic(str, Enum):
-    """Predefined FOMC analysis topics."""
-    HOUSING = "Real Estate & Housing Market"
-    LABOR = "Labor Market & Unemployment"
-    INFLATION = "Inflation & Price Stability"
-    GDP = "Economic Growth & GDP"
-    CONSUMER = "Consumer Spending & Retail"
-    INTEREST_RATE = "Interest Rate & Monetary Policy"
-    FOREX = "Foreign Exchange & Currency Markets"
-    EQUITY = "Equity Markets & Stock Performance"
-    BONDS = "Fixed Income & Bond Markets"
-
-
-def create_analysis_prompt(topic: Topic) -> str:
+@dataclass(frozen=True)
+class TopicSpec:
     """
-    Generate a specialized FOMC analysis prompt for a given topic.
-    
-    Args:
-        topic: The Topic enum value to generate a prompt for.
-        
-    Returns:
-        A formatted prompt string with {articles_text} placeholder.
+    A topic as analysed by ST-MAS, read from the AnalysisTopic registry.
+
+    Specs compare and hash by key and version only, so they identify a topic's
+    prompt revision and can key the agent cache.
     """
-    return f"""
-Perform a specialized analysis of the provided articles focusing exclusively on: {topic.value} in the context of the FOMC meeting.
+    key: str  # e.g. "labor", the prefix of the topic's agent name and state keys
+    label: str = field(compare=False)  # e.g. "Labor Market & Unemployment"
+    keywords: str = field(default="", compare=False)
+    prompt: str = field(default="", compare=False)  # Custom focus instructions, blank for the default
+    version: int = 1
+
 
-A. METRICS ({topic.value}):
-Extract every mentioned metric specifically related to {topic.value}.
+def get_topic_query(topic: TopicSpec) -> str:
+    """Build the retrieval query for a topic from its label and keywords."""
+    return f"{topic.label} {topic.keywords}"
+
+
+def _analysis_sections(subject: str, heading: str = "") -> str:
+    """The A (metrics), B (expert analysis) and C (summary) instructions about a subject."""
+    return f"""A. METRICS{heading}:
+Extract every mentioned metric specifically related to {subject}.
 For each metric:
   1. metric_name: Name of the indicator.
   2. value: Latest specific value (e.g., "4.2%", "150k").
@@ -42,8 +38,8 @@ For each metric:
   5. sentiment: The sentiment when mentioning this metric.
   6. article_id: The specific Article ID(s) where this is found (e.g., ["0", "3"]).
 
-B. EXPERT ANALYSIS ({topic.value}):
-Identify experts providing commentary/analysis on {topic.value} and Fed policy.
+B. EXPERT ANALYSIS{heading}:
+Identify experts providing commentary/analysis on {subject} and Fed policy.
 For each expert:
   1. expert_name & expert_organization.
   2. expert_opinion: Their forecast/expectation/opinion about the topic.
@@ -51,8 +47,61 @@ For each expert:
   4. article_id: The specific Article ID(s).
 
 C. EXECUTIVE SUMMARY:
-Write a summary that synthesizes all points to explain {topic.value} in the context of the FOMC decision.
+Write a summary that synthesizes all points to explain {subject} in the context of the FOMC decision.
+"""
 
+
+def create_analysis_prompt(topic: TopicSpec, articles_key: str = "articles") -> str:
+    """
+    Generate a specialized FOMC analysis prompt for a given topic.
+    Topics with a custom prompt use it in place of the default instructions.
+    
+    Args:
+        topic: The topic to generate a prompt for.
+        articles_key: The session state key holding the articles for this topic.
+        
+    Returns:
+        A formatted prompt string with an {articles_key} placeholder.
+    """
+    if topic.prompt:
+        return f"""
+{topic.prompt}
+
+Articles:
+{{{articles_key}}}
+"""
+    return f"""
+Perform a specialized analysis of the provided articles focusing exclusively on: {topic.label} in the context of the FOMC meeting.
+
+{_analysis_sections(topic.label, heading=f" ({topic.label})")}
 Articles:
-{{articles}}
-"""
\ No newline at end of file
+{{{articles_key}}}
+"""
+
+def create_grouped_analysis_prompt(topics: list[TopicSpec], output_keys: list[str], articles_key: str = "articles") -> str:
+    """
+    Generate one prompt analysing several topics in a single call.
+
+    Args:
+        topics: The topics covered by the call.
+        output_keys: The output field of each topic, in the same order.
+        articles_key: The session state key holding the articles for these topics.
+
+    Returns:
+        A formatted prompt string with an {articles_key} placeholder.
+    """
+    topic_lines = "\n".join(
+        f"- {key}: {topic.label}" + (f" ({topic.prompt})" if topic.prompt else "")
+        for topic, key in zip(topics, output_keys)
+    )
+    return f"""
+Perform a separate specialized analysis of the provided articles for each of the following topics, in the context of the FOMC meeting.
+Write each topic's analysis into its field:
+{topic_lines}
+
+Each analysis focuses exclusively on its own topic and contains:
+
+{_analysis_sections("the topic")}
+Articles:
+{{{articles_key}}}
+"""
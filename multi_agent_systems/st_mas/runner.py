@@ -1,77 +1,247 @@
-import uuid
+import asyncio
+import hashlib
+import json
+from enum import Enum
+from typing import Awaitable, Callable, Iterable, List, Optional
 
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
+from asgiref.sync import sync_to_async
+from django.conf import settings
 
-from .agent import st_mas
+from multi_agent_systems.context_cache import context_cache
+from multi_agent_systems.execution import run_agent
+from multi_agent_systems.governor import Lane
+from multi_agent_systems.retrieval import PassageRetriever
+from multi_agent_systems.tiers import tier_state_key
+from multi_agent_systems.selectors import get_active_topics
+from .agent import get_st_mas_agent
+from .agent_helper_functions import (
+    get_agent_name, get_articles_key, get_output_key,
+    get_group_agent_name, get_group_articles_key, get_group_output_key, GEMINI_MODEL
+)
+from .instructions import TopicSpec, create_analysis_prompt, create_grouped_analysis_prompt, get_topic_query
 
 
+# Number of BM25 passages each topic agent receives
+PASSAGES_PER_TOPIC = 12
 
+# Default deadline, read from ST_MAS_DEADLINE_SECONDS at run time (None already means no deadline)
+_SETTINGS_DEADLINE = object()
 
-async def st_mas_runner(initial_state):
 
+class FanOut(str, Enum):
+    """How the topics are spread over model calls."""
+    PER_TOPIC = "per_topic"
+    GROUPED = "grouped"
+    ALL_IN_ONE = "all_in_one"
+
+
+def plan_topic_groups(
+    topics: List[TopicSpec],
+    fan_out: Optional[FanOut] = None,
+    group_size: Optional[int] = None,
+) -> List[List[TopicSpec]]:
+    """
+    Splits the topics into the groups analysed by one model call each.
+    fan_out and group_size default to ST_MAS_FAN_OUT and ST_MAS_GROUP_SIZE.
+    """
+    fan_out = FanOut(fan_out or settings.ST_MAS_FAN_OUT)
+    group_size = group_size or settings.ST_MAS_GROUP_SIZE
+    if fan_out == FanOut.PER_TOPIC:
+        size = 1
+    elif fan_out == FanOut.ALL_IN_ONE:
+        size = len(topics)
+    else:
+        size = group_size
+    size = max(size, 1)
+    return [topics[i:i + size] for i in range(0, len(topics), size)]
+
+
+def merge_topic_articles(topic_articles: dict, topics: List[TopicSpec]) -> dict:
+    """
+    Merges the passages retrieved for several topics into one indexed payload,
+    so a group call sees every topic's evidence once.
+    """
+    merged = {}
+    for topic in topics:
+        for idx, article in topic_articles[get_articles_key(topic)].items():
+            if idx not in merged:
+                merged[idx] = {**article}
+                if "passages" in article:
+                    merged[idx]["passages"] = list(article["passages"])
+            elif "passages" in article:
+                merged[idx]["passages"] += [
+                    passage for passage in article["passages"] if passage not in merged[idx]["passages"]
+                ]
+    return dict(sorted(merged.items(), key=lambda item: int(item[0])))
+
+
+def build_topic_articles_state(
+    articles: dict,
+    topics: Iterable[TopicSpec],
+    top_k: Optional[int] = PASSAGES_PER_TOPIC,
+) -> dict:
+    """
+    Retrieves the top-k passages for every topic from the run's articles.
+    With top_k=None every topic receives the full articles instead.
+
+    Returns:
+        A state dict mapping each topic's articles key to its passages, keeping
+        the original article indices so citations still resolve to UUIDs.
+    """
+    if top_k is None:
+        return {get_articles_key(topic): articles for topic in topics}
+
+    retriever = PassageRetriever(articles)
+    return {
+        get_articles_key(topic): retriever.retrieve(get_topic_query(topic), top_k)
+        for topic in topics
+    }
+
+
+def compute_topic_fingerprints(
+    topic_articles: dict,
+    metadata_list: List[dict],
+    topics: Iterable[TopicSpec],
+    fan_out: Optional[FanOut] = None,
+    group_size: Optional[int] = None,
+) -> dict:
+    """
+    Fingerprints the input of the call analysing each topic: its prompt plus the
+    evidence it receives, keyed by article UUID so the run-specific indices do
+    not matter. Topics analysed together share their group's prompt and merged
+    evidence, so they share one fingerprint.
+
+    Args:
+        topic_articles: State built by build_topic_articles_state()
+        metadata_list: Article metadata, in index order
+        topics: The topics to fingerprint
+        fan_out: As passed to st_mas_runner, None for ST_MAS_FAN_OUT
+        group_size: As passed to st_mas_runner, None for ST_MAS_GROUP_SIZE
+
+    Returns:
+        Dict of topic output key to a sha256 hex digest
+    """
+    fingerprints = {}
+    for group in plan_topic_groups(list(topics), fan_out, group_size):
+        if any(get_articles_key(topic) not in topic_articles for topic in group):
+            continue
+        output_keys = [get_output_key(topic) for topic in group]
+        if len(group) == 1:
+            prompt = create_analysis_prompt(group[0], articles_key=get_articles_key(group[0]))
+            evidence = topic_articles[get_articles_key(group[0])]
+        else:
+            prompt = create_grouped_analysis_prompt(group, output_keys, articles_key=get_group_articles_key(group))
+            evidence = merge_topic_articles(topic_articles, group)
+        payload = json.dumps(
+            [
+                prompt,
+                sorted(
+                    (metadata_list[int(idx)]["id"], article) for idx, article in evidence.items()
+                ),
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        fingerprints.update(dict.fromkeys(output_keys, hashlib.sha256(payload.encode()).hexdigest()))
+    return fingerprints
+
+
+async def st_mas_runner(
+    initial_state,
+    top_k: Optional[int] = PASSAGES_PER_TOPIC,
+    lane: Lane = Lane.LIVE,
+    on_topic_result: Optional[Callable[[str, dict, Optional[str]], Awaitable[None]]] = None,
+    deadline: Optional[float] = _SETTINGS_DEADLINE,
+    topics: Optional[Iterable[TopicSpec]] = None,
+    topic_articles: Optional[dict] = None,
+    fan_out: Optional[FanOut] = None,
+    group_size: Optional[int] = None,
+):
+    """
+    Runs the topic agents in parallel.
+
+    Args:
+        initial_state: State with the indexed "articles" payload and "context"
+        top_k: Passages retrieved per topic, None to send the full articles
+        lane: Governor priority lane for the run's model calls
+        on_topic_result: Optional coroutine awaited with (output_key, result, model_tier)
+            as soon as each topic agent finishes, before the slower ones are done
+        deadline: Seconds after which the run is cut short, None to wait for every topic;
+            defaults to ST_MAS_DEADLINE_SECONDS
+        topics: Topics to analyse, None for the active AnalysisTopic registry
+        topic_articles: Precomputed build_topic_articles_state() covering those topics
+        fan_out: One call per topic, per group of `group_size` topics, or for all
+            topics; None for ST_MAS_FAN_OUT
+        group_size: Topics per call with FanOut.GROUPED, None for ST_MAS_GROUP_SIZE
+
+    Returns:
+        Dict of every analysed topic's output key to its raw agent output (None
+        if missing, failed or still running at the deadline)
+    """
     APP_NAME = "st_mas"
-    USER_ID = "system"
-
-    session_id = str(uuid.uuid4())
-    session_service = InMemorySessionService()
-    
-    await session_service.create_session(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-        session_id=session_id,
-        state=initial_state,
-    )
+    if deadline is _SETTINGS_DEADLINE:
+        deadline = settings.ST_MAS_DEADLINE_SECONDS
+    topics = await sync_to_async(get_active_topics)() if topics is None else list(topics)
+    groups = plan_topic_groups(topics, fan_out, group_size)
+    topic_results = dict.fromkeys(get_output_key(topic) for topic in topics)
+    topic_tiers = {}
 
-    agent_runner = Runner(
-        app_name=APP_NAME,
-        agent=st_mas,
-        session_service=session_service,
-        artifact_service=None,
-        memory_service=None,
-    )
+    # Group output key -> the topic output keys it carries, and tier key -> the topics it served
+    group_keys = {}
+    tier_keys = {}
+    for group in groups:
+        output_keys = [get_output_key(topic) for topic in group]
+        if len(group) == 1:
+            tier_keys[tier_state_key(get_agent_name(group[0]))] = output_keys
+        else:
+            group_keys[get_group_output_key(group)] = output_keys
+            tier_keys[tier_state_key(get_group_agent_name(group))] = output_keys
 
-    # Create the initial message to trigger the pipeline
-    user_message = types.Content(
-        role="user",
-        parts=[types.Part(text="Please process the articles and provide a cited summary.")]
-    )
+    # Built once per topic set and prompt versions
+    agent = get_st_mas_agent(tuple(tuple(group) for group in groups))
 
-    # Run the agent pipeline to completion
-    async for event in agent_runner.run_async(
-        user_id=USER_ID,
-        session_id=session_id,
-        new_message=user_message,
-    ):
-        pass  # Process all events to completion
+    async def publish(key, value):
+        topic_results[key] = value
+        if on_topic_result:
+            await on_topic_result(key, value, topic_tiers.get(key))
 
+    async def on_event(event):
+        state_delta = event.actions.state_delta
+        # The tier is recorded before the model call, so it arrives with or before the output
+        for tier_key, output_keys in tier_keys.items():
+            if tier_key in state_delta:
+                topic_tiers.update(dict.fromkeys(output_keys, state_delta[tier_key]))
+        for key, value in state_delta.items():
+            if key in group_keys and value is not None:
+                for output_key in group_keys[key]:
+                    if value.get(output_key) is not None:
+                        await publish(output_key, value[output_key])
+            elif key in topic_results and value is not None:
+                await publish(key, value)
 
-    # Retrieve the session to access the updated state with output_keys
-    completed_session = await session_service.get_session(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-        session_id=session_id,
-    )
-    
-   # maybe retrieve from a global variable 
-    TOPIC_OUTPUT_KEYS = [
-        "housing_analysis",
-        "labor_analysis",
-        "inflation_analysis",
-        "gdp_analysis",
-        "consumer_analysis",
-        "interest_rate_analysis",
-        "forex_analysis",
-        "equity_analysis",
-        "bonds_analysis",
-    ]
-    
-    topic_results = {
-        key: completed_session.state.get(key) 
-        for key in TOPIC_OUTPUT_KEYS
+    if topic_articles is None:
+        topic_articles = build_topic_articles_state(initial_state["articles"], topics, top_k)
+    group_articles = {
+        get_group_articles_key(group): merge_topic_articles(topic_articles, group)
+        for group in groups if len(group) > 1
     }
-    
-    return topic_results
+    state = {**initial_state, **topic_articles, **group_articles}
 
+    # Without retrieval all agents share the full article block as a cached prefix
+    cached_keys = (
+        ["articles", *(get_articles_key(topic) for topic in topics), *group_articles]
+        if top_k is None else []
+    )
+
+    async with context_cache.cached_articles(state, model=GEMINI_MODEL, keys=cached_keys) as state:
+        try:
+            async with asyncio.timeout(deadline):
+                await run_agent(
+                    APP_NAME, agent, state, lane=lane, on_event=on_event, article_ids=initial_state["articles"]
+                )
+        except TimeoutError:
+            # Degrade gracefully: keep the topics that made it, the rest stay None
+            missing = [key for key, value in topic_results.items() if value is None]
+            print(f"ST-MAS deadline of {deadline}s exceeded, missing topics: {', '.join(missing)}")
 
+    return topic_results
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, create_model
 from typing import Optional, List, Literal
 
 # Fed-specific sentiment type
@@ -114,6 +114,17 @@ class TopicAnalysisCollectionLLM(BaseModel):
     topics: dict[str, TopicSummaryAndAnalysisLLM]
 
 
+def create_topic_group_schema(output_keys: List[str]) -> type[BaseModel]:
+    """
+    LLM OUTPUT SCHEMA for a group of topics analysed in one call.
+    One required field per topic output key, so the model cannot skip or rename a topic.
+    """
+    return create_model(
+        "TopicGroupAnalysisLLM",
+        **{key: (TopicSummaryAndAnalysisLLM, ...) for key in output_keys},
+    )
+
+
 class TopicAnalysisCollection(BaseModel):
     """
     Enriched collection of topic analyses keyed by topic name.
@@ -1,3 +1,1005 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import random
+import tempfile
+import time
+from collections import Counter
+from types import SimpleNamespace
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from news.models import Article
+from news.tests import make_articles
+from .governor import Lane, LLMGovernor, use_lane
+from .dn_mas.schemas import EnrichedCitation, EnrichedSource, EnrichedSummaryWithCitations
+from .clustering import cluster_articles
+from .context_cache import (
+    CACHE_STATE_KEY, CACHED_ARTICLES_REFERENCE, ContextCacheManager, LocalContextCacheBackend, _build_backend,
+)
+from .dn_mas.runner import dn_mas_hierarchical_runner
+from .helpers import format_articles_for_agent
+from .dn_mas.schemas import SummaryWithCitations
+from .governor import governor
+from .llm import (
+    FakeBackend, GovernedGemini, ReplayBackend, latency_tracker, request_fingerprint, synthesize,
+    use_article_ids, use_backend,
+)
+from .models import (
+    AnalysisTopic, CitationSource, Summary, TopicAnalysis, TopicAnalysisGroup, TopicCitation, TopicCitationSource,
+)
+from .selectors import get_active_topics
+from .tiers import select_model_tier, select_tier, use_latency_budget
+from .st_mas.agent import get_st_mas_agent
+from .retrieval import PassageRetriever
+from .st_mas.agent_helper_functions import get_articles_key, get_output_key
+from .st_mas.instructions import TopicSpec, get_topic_query
+from .st_mas.runner import (
+    FanOut, build_topic_articles_state, compute_topic_fingerprints, st_mas_runner,
+)
+from .services import (
+    copy_topic_analysis, create_topic_analysis_group, get_flash_agent_name, plan_incremental_update,
+    publish_flash_summary, save_dn_mas_summary, save_flash_summary, save_st_mas_collection, stream_st_mas_collection,
+)
+from .st_mas.schemas import TopicAnalysisCollection, TopicSummaryAndAnalysis
+
+
+class SaveDnMasSummaryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.articles = make_articles(4, body="The Fed cut rates by 25 basis points.")
+
+    def build_summary(self, citations: int, sources: int, article_uuids=None) -> EnrichedSummaryWithCitations:
+        article_uuids = article_uuids or [str(article.uuid) for article in self.articles]
+        return EnrichedSummaryWithCitations(
+            summary_text="The Fed cut rates.",
+            citations=[
+                EnrichedCitation(
+                    summary_sentence=f"Sentence {i}.",
+                    sources=[
+                        EnrichedSource(
+                            sentence="The Fed cut rates by 25 basis points.",
+                            article_uuid=article_uuids[(i + j) % len(article_uuids)],
+                            article_source="Associated Press",
+                        )
+                        for j in range(sources)
+                    ],
+                )
+                for i in range(citations)
+            ],
+        )
+
+    def test_query_count_does_not_grow_with_citations(self):
+        window = self.articles[:3]
+        article_uuids = [str(article.uuid) for article in window]
+        # Savepoint, summary, articles provided, citations, sources, supersede, release
+        for citations, sources in ((1, 1), (10, 5)):
+            with self.subTest(citations=citations, sources=sources):
+                with self.assertNumQueries(7):
+                    save_dn_mas_summary(self.build_summary(citations, sources, article_uuids), window)
+
+    def test_saves_citations_in_order_with_their_articles(self):
+        summary_obj = save_dn_mas_summary(self.build_summary(3, 2), self.articles)
+
+        self.assertEqual(summary_obj.articles_provided.count(), 4)
+        self.assertEqual(
+            list(summary_obj.citations.values_list("summary_sentence", flat=True)),
+            ["Sentence 0.", "Sentence 1.", "Sentence 2."],
+        )
+        for source in CitationSource.objects.filter(citation__summary=summary_obj):
+            self.assertEqual(str(source.article.uuid), source.article_uuid)
+
+    def test_resolves_cited_articles_outside_the_window_in_one_query(self):
+        outside = str(self.articles[3].uuid)
+        summary = self.build_summary(2, 1, article_uuids=[outside, "7"])
+
+        with self.assertNumQueries(8):
+            summary_obj = save_dn_mas_summary(summary, self.articles[:1])
+
+        sources = {s.article_uuid: s.article for s in CitationSource.objects.filter(citation__summary=summary_obj)}
+        self.assertEqual(sources[outside], self.articles[3])
+        # An unresolved index is kept as text without an article
+        self.assertIsNone(sources["7"])
+        self.assertEqual(Summary.objects.count(), 1)
+
+    def test_serves_the_snapshot_from_one_row(self):
+        summary = self.build_summary(3, 2)
+        summary_obj = save_dn_mas_summary(summary, self.articles)
+
+        self.assertEqual(EnrichedSummaryWithCitations.model_validate(summary_obj.snapshot), summary)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("multi_agent_systems:summary_detail", args=[summary_obj.uuid]))
+        self.assertEqual(response.json()["snapshot"], summary.model_dump(mode="json"))
+
+
+class FlashSummaryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.articles = make_articles(3)
+        cls.end = timezone.now()
+        cls.start = cls.end - timedelta(hours=6)
+
+    def flash(self, start, end, agent_name="dn_mas_flash") -> Summary:
+        return save_flash_summary("The Fed cut rates.", self.articles, start, end, agent_name=agent_name)
+
+    def test_saves_a_provisional_summary_without_citations(self):
+        summary_obj = self.flash(self.start, self.end)
+
+        self.assertTrue(summary_obj.is_provisional)
+        self.assertIsNone(summary_obj.superseded_by)
+        self.assertEqual(summary_obj.articles_provided.count(), 3)
+        self.assertFalse(summary_obj.citations.exists())
+        self.assertEqual(summary_obj.snapshot["summary_text"], "The Fed cut rates.")
+
+    def test_publishes_the_flash_pipeline_result(self):
+        backend = CountingBackend()
+        with use_backend(backend):
+            # async_to_sync keeps the save on this thread's test connection
+            summary_obj = async_to_sync(publish_flash_summary)(
+                format_articles_for_agent(self.articles), self.articles, self.start, self.end,
+                context="test", agent_name=get_flash_agent_name("scheduler")
+            )
+
+        self.assertEqual(backend.calls["flash_summary_agent"], 1)
+        self.assertTrue(summary_obj.is_provisional)
+        self.assertEqual(summary_obj.agent_name, "scheduler_flash")
+        self.assertTrue(summary_obj.summary_text)
+
+    def test_full_summary_supersedes_its_flash_summaries_inside_the_window(self):
+        covered = self.flash(self.start + timedelta(hours=1), self.end)
+        other_agent = self.flash(self.start, self.end, agent_name=get_flash_agent_name("scheduler"))
+        starts_earlier = self.flash(self.start - timedelta(hours=1), self.end - timedelta(hours=1))
+        ends_later = self.flash(self.start, self.end + timedelta(hours=1))
+
+        summary_obj = save_dn_mas_summary(
+            EnrichedSummaryWithCitations(summary_text="The Fed cut rates.", citations=[]),
+            self.articles, self.start, self.end
+        )
+
+        superseded = Summary.objects.filter(superseded_by=summary_obj)
+        self.assertQuerySetEqual(superseded, [covered])
+        for flash in (other_agent, starts_earlier, ends_later):
+            flash.refresh_from_db()
+            self.assertIsNone(flash.superseded_by)
+
+
+class PlanIncrementalUpdateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.articles = make_articles(4)
+        # The previous run saw articles 1-3 and cited 1 and 2
+        cls.previous = save_dn_mas_summary(
+            EnrichedSummaryWithCitations(
+                summary_text="The Fed held rates steady.",
+                citations=[
+                    EnrichedCitation(
+                        summary_sentence="Rates were held.",
+                        sources=[
+                            EnrichedSource(sentence="The Fed held rates steady.", article_uuid=str(article.uuid))
+                            for article in cls.articles[1:3]
+                        ],
+                    )
+                ],
+            ),
+            cls.articles[1:],
+            agent_name="scheduler",
+        )
+
+    def test_updates_when_the_window_gains_articles(self):
+        previous, new_articles = plan_incremental_update(self.articles, agent_name="scheduler")
+
+        self.assertEqual(previous, self.previous)
+        self.assertEqual(new_articles, self.articles[:1])
+
+    def test_runs_in_full_when_cited_articles_left_the_window(self):
+        # The window moved on: article 2, cited by the previous summary, is out of it
+        shifted = self.articles[:2]
+
+        self.assertIsNone(plan_incremental_update(shifted, agent_name="scheduler"))
+
+
+class SummaryUsageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        articles = make_articles(4)
+        cls.cited = {}
+        for n in range(3):
+            cited = articles[:n + 1]
+            summary_obj = save_dn_mas_summary(
+                EnrichedSummaryWithCitations(
+                    summary_text="The Fed held rates steady.",
+                    # Two sources per article: used counts are distinct articles
+                    citations=[
+                        EnrichedCitation(
+                            summary_sentence="Rates were held.",
+                            sources=[
+                                EnrichedSource(sentence="The Fed held rates steady.", article_uuid=str(article.uuid))
+                                for article in cited * 2
+                            ],
+                        )
+                    ],
+                ),
+                articles,
+            )
+            cls.cited[summary_obj.pk] = cited
+
+    def test_annotates_counts_in_one_query(self):
+        with self.assertNumQueries(1):
+            summaries = list(Summary.objects.with_usage_counts())
+            for summary_obj in summaries:
+                self.assertEqual(summary_obj.articles_provided_count, 4)
+                self.assertEqual(summary_obj.articles_used_count, len(self.cited[summary_obj.pk]))
+
+    def test_prefetches_articles_used_in_one_batch(self):
+        with self.assertNumQueries(3):
+            summaries = list(Summary.objects.with_articles_used())
+            for summary_obj in summaries:
+                self.assertEqual(summary_obj.articles_used, self.cited[summary_obj.pk])
+        # Without the prefetch the property still works
+        for summary_obj in Summary.objects.all():
+            self.assertCountEqual(summary_obj.articles_used, self.cited[summary_obj.pk])
+
+    # The manifest static storage needs collectstatic, which tests do not run
+    @override_settings(STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    })
+    def test_list_view_does_not_query_per_summary(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("multi_agent_systems:summary_list"))
+        self.assertContains(response, "3 of 4 articles cited")
+
+
+class SaveStMasCollectionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.articles = make_articles(3, body="Payrolls rose by 150k in August.")
+
+    def build_collection(self, topics: int) -> TopicAnalysisCollection:
+        rng = random.Random(topics)
+        article_uuids = [str(article.uuid) for article in self.articles]
+        return TopicAnalysisCollection(topics={
+            f"topic_{i}_analysis": synthesize(TopicSummaryAndAnalysis, rng, article_uuids)
+            for i in range(topics)
+        })
+
+    def test_query_count_does_not_grow_with_topics(self):
+        # Group and articles provided; topics, metrics, experts, citations, article lookup
+        # and sources; status check and update; plus three savepoints and their releases
+        for topics in (1, 9):
+            with self.subTest(topics=topics):
+                with self.assertNumQueries(16):
+                    save_st_mas_collection(self.build_collection(topics), self.articles)
+
+    def test_saves_the_full_tree(self):
+        collection = self.build_collection(9)
+        group_obj = save_st_mas_collection(collection, self.articles)
+
+        self.assertEqual(group_obj.status, TopicAnalysisGroup.Status.COMPLETE)
+        self.assertEqual(group_obj.topics.count(), 9)
+        expected_citations = sum(
+            len(analysis.executive_summary.citations)
+            + sum(len(metric.citations) for metric in analysis.key_metrics)
+            + sum(len(expert.citations) for expert in analysis.expert_analyses)
+            for analysis in collection.values()
+        )
+        self.assertEqual(TopicCitation.objects.count(), expected_citations)
+        for topic_source in TopicCitationSource.objects.all():
+            self.assertEqual(str(topic_source.article.uuid), topic_source.article_uuid)
+        for citation in TopicCitation.objects.filter(metric__isnull=False).select_related("metric"):
+            self.assertEqual(citation.summary_sentence, f"Source for {citation.metric}")
+
+    def test_serves_the_snapshot_from_one_row(self):
+        collection = self.build_collection(3)
+        group_obj = save_st_mas_collection(collection, self.articles)
+
+        self.assertEqual(TopicAnalysisCollection.model_validate(group_obj.snapshot), collection)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("multi_agent_systems:topic_group_detail", args=[group_obj.uuid]))
+        self.assertEqual(response.json()["status"], TopicAnalysisGroup.Status.COMPLETE)
+        self.assertEqual(response.json()["snapshot"], collection.model_dump(mode="json"))
+
+
+class TopicReuseTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.articles = make_articles(4, body="Payrolls rose by 150k in August.")
+        cls.formatted = format_articles_for_agent(cls.articles)
+        cls.topics = get_active_topics()
+
+    def stream(self, backend, **runner_options) -> TopicAnalysisGroup:
+        with use_backend(backend):
+            # async_to_sync keeps the saves on this thread's test connection
+            return async_to_sync(stream_st_mas_collection)(
+                {"articles": self.formatted.to_llm_dict(), "context": "test"},
+                self.formatted.get_metadata_list(),
+                self.articles,
+                topics=self.topics,
+                **runner_options
+            )
+
+    def reused_from(self, group_obj) -> dict:
+        return dict(group_obj.topics.values_list("topic_name", "reused_from"))
+
+    def test_unchanged_topics_are_copied_from_the_original(self):
+        first = self.stream(CountingBackend())
+        original = dict(first.topics.values_list("topic_name", "pk"))
+
+        for _ in range(2):
+            backend = CountingBackend()
+            group_obj = self.stream(backend)
+
+            self.assertEqual(sum(backend.calls.values()), 0)
+            self.assertEqual(group_obj.status, TopicAnalysisGroup.Status.COMPLETE)
+            # A copy of a copy still points at the analysis that was run
+            self.assertEqual(self.reused_from(group_obj), original)
+            self.assertEqual(group_obj.snapshot, first.snapshot)
+
+    def test_grouped_topics_share_the_group_fingerprint(self):
+        topic_articles = build_topic_articles_state(self.formatted.to_llm_dict(), self.topics)
+        metadata_list = self.formatted.get_metadata_list()
+        per_topic = compute_topic_fingerprints(topic_articles, metadata_list, self.topics, FanOut.PER_TOPIC)
+        grouped = compute_topic_fingerprints(topic_articles, metadata_list, self.topics, FanOut.GROUPED, 2)
+
+        first, second = (get_output_key(topic) for topic in self.topics[:2])
+        self.assertEqual(grouped[first], grouped[second])
+        self.assertNotEqual(grouped[first], per_topic[first])
+
+        # The partner's evidence is part of what the group call receives
+        changed = {**topic_articles, get_articles_key(self.topics[1]): {"3": {"passages": ["Wages rose 4%."]}}}
+        self.assertNotEqual(
+            compute_topic_fingerprints(changed, metadata_list, self.topics, FanOut.GROUPED, 2)[first], grouped[first]
+        )
+
+    def test_only_whole_groups_are_reused(self):
+        self.stream(CountingBackend(), fan_out=FanOut.GROUPED, group_size=2)
+        TopicAnalysis.objects.filter(topic_name=get_output_key(self.topics[0])).update(is_complete=False)
+
+        backend = CountingBackend()
+        group_obj = self.stream(backend, fan_out=FanOut.GROUPED, group_size=2)
+
+        # The group of the incomplete topic is re-run as a whole, the others are copied
+        self.assertEqual(sum(backend.calls.values()), 1)
+        reused_from = self.reused_from(group_obj)
+        for topic in self.topics[:2]:
+            self.assertIsNone(reused_from[get_output_key(topic)])
+        for topic in self.topics[2:]:
+            self.assertIsNotNone(reused_from[get_output_key(topic)])
+
+    def test_copy_topic_analysis_copies_the_tree(self):
+        article_uuids = [str(article.uuid) for article in self.articles]
+        analysis = TopicSummaryAndAnalysis.model_validate(
+            synthesize(TopicSummaryAndAnalysis, random.Random(1), article_uuids)
+        )
+        source = save_st_mas_collection(
+            TopicAnalysisCollection(topics={"topic_analysis": analysis}), self.articles
+        ).topics.get()
+
+        copy = copy_topic_analysis(source, create_topic_analysis_group(self.articles, "st_mas"))
+        group_obj = create_topic_analysis_group(self.articles, "st_mas")
+        # Savepoint, topic, then a read and a bulk insert each for metrics, experts,
+        # citations and sources, and the release; no lookup of the reused original
+        with self.assertNumQueries(11):
+            copy_of_copy = copy_topic_analysis(copy, group_obj)
+
+        for topic_obj in (copy, copy_of_copy):
+            self.assertEqual(topic_obj.reused_from, source)
+            self.assertEqual(topic_obj.summary_text, source.summary_text)
+            self.assertEqual(
+                list(topic_obj.metrics.values_list("name", "value")), list(source.metrics.values_list("name", "value"))
+            )
+            self.assertEqual(topic_obj.experts.count(), source.experts.count())
+            self.assertEqual(
+                TopicCitationSource.objects.filter(topic_citation__topic_analysis=topic_obj).count(),
+                TopicCitationSource.objects.filter(topic_citation__topic_analysis=source).count(),
+            )
+            self.assertEqual(
+                TopicCitation.objects.filter(metric__topic_analysis=topic_obj).count(),
+                len([citation for metric in analysis.key_metrics for citation in metric.citations]),
+            )
+
+
+class PruneHistoryTests(TestCase):
+
+    def setUp(self):
+        now = timezone.now()
+        uris = ["old", "cited", "recent"]
+        ages = [timedelta(days=400), timedelta(days=400), timedelta(days=1)]
+        self.old, self.cited, self.recent = make_articles(
+            3,
+            uri=uris.__getitem__,
+            published_at=lambda i: now - ages[i],
+            raw_data=lambda i: {"uri": uris[i]},
+        )
+        summary = EnrichedSummaryWithCitations(
+            summary_text="The Fed held rates steady.",
+            citations=[EnrichedCitation(
+                summary_sentence="Rates were held.",
+                sources=[EnrichedSource(sentence="The Fed held rates steady.", article_uuid=str(self.old.uuid))],
+            )],
+        )
+        self.expired = save_dn_mas_summary(summary, [self.old])
+        Summary.objects.filter(pk=self.expired.pk).update(created_at=now - timedelta(days=400))
+        # A retained summary citing an expired article keeps it
+        save_dn_mas_summary(summary.model_copy(update={"citations": [
+            EnrichedCitation(
+                summary_sentence="Rates were held.",
+                sources=[EnrichedSource(sentence="The Fed held rates steady.", article_uuid=str(self.cited.uuid))],
+            )
+        ]}), [self.recent])
+
+    def test_prunes_and_archives_expired_rows(self):
+        with tempfile.TemporaryDirectory() as archive_dir:
+            call_command("prune_history", archive_dir=archive_dir, batch_size=1, stdout=StringIO())
+
+            self.assertEqual(set(Article.objects.values_list("uri", flat=True)), {"cited", "recent"})
+            self.assertFalse(Summary.objects.filter(pk=self.expired.pk).exists())
+            self.assertEqual(Summary.objects.count(), 1)
+
+            month = self.old.published_at.strftime("%Y-%m")
+            with gzip.open(Path(archive_dir) / f"articles-{month}.jsonl.gz", "rt") as archive:
+                records = [json.loads(line) for line in archive]
+            self.assertEqual([(record["uri"], record["raw_data"]) for record in records], [("old", {"uri": "old"})])
+            with gzip.open(Path(archive_dir) / f"summaries-{month}.jsonl.gz", "rt") as archive:
+                self.assertEqual(json.loads(archive.readline())["uuid"], str(self.expired.uuid))
+
+
+class LLMGovernorTests(SimpleTestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        # Only the governor's clock: the event loop keeps the real one
+        patcher = mock.patch("multi_agent_systems.governor.time", monotonic=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def governor(self, **limits):
+        return LLMGovernor(**{"max_in_flight": 1, "requests_per_minute": 100, "tokens_per_minute": 10_000, **limits})
+
+    def test_higher_lane_is_admitted_first(self):
+        governor = self.governor()
+
+        async def run():
+            await governor._acquire_local(Lane.LIVE, 10)
+            backfill = asyncio.create_task(governor._acquire_local(Lane.BACKFILL, 10))
+            critical = asyncio.create_task(governor._acquire_local(Lane.CRITICAL, 10))
+            await asyncio.sleep(0)
+
+            governor._release_local()
+            await asyncio.sleep(0)
+            self.assertTrue(critical.done())
+            self.assertFalse(backfill.done())
+
+            governor._release_local()
+            self.assertEqual((await backfill).lane, Lane.BACKFILL)
+
+        asyncio.run(run())
+
+    def test_waits_for_the_request_budget(self):
+        governor = self.governor(max_in_flight=5, requests_per_minute=1)
+
+        async def run():
+            await governor._acquire_local(Lane.LIVE, 10)
+            waiter = asyncio.create_task(governor._acquire_local(Lane.LIVE, 10))
+            await asyncio.sleep(0)
+            self.assertFalse(waiter.done())
+
+            self.now = 60.0
+            governor._dispatch()  # The timer firing
+            await waiter
+
+        asyncio.run(run())
+
+    def test_waits_for_the_token_budget(self):
+        governor = self.governor(max_in_flight=5, tokens_per_minute=100)
+
+        async def run():
+            await governor._acquire_local(Lane.LIVE, 60)
+            self.now = 30.0
+            await governor._acquire_local(Lane.LIVE, 30)
+            waiter = asyncio.create_task(governor._acquire_local(Lane.LIVE, 50))
+            await asyncio.sleep(0)
+            self.assertFalse(waiter.done())
+
+            # The first lease's 60 tokens leave the window after a minute
+            self.assertEqual(governor._retry_after(50, self.now), 30)
+            self.now = 60.0
+            governor._dispatch()
+            await waiter
+
+        asyncio.run(run())
+
+    def test_cancelled_waiter_releases_its_admitted_slot(self):
+        governor = self.governor()
+
+        async def run():
+            await governor._acquire_local(Lane.LIVE, 10)
+            waiter = asyncio.create_task(governor._acquire_local(Lane.LIVE, 10))
+            await asyncio.sleep(0)
+
+            # Admitted by the release, then cancelled before it could resume
+            governor._release_local()
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+
+            self.assertEqual(governor.in_flight, 0)
+            await governor._acquire_local(Lane.LIVE, 10)
+
+        asyncio.run(run())
+
+    def test_admits_after_the_previous_event_loop_finished(self):
+        governor = self.governor(max_in_flight=5, requests_per_minute=1)
+
+        async def first_run():
+            await governor._acquire_local(Lane.LIVE, 10)
+            # Left waiting on a timer when the loop shuts down
+            asyncio.create_task(governor._acquire_local(Lane.LIVE, 10))
+            await asyncio.sleep(0)
+
+        async def second_run():
+            await asyncio.wait_for(governor._acquire_local(Lane.LIVE, 10), timeout=1)
+
+        asyncio.run(first_run())
+        self.now = 60.0
+        asyncio.run(second_run())
+
+
+class CountingBackend(FakeBackend):
+    """FakeBackend counting the calls per agent."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = Counter()
+
+    async def generate(self, model, llm_request, stream):
+        self.calls[model.agent_name] += 1
+        async for response in super().generate(model, llm_request, stream):
+            yield response
+
+
+class FailingMergeBackend(CountingBackend):
+    """CountingBackend that fails the first merge."""
+
+    async def generate(self, model, llm_request, stream):
+        if model.agent_name == "information_merge_agent" and not self.calls[model.agent_name]:
+            self.calls[model.agent_name] += 1
+            yield LlmResponse(error_code="INTERNAL", error_message="Injected failure")
+            return
+        async for response in super().generate(model, llm_request, stream):
+            yield response
+
+
+class HierarchicalRunnerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.articles = format_articles_for_agent(make_articles(12)).to_llm_dict()
+
+    def run_hierarchical(self, **kwargs):
+        backend = FailingMergeBackend()
+        with use_backend(backend):
+            state = asyncio.run(dn_mas_hierarchical_runner(
+                {"articles": self.articles, "context": "test"}, batch_size=3, **kwargs
+            ))
+        return state, backend.calls
+
+    def test_failed_merge_keeps_its_partials(self):
+        state, calls = self.run_hierarchical()
+
+        # 4 batches: the failed first merge is retried one level up, so 4 merges instead of 3
+        self.assertEqual(len(state["partial_summaries"]), 4)
+        self.assertEqual(calls["information_merge_agent"], 4)
+        self.assertTrue(state["summary_with_citations"]["summary_text"])
+
+    def test_cites_once_after_the_merge(self):
+        state, calls = self.run_hierarchical()
+
+        self.assertEqual(calls["information_citation_agent"], 0)
+        self.assertEqual(calls["hierarchical_citation_agent"], 4)
+        cited = {
+            source["article_uuid"]
+            for citation in state["summary_with_citations"]["citations"]
+            for source in citation["article_sentence_citations"]
+        }
+        self.assertLessEqual(cited, set(self.articles))
+
+    def test_cites_batches_when_the_final_pass_is_skipped(self):
+        state, calls = self.run_hierarchical(final_citation=False)
+
+        self.assertEqual(calls["information_citation_agent"], 4)
+        self.assertEqual(calls["hierarchical_citation_agent"], 0)
+        self.assertTrue(state["summary_with_citations"]["citations"])
+
+
+class ContextCacheTests(SimpleTestCase):
+
+    state = {"articles": {"0": {"title": "Fed holds", "text": "The Fed held rates steady."}}, "context": "test"}
+
+    def manager(self) -> ContextCacheManager:
+        return ContextCacheManager(LocalContextCacheBackend(), min_tokens=1)
+
+    def test_is_off_by_default(self):
+        with override_settings():
+            del settings.LLM_CONTEXT_CACHE
+            manager = ContextCacheManager(backend=_build_backend(), min_tokens=1)
+        self.assertIsNone(manager.backend)
+
+        async def run():
+            async with manager.cached_articles(self.state, model="gemini-3-flash-preview") as state:
+                return state
+
+        # Without a backend the articles stay inline and nothing is registered
+        self.assertIs(asyncio.run(run()), self.state)
+        self.assertEqual(manager.handles, {})
+
+    def test_registers_reuses_and_expires_the_corpus(self):
+        manager = self.manager()
+        backend = manager.backend
+
+        async def run():
+            async with manager.cached_articles(self.state, model="model", keys=["articles", "labor_articles"]) as state:
+                self.assertEqual(state["articles"], CACHED_ARTICLES_REFERENCE)
+                self.assertEqual(state["labor_articles"], CACHED_ARTICLES_REFERENCE)
+                self.assertEqual(len(backend.entries), 1)
+
+                # Every call of the run reuses the one registered corpus
+                requests = [make_request("Summarize.", model=model) for model in ("model", "model", "other")]
+                for llm_request in requests:
+                    manager.apply(state[CACHE_STATE_KEY], llm_request)
+                self.assertEqual(list(backend.hits.values()), [2])
+                # A call on another model gets the corpus inline
+                for llm_request in requests:
+                    self.assertIn("Fed holds", llm_request.contents[0].parts[0].text)
+
+        asyncio.run(run())
+
+        self.assertEqual(manager.handles, {})
+        self.assertEqual(backend.entries, {})
+        self.assertNotIn(CACHE_STATE_KEY, self.state)
+
+    def test_expires_the_corpus_when_the_run_fails(self):
+        manager = self.manager()
+
+        async def run():
+            async with manager.cached_articles(self.state, model="model"):
+                raise RuntimeError("Run failed")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(run())
+        self.assertEqual(manager.handles, {})
+        self.assertEqual(manager.backend.entries, {})
+
+    def test_small_corpus_is_sent_inline(self):
+        manager = ContextCacheManager(LocalContextCacheBackend())
+
+        async def run():
+            async with manager.cached_articles(self.state, model="model") as state:
+                return state
+
+        self.assertIs(asyncio.run(run()), self.state)
+        self.assertEqual(manager.backend.entries, {})
+
+
+def make_request(prompt: str, context: str = "Automated scheduler run at 2026-10-19 06:00", model: str = "gemini-3-flash-preview"):
+    return LlmRequest(
+        model=model,
+        contents=[types.Content(role="user", parts=[types.Part(text=f"{context}\n{prompt}")])],
+        config=types.GenerateContentConfig(response_schema=SummaryWithCitations),
+    )
+
+
+async def generate_text(backend, llm_request) -> str:
+    return "".join([
+        part.text
+        async for response in backend.generate(None, llm_request, stream=False)
+        for part in response.content.parts
+    ])
+
+
+class ModelBackendTests(SimpleTestCase):
+
+    def test_fingerprint_ignores_the_run_time_and_model(self):
+        request = make_request("The Fed held rates steady.")
+
+        self.assertEqual(
+            request_fingerprint(request),
+            request_fingerprint(make_request(
+                "The Fed held rates steady.", context="Automated scheduler run at 2026-10-20 14:30", model="gemini-3-pro"
+            )),
+        )
+        self.assertNotEqual(request_fingerprint(request), request_fingerprint(make_request("The Fed cut rates.")))
+
+    def test_fake_backend_cites_the_run_articles(self):
+        request = make_request("The Fed held rates steady.")
+
+        with use_article_ids(["3", "7"]):
+            output = asyncio.run(generate_text(FakeBackend(), request))
+            self.assertEqual(output, asyncio.run(generate_text(FakeBackend(), request)))
+
+        cited = {
+            source.article_uuid
+            for citation in SummaryWithCitations.model_validate_json(output).citations
+            for source in citation.article_sentence_citations
+        }
+        self.assertLessEqual(cited, {"3", "7"})
+
+    def test_replay_backend_serves_recordings_across_runs(self):
+        recorded = make_request("The Fed held rates steady.")
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            f.write(json.dumps({"key": request_fingerprint(recorded), "text": "Recorded.", "latency": 0}) + "\n")
+        self.addCleanup(Path(f.name).unlink)
+        backend = ReplayBackend(f.name)
+
+        # Replayed an hour later, routed to another tier's model
+        replayed = make_request(
+            "The Fed held rates steady.", context="Automated scheduler run at 2026-10-19 07:00", model="gemini-3-pro"
+        )
+        self.assertEqual(asyncio.run(generate_text(backend, replayed)), "Recorded.")
+        with self.assertRaises(LookupError):
+            asyncio.run(generate_text(backend, make_request("The Fed cut rates.")))
+
+
+class ClusterArticlesTests(SimpleTestCase):
+
+    def test_paraphrased_stories_share_a_narrative(self):
+        articles = {
+            "0": {
+                "title": "Fed holds interest rates steady",
+                "text": "The Federal Reserve held interest rates steady on Wednesday as Powell pointed to sticky inflation.",
+            },
+            "1": {
+                "title": "Oil slides as OPEC plans to raise output",
+                "text": "Crude prices fell after OPEC members agreed to pump more barrels next month.",
+            },
+            "2": {
+                "title": "Federal Reserve keeps rates steady",
+                "text": "Powell said inflation remains sticky as the Federal Reserve kept interest rates on hold Wednesday.",
+            },
+        }
+
+        clusters = cluster_articles(articles, threshold=0.3)
+
+        self.assertEqual([cluster.members for cluster in clusters], [["0", "2"], ["1"]])
+        self.assertIn(clusters[0].representative, {"0", "2"})
+
+
+class PassageRetrieverTests(SimpleTestCase):
+
+    articles = {
+        "0": {
+            "source": "Reuters", "title": "Fed holds", "published": "2026-10-19",
+            "text": "The Fed held rates steady. Payrolls rose by 150k as unemployment fell to 4.1%. Markets were calm.",
+        },
+        "1": {
+            "source": "AP", "title": "Prices", "published": "2026-10-19",
+            "text": "Inflation cooled as CPI prices rose 0.2%. Officials said the outlook is uncertain.",
+        },
+        "2": {
+            "source": "Bloomberg", "title": "Housing", "published": "2026-10-19",
+            "text": "Mortgage rates climbed. Home sales slowed in September.",
+        },
+    }
+    labor = TopicSpec(key="labor", label="Labor Market & Unemployment", keywords="payrolls jobs unemployment")
+    inflation = TopicSpec(key="inflation", label="Inflation", keywords="CPI prices")
+
+    def test_topic_passage_ranks_first(self):
+        retriever = PassageRetriever(self.articles)
+
+        for topic, expected in ((self.labor, "Payrolls rose"), (self.inflation, "Inflation cooled")):
+            with self.subTest(topic=topic.key):
+                [(passage_id, score), *_] = retriever.search(get_topic_query(topic), top_k=3)
+                self.assertTrue(retriever.passages[passage_id][2].startswith(expected))
+                self.assertGreater(score, 0)
+
+    def test_retrieve_keeps_article_indices_and_reading_order(self):
+        passages = PassageRetriever(self.articles).retrieve("payrolls unemployment markets calm", top_k=2)
+
+        self.assertEqual(list(passages), ["0"])
+        self.assertEqual(passages["0"]["source"], "Reuters")
+        self.assertEqual(passages["0"]["passages"], [
+            "Payrolls rose by 150k as unemployment fell to 4.1%.", "Markets were calm.",
+        ])
+
+    def test_topic_state_without_top_k_is_the_full_articles(self):
+        topics = [self.labor, self.inflation]
+
+        full = build_topic_articles_state(self.articles, topics, top_k=None)
+        self.assertEqual(full, {get_articles_key(topic): self.articles for topic in topics})
+
+        retrieved = build_topic_articles_state(self.articles, topics, top_k=1)
+        self.assertEqual(list(retrieved[get_articles_key(self.labor)]), ["0"])
+        self.assertEqual(list(retrieved[get_articles_key(self.inflation)]), ["1"])
+
+
+class StMasRunnerTests(TestCase):
+
+    def test_fan_out_defaults_are_read_at_run_time(self):
+        articles = format_articles_for_agent(make_articles(2)).to_llm_dict()
+        # Loaded here: the runner would read them from a worker thread's connection
+        topics = get_active_topics()
+
+        backend = CountingBackend()
+        with override_settings(ST_MAS_FAN_OUT="all_in_one"), use_backend(backend):
+            results = asyncio.run(st_mas_runner({"articles": articles, "context": "test"}, topics=topics))
+
+        self.assertEqual(sum(backend.calls.values()), 1)
+        self.assertTrue(all(value is not None for value in results.values()))
+
+    def test_deadline_default_is_read_at_run_time(self):
+        articles = format_articles_for_agent(make_articles(2)).to_llm_dict()
+        topics = get_active_topics()
+
+        with override_settings(ST_MAS_DEADLINE_SECONDS=0.01), use_backend(FakeBackend(latency=0.1)):
+            cut_short = asyncio.run(st_mas_runner({"articles": articles, "context": "test"}, topics=topics))
+            # None still waits for every topic
+            complete = asyncio.run(st_mas_runner({"articles": articles, "context": "test"}, topics=topics, deadline=None))
+
+        self.assertTrue(all(value is None for value in cut_short.values()))
+        self.assertTrue(all(value is not None for value in complete.values()))
+
+
+class AnalysisTopicVersionTests(TestCase):
+
+    def agent(self):
+        return get_st_mas_agent(tuple((spec,) for spec in get_active_topics(["labor", "inflation"])))
+
+    def test_only_prompt_edits_bump_the_version(self):
+        topic = AnalysisTopic.objects.get(key="labor")
+
+        topic.position = 20
+        topic.save()
+        self.assertEqual(topic.version, 1)
+
+        topic.prompt = "Focus on wage growth."
+        topic.save()
+        self.assertEqual(topic.version, 2)
+
+    def test_edited_topic_gets_a_new_agent(self):
+        agent = self.agent()
+        self.assertIs(self.agent(), agent)
+
+        topic = AnalysisTopic.objects.get(key="labor")
+        topic.keywords += " layoffs"
+        topic.save()
+
+        rebuilt = self.agent()
+        self.assertIsNot(rebuilt, agent)
+        self.assertIs(self.agent(), rebuilt)
+
+
+class ScriptedBackend:
+    """Serves each call with the next (latency, fails) script entry, recording how each call ended."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.outcomes = []
+
+    async def generate(self, model, llm_request, stream):
+        latency, fails = self.script.pop(0)
+        try:
+            if fails:
+                await asyncio.sleep(latency)
+                yield LlmResponse(error_code="INTERNAL", error_message="Injected failure")
+            else:
+                async for response in FakeBackend(latency=latency).generate(model, llm_request, stream):
+                    yield response
+            self.outcomes.append("done")
+        except asyncio.CancelledError:
+            self.outcomes.append("cancelled")
+            raise
+
+
+class GovernedGeminiTests(SimpleTestCase):
+
+    def model(self, name, p90=None, deadline=None):
+        # A fresh latency history per test, so the hedge delay is known
+        agent_name = f"{name}_{self._testMethodName}"
+        for _ in range(latency_tracker.min_samples if p90 is not None else 0):
+            latency_tracker.record(f"{agent_name}/gemini-3-flash-preview", p90)
+        return GovernedGemini(model="gemini-3-flash-preview", agent_name=agent_name, deadline=deadline)
+
+    def generate(self, model, backend):
+        async def run():
+            with use_backend(backend):
+                return [response async for response in model.generate_content_async(make_request("The Fed held rates."))]
+
+        responses = asyncio.run(run())
+        self.assertEqual(governor.in_flight, 0)  # Every slot released
+        return responses
+
+    def test_hedge_after_p90_wins_and_cancels_the_straggler(self):
+        backend = ScriptedBackend((5.0, False), (0.01, False))
+
+        started = time.monotonic()
+        [response] = self.generate(self.model("hedged", p90=0.05), backend)
+
+        self.assertIsNone(response.error_code)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(backend.outcomes, ["done", "cancelled"])
+
+    def test_no_hedge_before_p90(self):
+        backend = ScriptedBackend((0.01, False))
+
+        [response] = self.generate(self.model("fast", p90=1.0), backend)
+
+        self.assertIsNone(response.error_code)
+        self.assertEqual(backend.outcomes, ["done"])
+
+    def test_invalid_first_response_does_not_win(self):
+        # The hedge answers first but with an error: the primary's valid response is used
+        backend = ScriptedBackend((0.2, False), (0.01, True))
+
+        [response] = self.generate(self.model("invalid_hedge", p90=0.05), backend)
+
+        self.assertIsNone(response.error_code)
+        self.assertEqual(backend.outcomes, ["done", "done"])
+
+    def test_expired_deadline_yields_an_error_response(self):
+        backend = ScriptedBackend((5.0, False))
+
+        [response] = self.generate(self.model("slow", deadline=0.05), backend)
+
+        self.assertEqual(response.error_code, "DEADLINE_EXCEEDED")
+        self.assertEqual(backend.outcomes, ["cancelled"])
+
+
+@override_settings(
+    LLM_MODEL_TIERS={"fast": "fast-model", "standard": "standard-model", "pro": "pro-model"},
+    LLM_DEFAULT_TIER="standard",
+    LLM_AGENT_TIERS={"analyst": "pro"},
+)
+class TierPolicyTests(SimpleTestCase):
+
+    def agent(self, **p90s) -> str:
+        # A fresh latency history per test, with the given p90 per tier
+        agent_name = f"analyst_{self._testMethodName}"
+        for tier, p90 in p90s.items():
+            for _ in range(latency_tracker.min_samples):
+                latency_tracker.record(f"{agent_name}/{tier}-model", p90)
+        return agent_name
+
+    def test_uses_the_configured_tier_without_a_budget(self):
+        self.assertEqual(select_tier("analyst"), "pro")
+        # Read at call time, not frozen at import
+        with override_settings(LLM_AGENT_TIERS={}):
+            self.assertEqual(select_tier("analyst"), "standard")
+
+    def test_critical_lane_uses_the_fastest_tier(self):
+        with use_lane(Lane.CRITICAL), use_latency_budget(600):
+            self.assertEqual(select_tier("analyst"), "fast")
+
+    def test_steps_down_when_the_budget_runs_low(self):
+        agent_name = self.agent(pro=30, standard=5, fast=1)
+
+        with override_settings(LLM_AGENT_TIERS={agent_name: "pro"}):
+            for seconds, tier in ((60, "pro"), (10, "standard"), (3, "fast"), (0.5, "fast")):
+                with self.subTest(seconds=seconds), use_latency_budget(seconds):
+                    self.assertEqual(select_tier(agent_name), tier)
+
+    def test_routes_the_request_and_records_the_tier(self):
+        context = SimpleNamespace(agent_name="analyst", state={})
+        llm_request = make_request("Summarize.")
+
+        with use_lane(Lane.CRITICAL):
+            self.assertIsNone(select_model_tier(context, llm_request))
+
+        self.assertEqual(llm_request.model, "fast-model")
+        self.assertEqual(context.state, {"analyst_tier": "fast"})
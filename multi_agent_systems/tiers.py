@@ -0,0 +1,126 @@
+"""
+Model tiers for agent calls.
+
+Every agent is assigned a tier (LLM_AGENT_TIERS, else LLM_DEFAULT_TIER) and
+each tier maps to a model (LLM_MODEL_TIERS, fastest first). On every call the
+tier policy may route the agent to a faster tier:
+
+* in a critical window (the call runs in Lane.CRITICAL) it uses the fastest tier
+* when the run is behind its latency budget, i.e. the agent's p90 latency on
+  its tier no longer fits the remaining budget, it steps down to the first
+  faster tier that fits
+
+The tier actually used is written to the session state under
+tier_state_key(agent_name), so runs can record which tier produced each output.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+
+from .governor import Lane, current_lane
+from .llm import latency_tracker
+
+
+# The tier settings are read on every call, so overriding them takes effect without a reload
+
+def get_model_tiers() -> dict:
+    """{tier: model}, fastest first."""
+    return getattr(settings, "LLM_MODEL_TIERS", {"standard": "gemini-3-flash-preview"})
+
+
+def get_default_tier() -> str:
+    return getattr(settings, "LLM_DEFAULT_TIER", "standard")
+
+
+def get_tier_order() -> list:
+    """Tier names, fastest first."""
+    return list(get_model_tiers())
+
+
+def get_tier_model(tier: str) -> str:
+    return get_model_tiers()[tier]
+
+
+def get_agent_tier(agent_name: str) -> str:
+    """The tier an agent is configured for."""
+    return getattr(settings, "LLM_AGENT_TIERS", {}).get(agent_name, get_default_tier())
+
+
+def tier_state_key(agent_name: str) -> str:
+    """State key recording the tier that served the agent's last call."""
+    return f"{agent_name}_tier"
+
+
+def collect_model_tiers(state: dict) -> dict:
+    """Extracts {agent_name: tier} from a final session state."""
+    model_tiers = get_model_tiers()
+    return {
+        key.removesuffix("_tier"): value
+        for key, value in state.items()
+        if key.endswith("_tier") and value in model_tiers
+    }
+
+
+def fastest_tier(tiers) -> Optional[str]:
+    """The fastest of the given tiers (used to summarize multi-run pipelines)."""
+    return min(tiers, key=get_tier_order().index, default=None)
+
+
+# --- Latency budget ---
+
+class LatencyBudget:
+    """Wall-clock budget of a pipeline run."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+
+current_budget: ContextVar[Optional[LatencyBudget]] = ContextVar("llm_latency_budget", default=None)
+
+
+@contextmanager
+def use_latency_budget(seconds: Optional[float]):
+    """Runs the enclosed pipelines against a shared latency budget (None disables it)."""
+    token = current_budget.set(LatencyBudget(seconds) if seconds else None)
+    try:
+        yield
+    finally:
+        current_budget.reset(token)
+
+
+# --- Policy ---
+
+def select_tier(agent_name: str) -> str:
+    """Applies the tier policy to the agent's configured tier for the current call."""
+    tier_order = get_tier_order()
+    tier = get_agent_tier(agent_name)
+    if current_lane.get() == Lane.CRITICAL:
+        return tier_order[0]
+
+    budget = current_budget.get()
+    if budget is None:
+        return tier
+
+    remaining = budget.remaining()
+    candidates = tier_order[:tier_order.index(tier) + 1]
+    for candidate in reversed(candidates):
+        expected = latency_tracker.quantile(f"{agent_name}/{get_tier_model(candidate)}")
+        if remaining > (expected or 0):
+            return candidate
+    return tier_order[0]
+
+
+def select_model_tier(callback_context, llm_request):
+    """before_model_callback routing the request to the tier chosen by the policy."""
+    tier = select_tier(callback_context.agent_name)
+    llm_request.model = get_tier_model(tier)
+    callback_context.state[tier_state_key(callback_context.agent_name)] = tier
+    return None
@@ -1,8 +1,11 @@
 from django.urls import path
-from .views import SummaryListView
+from .views import SummaryListView, latest_topic_group, summary_detail, topic_group_detail
 
 app_name = "multi_agent_systems"
 
 urlpatterns = [
     path("summaries/", SummaryListView.as_view(), name="summary_list"),
+    path("api/summaries/<uuid:uuid>/", summary_detail, name="summary_detail"),
+    path("api/topic-groups/latest/", latest_topic_group, name="latest_topic_group"),
+    path("api/topic-groups/<uuid:uuid>/", topic_group_detail, name="topic_group_detail"),
 ]
@@ -1,9 +1,54 @@
 from django.shortcuts import render
+from django.http import JsonResponse
 from django.views.generic import ListView
-from .models import Summary
+from .models import Summary, TopicAnalysisGroup
+from .selectors import get_summary_snapshot, get_topic_group_snapshot
 
 class SummaryListView(ListView):
     model = Summary
     template_name = "multi_agent_systems/summary_list.html"
     context_object_name = "summaries"
     ordering = ["-created_at"]
+
+    def get_queryset(self):
+        # Flash summaries disappear once the full summary supersedes them
+        return super().get_queryset().filter(superseded_by__isnull=True).defer("snapshot").with_usage_counts()
+
+
+def latest_topic_group(request):
+    """Return the latest ST-MAS group as JSON, including topics of a run still in progress."""
+    group = TopicAnalysisGroup.objects.defer("snapshot").prefetch_related("topics").first()
+    if group:
+        data = {
+            "uuid": str(group.uuid),
+            "status": group.status,
+            "created_at": group.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "topics": [
+                {
+                    "topic_name": topic.topic_name,
+                    "sentiment": topic.sentiment,
+                    "summary_text": topic.summary_text,
+                    "is_complete": topic.is_complete,
+                    "model_tier": topic.model_tier,
+                }
+                for topic in group.topics.all()
+            ],
+        }
+        return JsonResponse(data)
+    return JsonResponse({"error": "No topic analyses found"}, status=404)
+
+
+def summary_detail(request, uuid):
+    """Return a summary with its citations as JSON, served from its snapshot."""
+    summary = get_summary_snapshot(uuid)
+    if summary:
+        return JsonResponse(summary)
+    return JsonResponse({"error": "Summary not found"}, status=404)
+
+
+def topic_group_detail(request, uuid):
+    """Return an ST-MAS group with its full topic analyses as JSON (snapshot is null while in progress)."""
+    group = get_topic_group_snapshot(uuid)
+    if group:
+        return JsonResponse(group)
+    return JsonResponse({"error": "Topic analysis group not found"}, status=404)
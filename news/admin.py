@@ -1,10 +1,11 @@
 from django.contrib import admin
-from .models import Source, Article, FetchLog
+from .models import Source, Article, FetchLog, FetchWatermark
 
 
 @admin.register(Source)
 class SourceAdmin(admin.ModelAdmin):
-    list_display = ("title", "uri", "data_type")
+    list_display = ("title", "uri", "data_type", "is_trusted")
+    list_filter = ("is_trusted",)
     search_fields = ("title", "uri")
 
 
@@ -15,6 +16,16 @@ class ArticleAdmin(admin.ModelAdmin):
     search_fields = ("title", "body", "uuid")
     date_hierarchy = "published_at"
     readonly_fields = ("uuid",)
+    list_select_related = ("source",)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # The changelist shows a few columns; the change form still needs every field
+        if request.resolver_match and request.resolver_match.url_name == "news_article_changelist":
+            queryset = queryset.defer(
+                "body", "raw_data_legacy", "authors", "concepts", "categories", "minhash", "lsh_buckets"
+            )
+        return queryset
 
     def colored_sentiment(self, obj):
         if obj.sentiment is None:
@@ -38,3 +49,9 @@ class ArticleAdmin(admin.ModelAdmin):
 class FetchLogAdmin(admin.ModelAdmin):
     list_display = ("timestamp", "message")
     readonly_fields = ("timestamp",)
+
+
+@admin.register(FetchWatermark)
+class FetchWatermarkAdmin(admin.ModelAdmin):
+    list_display = ("name", "published_at", "updated_at")
+    readonly_fields = ("updated_at",)
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class NewsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "news"
+
+    def ready(self):
+        from .services import sync_trusted_sources
+
+        # SOURCE_TITLES lives in code: every deploy's migrate brings the flags up to date
+        post_migrate.connect(sync_trusted_sources, sender=self)
@@ -0,0 +1,68 @@
+"""
+Near-duplicate detection for syndicated articles.
+
+Article bodies are shingled into word n-grams and summarised as MinHash
+signatures. Signatures are split into LSH bands; two articles sharing any
+band bucket are candidate duplicates, confirmed when their estimated Jaccard
+similarity reaches the threshold. Signatures and buckets are stored on the
+article at ingest (see services.index_near_duplicates).
+"""
+
+import hashlib
+import random
+import re
+from typing import List
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+# 16 bands of 4 rows: pairs above ~0.5 Jaccard become candidates
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+# Estimated Jaccard similarity above which a candidate is a copy
+DUPLICATE_THRESHOLD = 0.8
+
+# Mersenne prime modulus keeps every value within a signed 64-bit column
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20250917)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def _hash(value: str) -> int:
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big") % _PRIME
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Word n-grams of the lowercased text (the whole text if shorter)."""
+    tokens = TOKEN_PATTERN.findall((text or "").lower())
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash_signature(text: str) -> List[int]:
+    """MinHash signature of the text's shingles, empty for an empty text."""
+    hashes = [_hash(shingle) for shingle in shingles(text)]
+    if not hashes:
+        return []
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def lsh_buckets(signature: List[int]) -> List[int]:
+    """One bucket id per band; the band number is part of the id."""
+    if not signature:
+        return []
+    return [
+        _hash(f"{band}:{signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]}")
+        for band in range(LSH_BANDS)
+    ]
+
+
+def estimate_jaccard(a: List[int], b: List[int]) -> float:
+    """Share of matching signature rows, an estimate of the shingle sets' Jaccard similarity."""
+    if not a or len(a) != len(b):
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / len(a)
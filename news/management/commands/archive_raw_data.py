@@ -0,0 +1,54 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from news.models import Article, ArticleRawData
+
+
+class Command(BaseCommand):
+    help = "Move inline Article.raw_data payloads to compressed cold storage (ArticleRawData)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Articles moved per transaction (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        moved = raw_bytes = packed_bytes = 0
+
+        while True:
+            # Each batch commits on its own, so the command can be stopped and resumed
+            with transaction.atomic():
+                batch = list(
+                    Article.objects
+                    .filter(raw_data_legacy__isnull=False)
+                    .order_by("id")
+                    .select_for_update(skip_locked=True)
+                    .values_list("id", "raw_data_legacy")[:batch_size]
+                )
+                if not batch:
+                    break
+
+                rows = [
+                    ArticleRawData(article_id=article_id, payload=ArticleRawData.pack(data))
+                    for article_id, data in batch
+                ]
+                ArticleRawData.objects.bulk_create(
+                    rows, update_conflicts=True, unique_fields=["article"], update_fields=["payload"]
+                )
+                Article.objects.filter(id__in=[article_id for article_id, _ in batch]).update(raw_data_legacy=None)
+
+            moved += len(batch)
+            raw_bytes += sum(len(json.dumps(data, separators=(",", ":"))) for _, data in batch)
+            packed_bytes += sum(len(row.payload) for row in rows)
+            self.stdout.write(f"   ∟ {moved} articles moved")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Moved {moved} payloads to cold storage ({packed_bytes / max(raw_bytes, 1):.0%} of their JSON size)."
+        ))
+        if moved:
+            self.stdout.write("   ∟ Run VACUUM (FULL) news_article to return the freed space to the OS.")
@@ -0,0 +1,64 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from news.models import FetchLog
+from news.services import api_budget, poll_article_delta
+from news.utils import get_nearest_fomc_meeting, is_in_burst_window
+
+
+class Command(BaseCommand):
+    help = "Poll Event Registry every few seconds for new articles around an FOMC decision"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=None,
+            help='Seconds to poll for (default: until the burst window ends)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Poll even outside the burst window (for testing)'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        min_interval = settings.FOMC_BURST_MIN_INTERVAL_SECONDS
+        max_interval = settings.FOMC_BURST_MAX_INTERVAL_SECONDS
+        interval = min_interval
+        polls = total_new = 0
+
+        while options['force'] or is_in_burst_window():
+            elapsed = time.monotonic() - started
+            if options['duration'] is not None and elapsed >= options['duration']:
+                break
+            if api_budget.remaining() == 0:
+                self.stdout.write(self.style.WARNING("⚠️  API budget exhausted, burst polling stopped."))
+                break
+
+            try:
+                new_saved, updated = poll_article_delta(stream="burst")
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"   ∟ Burst poll failed: {e}"))
+                new_saved, updated = 0, 0
+            polls += 1
+            total_new += new_saved
+            if new_saved:
+                self.stdout.write(self.style.MIGRATE_LABEL(f"   ∟ Burst: {new_saved} new, {updated} updated."))
+
+            # Poll fast while headlines are flowing, back off when quiet
+            interval = min_interval if new_saved else min(interval * 1.5, max_interval)
+
+            # Spread the remaining API budget over the rest of the window
+            window_end = get_nearest_fomc_meeting() + timedelta(minutes=settings.FOMC_BURST_MINUTES_AFTER)
+            seconds_left = (window_end - timezone.now()).total_seconds()
+            if options['duration'] is not None:
+                seconds_left = min(seconds_left, options['duration'] - elapsed)
+            budget_interval = seconds_left / max(api_budget.remaining(), 1)
+
+            time.sleep(max(interval, budget_interval))
+
+        FetchLog.objects.create(message=f"Burst polling: {polls} polls, {total_new} new articles")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from news.models import Article
+from news.services import index_near_duplicates
+
+
+class Command(BaseCommand):
+    help = "Build the near-duplicate index (MinHash/LSH) for articles ingested before it existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Re-index every article, not only the ones without a signature'
+        )
+
+    def handle(self, *args, **options):
+        articles = Article.objects.order_by("id").only(
+            "id", "body", "published_at", "minhash", "lsh_buckets", "duplicate_of_id"
+        )
+        if options['rebuild']:
+            articles.update(minhash=[], lsh_buckets=[], duplicate_of=None)
+        else:
+            articles = articles.filter(minhash=[])
+
+        indexed = duplicates = 0
+        # In ingest order, so every article is matched against the ones before it
+        for article in articles.iterator(chunk_size=500):
+            index_near_duplicates(article)
+            indexed += 1
+            duplicates += article.duplicate_of_id is not None
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Indexed {indexed} articles, {duplicates} near-duplicates linked."
+        ))
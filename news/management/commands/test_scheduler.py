@@ -1,21 +1,29 @@
 from datetime import timedelta
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from news.models import FetchLog
-from news.utils import is_in_mock_critical_window
+from news.utils import is_in_mock_critical_window, is_near_fomc_decision
 from news.services import retrieve_articles, save_articles
 import time
-from news.selectors import get_articles_from_db
+from news.selectors import select_articles
 from multi_agent_systems.helpers import (
     format_articles_for_agent,
     create_idx_to_metadata_map,
-    enrich_summary_to_app_model
+    enrich_summary_to_app_model,
+    build_update_state
 )
-from multi_agent_systems.dn_mas.runner import dn_mas_runner
+from multi_agent_systems.dn_mas.runner import dn_mas_hierarchical_runner, dn_mas_update_runner
 from multi_agent_systems.dn_mas.schemas import SummaryWithCitations
-from multi_agent_systems.st_mas.runner import st_mas_runner
-from multi_agent_systems.st_mas.schemas import convert_topic_analysis_indexes_to_uuids
-from multi_agent_systems.services import save_dn_mas_summary, save_st_mas_collection
+from multi_agent_systems.services import (
+    save_dn_mas_summary,
+    stream_st_mas_collection,
+    publish_flash_summary,
+    get_flash_agent_name,
+    plan_incremental_update
+)
+from multi_agent_systems.governor import Lane
+from multi_agent_systems.tiers import collect_model_tiers, use_latency_budget
 import asyncio
 
 class Command(BaseCommand):
@@ -59,10 +67,12 @@ class Command(BaseCommand):
                 # Retrieve articles for agent
                 start_date = now - timedelta(days=1)
                 end_date = now
-                limit = 5
+                # DN-MAS batches larger windows through its hierarchical mode
+                limit = 100
                 
-                articles_qs = get_articles_from_db(start_date, end_date)
-                articles_list = list(articles_qs[:limit])
+                # Syndicated copies take one slot; the window is filled by quality and
+                # novelty up to the token budget instead of with the newest articles
+                articles_list = select_articles(start_date, end_date, limit=limit)
                 
                 if articles_list:
                     # Shared Prep
@@ -75,39 +85,88 @@ class Command(BaseCommand):
                         "context": f"Automated scheduler run at {now.strftime('%Y-%m-%d %H:%M')}",
                     }
                     
-                    # --- RUN DN-MAS ---
-                    self.stdout.write(self.style.SUCCESS(f"   ∟ Triggering DN-MAS with {len(articles_list)} articles..."))
-                    dn_final_state = asyncio.run(dn_mas_runner(initial_state))
-                    
-                    if "summary_with_citations" in dn_final_state:
-                        raw_result = SummaryWithCitations(**dn_final_state["summary_with_citations"])
-                        enriched_summary = enrich_summary_to_app_model(raw_result, idx_to_metadata)
-                        
-                        summary_obj = save_dn_mas_summary(
-                            enriched_summary=enriched_summary,
-                            articles_list=articles_list,
-                            start_date=start_date,
-                            end_date=end_date,
-                            agent_name="scheduler"
+                    # Critical-window runs preempt any other model traffic and use the fastest model tier
+                    lane = Lane.CRITICAL if is_critical else Lane.LIVE
+                    budget = settings.LLM_LATENCY_BUDGET_SECONDS
+
+                    # Around the decision a headline-only flash summary is published while DN-MAS runs
+                    run_flash = is_critical or is_near_fomc_decision(
+                        now,
+                        before=timedelta(minutes=settings.FOMC_FLASH_MINUTES_BEFORE),
+                        after=timedelta(minutes=settings.FOMC_FLASH_MINUTES_AFTER)
+                    )
+
+                    # Revise the previous summary when only a few articles are new, else run in full
+                    plan = plan_incremental_update(articles_list, agent_name="scheduler")
+                    previous_summary, new_articles = plan if plan else (None, articles_list)
+                    dn_idx_to_metadata = idx_to_metadata
+                    if previous_summary is not None:
+                        update_state, update_metadata = build_update_state(
+                            previous_summary, new_articles, initial_state["context"]
                         )
-                        self.stdout.write(self.style.SUCCESS(f"     ✅ DN-MAS Complete: Saved Summary {summary_obj.uuid}"))
+                        dn_idx_to_metadata = create_idx_to_metadata_map(update_metadata)
+
+                    async def run_dn_mas():
+                        flash = None
+                        if run_flash:
+                            flash = asyncio.create_task(publish_flash_summary(
+                                formatted=formatted,
+                                articles_list=articles_list,
+                                start_date=start_date,
+                                end_date=end_date,
+                                context=initial_state["context"],
+                                agent_name=get_flash_agent_name("scheduler"),
+                                lane=Lane.CRITICAL
+                            ))
+                        if previous_summary is None:
+                            state = await dn_mas_hierarchical_runner(initial_state, lane=lane)
+                        else:
+                            state = await dn_mas_update_runner(update_state, lane=lane)
+                        # The flash summary must be saved before the full one supersedes it
+                        if flash is not None:
+                            flash_obj = await flash
+                            if flash_obj:
+                                self.stdout.write(self.style.SUCCESS(f"     ⚡ Flash summary published: {flash_obj.uuid}"))
+                        return state
+
+                    # --- RUN DN-MAS ---
+                    if not new_articles:
+                        self.stdout.write(self.style.SUCCESS(f"   ∟ DN-MAS skipped: no new articles since Summary {previous_summary.uuid}"))
+                    else:
+                        if previous_summary is None:
+                            self.stdout.write(self.style.SUCCESS(f"   ∟ Triggering DN-MAS with {len(articles_list)} articles..."))
+                        else:
+                            self.stdout.write(self.style.SUCCESS(f"   ∟ Updating Summary {previous_summary.uuid} with {len(new_articles)} new articles..."))
+                        with use_latency_budget(budget):
+                            dn_final_state = asyncio.run(run_dn_mas())
+
+                        if dn_final_state.get("summary_with_citations"):
+                            raw_result = SummaryWithCitations(**dn_final_state["summary_with_citations"])
+                            enriched_summary = enrich_summary_to_app_model(raw_result, dn_idx_to_metadata)
+
+                            summary_obj = save_dn_mas_summary(
+                                enriched_summary=enriched_summary,
+                                articles_list=articles_list,
+                                start_date=start_date,
+                                end_date=end_date,
+                                agent_name="scheduler",
+                                model_tiers=collect_model_tiers(dn_final_state),
+                                previous=previous_summary
+                            )
+                            self.stdout.write(self.style.SUCCESS(f"     ✅ DN-MAS Complete: Saved Summary {summary_obj.uuid}"))
 
                     # --- RUN ST-MAS ---
+                    # Topics are saved as each agent finishes; the group stays "in progress" until the last one lands
                     self.stdout.write(self.style.SUCCESS(f"   ∟ Triggering ST-MAS (Parallel Topics)..."))
-                    st_final_state = asyncio.run(st_mas_runner(initial_state))
-                    
-                    # Convert labels to metadata
-                    topic_collection = convert_topic_analysis_indexes_to_uuids(
-                        llm_output=st_final_state,
-                        article_uuids=metadata_list
-                    )
-                    
-                    group_obj = save_st_mas_collection(
-                        collection=topic_collection,
-                        articles_list=articles_list,
-                        agent_name="scheduler"
-                    )
-                    self.stdout.write(self.style.SUCCESS(f"     ✅ ST-MAS Complete: Saved Group {group_obj.uuid} ({len(topic_collection.topics)} topics)"))
+                    with use_latency_budget(budget):
+                        group_obj = asyncio.run(stream_st_mas_collection(
+                            initial_state=initial_state,
+                            metadata_list=metadata_list,
+                            articles_list=articles_list,
+                            agent_name="scheduler",
+                            lane=lane
+                        ))
+                    self.stdout.write(self.style.SUCCESS(f"     ✅ ST-MAS Complete: Saved Group {group_obj.uuid} ({group_obj.topics.count()} topics, {group_obj.status})"))
 
                 log_msg = f"{msg} | Fetched: {len(articles)}, New: {new_saved}, Updated: {updated}"
                 FetchLog.objects.create(message=log_msg)
@@ -0,0 +1,35 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:55
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_fetchwatermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='news.article'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='lsh_buckets',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='minhash',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['lsh_buckets'], name='news_articl_lsh_buc_ff98f2_gin'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_article_near_duplicates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='source',
+            name='importance_rank',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
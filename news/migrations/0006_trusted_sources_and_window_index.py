@@ -0,0 +1,22 @@
+# Generated by Django 6.1.2 on 2026-10-19 06:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_source_importance_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='source',
+            name='is_trusted',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['lang', '-published_at'], name='article_lang_published_idx'),
+        ),
+    ]
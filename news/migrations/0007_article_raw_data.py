@@ -0,0 +1,39 @@
+# Generated by Django 6.1.2 on 2026-10-19 06:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_trusted_sources_and_window_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleRawData',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='raw_payload', serialize=False, to='news.article')),
+                ('payload', models.BinaryField()),
+            ],
+            options={
+                'verbose_name_plural': 'Article raw data',
+            },
+        ),
+        # The column keeps its name; archive_raw_data moves its rows to ArticleRawData
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name='article',
+                    old_name='raw_data',
+                    new_name='raw_data_legacy',
+                ),
+                migrations.AlterField(
+                    model_name='article',
+                    name='raw_data_legacy',
+                    field=models.JSONField(blank=True, db_column='raw_data', editable=False, null=True),
+                ),
+            ],
+        ),
+    ]
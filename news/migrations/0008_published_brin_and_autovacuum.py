@@ -0,0 +1,30 @@
+# Generated by Django 6.1.2 on 2026-10-19 06:10
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+# Vacuum and analyze after ~2% / 1% of rows change instead of the 20% / 10% defaults,
+# so the batched retention deletes are cleaned up in small, cheap passes
+AUTOVACUUM = "autovacuum_vacuum_scale_factor = 0.02, autovacuum_analyze_scale_factor = 0.01"
+TABLES = ["news_article", "news_articlerawdata"]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_article_raw_data'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['published_at'], name='article_published_brin'),
+        ),
+    ] + [
+        migrations.RunSQL(
+            f"ALTER TABLE {table} SET ({AUTOVACUUM})",
+            f"ALTER TABLE {table} RESET (autovacuum_vacuum_scale_factor, autovacuum_analyze_scale_factor)",
+        )
+        for table in TABLES
+    ]
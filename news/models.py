@@ -1,4 +1,9 @@
+import json
 import uuid
+import zlib
+
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import BrinIndex, GinIndex
 from django.db import models
 
 
@@ -7,6 +12,10 @@ class Source(models.Model):
     title = models.CharField(max_length=255, null=True, blank=True)
     data_type = models.CharField(max_length=50, null=True, blank=True)
     image = models.URLField(max_length=1000, null=True, blank=True)
+    # Event Registry importance rank (1 is the most important source)
+    importance_rank = models.IntegerField(null=True, blank=True)
+    # Title listed in SOURCE_TITLES; kept in sync by services.sync_trusted_sources
+    is_trusted = models.BooleanField(default=False, db_index=True, editable=False)
 
     def __str__(self):
         return self.title or self.uri
@@ -40,14 +49,102 @@ class Article(models.Model):
     authors = models.JSONField(default=list, blank=True, null=True)
     concepts = models.JSONField(default=list, blank=True, null=True)
     categories = models.JSONField(default=list, blank=True, null=True)
-    raw_data = models.JSONField(null=True, blank=True)  # Full backup
+    # Inline payload of articles saved before cold storage; moved out by archive_raw_data
+    raw_data_legacy = models.JSONField(null=True, blank=True, db_column="raw_data", editable=False)
+
+    # Near-duplicate index (see dedup): MinHash signature of the body and its LSH buckets
+    minhash = ArrayField(models.BigIntegerField(), default=list, blank=True)
+    lsh_buckets = ArrayField(models.BigIntegerField(), default=list, blank=True)
+    # Earliest ingested copy of a syndicated story, null for originals
+    duplicate_of = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, related_name="duplicates", null=True, blank=True
+    )
 
     class Meta:
         ordering = ["-published_at"]
+        indexes = [
+            GinIndex(fields=["lsh_buckets"]),
+            # Agent windows: English articles in a publication range, newest first
+            models.Index(fields=["lang", "-published_at"], name="article_lang_published_idx"),
+            # Ingest order follows publication time: a few kB block-range index serves
+            # retention and other language-agnostic time ranges
+            BrinIndex(fields=["published_at"], name="article_published_brin"),
+        ]
 
     def __str__(self):
         return self.title or self.uri
 
+    @property
+    def raw_data(self):
+        """
+        Full Event Registry payload (backup), rehydrated from cold storage
+        (ArticleRawData) on first access.
+        """
+        if "_raw_data" not in self.__dict__:
+            if self.raw_data_legacy is not None:
+                self._raw_data = self.raw_data_legacy
+            else:
+                payload = (
+                    ArticleRawData.objects.filter(article_id=self.pk).values_list("payload", flat=True).first()
+                    if self.pk else None
+                )
+                self._raw_data = ArticleRawData.unpack(payload) if payload is not None else None
+        return self._raw_data
+
+    @raw_data.setter
+    def raw_data(self, value):
+        self._raw_data = value
+        self._raw_data_changed = True
+
+    def save(self, *args, **kwargs):
+        raw_data_changed = self.__dict__.pop("_raw_data_changed", False)
+        if raw_data_changed:
+            # The payload goes to cold storage only
+            self.raw_data_legacy = None
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "raw_data_legacy"}
+        super().save(*args, **kwargs)
+        if raw_data_changed:
+            ArticleRawData.store(self.pk, self._raw_data)
+
+
+class ArticleRawData(models.Model):
+    """
+    Cold storage for Article.raw_data: the zlib-compressed JSON payload, kept
+    out of the hot news_article table and read only when requested.
+    """
+    article = models.OneToOneField(
+        Article, on_delete=models.CASCADE, primary_key=True, related_name="raw_payload"
+    )
+    payload = models.BinaryField()
+
+    class Meta:
+        verbose_name_plural = "Article raw data"
+
+    def __str__(self):
+        return f"Raw data of article {self.article_id}"
+
+    @staticmethod
+    def pack(data) -> bytes:
+        return zlib.compress(json.dumps(data, separators=(",", ":")).encode(), level=6)
+
+    @staticmethod
+    def unpack(payload) -> object:
+        return json.loads(zlib.decompress(payload))
+
+    @classmethod
+    def store(cls, article_id: int, data) -> None:
+        """Upserts (or, for None, deletes) an article's payload in one query."""
+        if data is None:
+            cls.objects.filter(article_id=article_id).delete()
+            return
+        cls.objects.bulk_create(
+            [cls(article_id=article_id, payload=cls.pack(data))],
+            update_conflicts=True,
+            unique_fields=["article"],
+            update_fields=["payload"],
+        )
+
 
 class FetchLog(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
@@ -55,3 +152,16 @@ class FetchLog(models.Model):
 
     def __str__(self):
         return f"{self.timestamp} - {self.message}"
+
+
+class FetchWatermark(models.Model):
+    """
+    Newest publication time already ingested by a polling stream, so the next
+    poll only has to fetch the delta.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    published_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.published_at}"
@@ -0,0 +1,131 @@
+"""
+Budget-aware article selection for agent windows.
+
+Each candidate gets a quality score from its source's importance rank, its
+Event Registry relevance and its recency. The window is then filled greedily
+with maximal marginal relevance: the next article is the one with the best
+trade-off between quality and novelty (low shingle overlap with the articles
+already picked) that still fits the token budget.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from .dedup import shingles
+
+
+# Quality score weights (sum to 1)
+SOURCE_WEIGHT = 0.3
+RELEVANCE_WEIGHT = 0.4
+RECENCY_WEIGHT = 0.3
+
+# Event Registry importance ranks run from 1 (most important) to about a million
+MAX_SOURCE_RANK = 1_000_000
+# Score of a source without a known rank
+DEFAULT_SOURCE_SCORE = 0.5
+
+# Word bigrams: overlapping phrasing and vocabulary, not only verbatim copies
+NOVELTY_SHINGLE_SIZE = 2
+
+
+@dataclass
+class Candidate:
+    article: object
+    quality: float
+    tokens: int
+    shingles: set
+
+
+def estimate_tokens(article) -> int:
+    """Rough token count (~4 characters per token) of an article in an agent prompt."""
+    return (len(article.title or "") + len(article.body or "")) // 4
+
+
+def source_score(importance_rank: Optional[int]) -> float:
+    """Maps an importance rank to 0-1 on a log scale (rank 1 scores 1)."""
+    if not importance_rank or importance_rank < 1:
+        return DEFAULT_SOURCE_SCORE
+    return max(0.0, 1 - math.log(importance_rank) / math.log(MAX_SOURCE_RANK))
+
+
+def recency_score(published_at: Optional[datetime], now: datetime, half_life_hours: float) -> float:
+    """Halves every half_life_hours of age."""
+    if published_at is None:
+        return 0.0
+    age_hours = max((now - published_at).total_seconds() / 3600, 0.0)
+    return 0.5 ** (age_hours / half_life_hours)
+
+
+def similarity(a: set, b: set) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def build_candidates(articles: list, now: datetime, half_life_hours: float) -> List[Candidate]:
+    """Scores the articles (AgentArticle rows); relevance is normalised by the best candidate's."""
+    max_relevance = max((article.relevance or 0 for article in articles), default=0) or 1
+    return [
+        Candidate(
+            article=article,
+            quality=(
+                SOURCE_WEIGHT * source_score(article.source_importance_rank)
+                + RELEVANCE_WEIGHT * (article.relevance or 0) / max_relevance
+                + RECENCY_WEIGHT * recency_score(article.published_at, now, half_life_hours)
+            ),
+            tokens=estimate_tokens(article),
+            shingles=shingles(f"{article.title or ''} {article.body or ''}", NOVELTY_SHINGLE_SIZE),
+        )
+        for article in articles
+    ]
+
+
+def mmr_select(
+    candidates: List[Candidate],
+    token_budget: int,
+    limit: Optional[int] = None,
+    diversity: float = 0.3,
+) -> List[Candidate]:
+    """
+    Greedy maximal-marginal-relevance selection under a token budget.
+
+    Args:
+        candidates: Scored candidates
+        token_budget: Maximum total tokens of the selection
+        limit: Optional maximum number of articles
+        diversity: Weight of novelty against quality (0 ranks by quality only)
+
+    Returns:
+        The selected candidates, in selection order (most valuable first)
+    """
+    selected: List[Candidate] = []
+    remaining = list(candidates)
+    # Highest similarity of each remaining candidate to the selection so far
+    redundancy = [0.0] * len(remaining)
+    budget = token_budget
+
+    while remaining and (limit is None or len(selected) < limit):
+        best = None
+        best_score = -math.inf
+        for i, candidate in enumerate(remaining):
+            if candidate.tokens > budget:
+                continue
+            score = (1 - diversity) * candidate.quality - diversity * redundancy[i]
+            if score > best_score:
+                best, best_score = i, score
+        if best is None:
+            break
+
+        picked = remaining.pop(best)
+        redundancy.pop(best)
+        selected.append(picked)
+        budget -= picked.tokens
+        redundancy = [
+            max(current, similarity(candidate.shingles, picked.shingles))
+            for current, candidate in zip(redundancy, remaining)
+        ]
+
+    return selected
@@ -3,18 +3,54 @@ Selectors for the news app.
 These functions query the local database and return Article/Source querysets.
 """
 
+import uuid
+from dataclasses import dataclass
 from datetime import datetime
+from typing import List, Optional
 
-from django.db.models import QuerySet
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import F, OuterRef, QuerySet, Subquery, Window
+from django.db.models.functions import Coalesce, FirstValue
 
-from core.constants import SOURCE_TITLES
 from .models import Article
+from .selection import build_candidates, mmr_select
+
+
+# Columns the agent pipelines read; raw_data and the enrichment JSON are never loaded
+AGENT_ARTICLE_FIELDS = (
+    "id", "uuid", "title", "url", "body", "relevance", "published_at",
+    "source__title", "source__uri", "source__importance_rank",
+)
+
+
+@dataclass
+class AgentArticle:
+    """Lightweight, values()-based projection of an Article for the agent pipelines."""
+    id: int
+    uuid: uuid.UUID
+    title: Optional[str]
+    url: Optional[str]
+    body: Optional[str]
+    source: Optional[str]  # Source title, or its URI
+    source_importance_rank: Optional[int]
+    relevance: Optional[int]
+    published_at: Optional[datetime]
+    # Set on representatives of collapsed near-duplicates (see collapse_near_duplicates)
+    syndicated_by: Optional[List[str]] = None
+
+
+@dataclass
+class ArticleHeadline:
+    title: Optional[str]
+    published_at: Optional[datetime]
 
 
 def get_articles_from_db(
     start_date: datetime,
     end_date: datetime,
-    filter_sources: bool = False
+    filter_sources: bool = False,
+    collapse_duplicates: bool = False
 ) -> QuerySet[Article]:
     """
     Retrieves English articles within a date range.
@@ -22,7 +58,9 @@ def get_articles_from_db(
     Args:
         start_date: Start of the date range (inclusive)
         end_date: End of the date range (inclusive)
-        filter_sources: If True, only return articles from trusted sources (SOURCE_TITLES)
+        filter_sources: If True, only return articles from trusted sources (Source.is_trusted)
+        collapse_duplicates: If True, return one article per near-duplicate cluster
+            (see collapse_near_duplicates)
     
     Returns:
         QuerySet of Article objects
@@ -33,7 +71,114 @@ def get_articles_from_db(
     )
     
     if filter_sources:
-        articles_qs = articles_qs.filter(source__title__in=SOURCE_TITLES)
-        print(f"Filtering to {len(SOURCE_TITLES)} trusted sources")
+        articles_qs = articles_qs.filter(source__is_trusted=True)
+        print("Filtering to trusted sources")
+
+    if collapse_duplicates:
+        articles_qs = collapse_near_duplicates(articles_qs)
     
     return articles_qs
+
+
+def get_agent_articles(articles_qs: QuerySet[Article]) -> List[AgentArticle]:
+    """
+    Reads a queryset as AgentArticle rows, fetching only AGENT_ARTICLE_FIELDS
+    (and syndicated_by when annotated).
+    """
+    fields = AGENT_ARTICLE_FIELDS
+    if "syndicated_by" in articles_qs.query.annotations:
+        fields += ("syndicated_by",)
+    return [
+        AgentArticle(
+            id=row["id"],
+            uuid=row["uuid"],
+            title=row["title"],
+            url=row["url"],
+            body=row["body"],
+            source=row["source__title"] or row["source__uri"],
+            source_importance_rank=row["source__importance_rank"],
+            relevance=row["relevance"],
+            published_at=row["published_at"],
+            syndicated_by=row.get("syndicated_by"),
+        )
+        for row in articles_qs.values(*fields)
+    ]
+
+
+def get_latest_article() -> Optional[ArticleHeadline]:
+    """
+    Returns the title and publication time of the newest article.
+    """
+    row = Article.objects.order_by("-published_at").values("title", "published_at").first()
+    return ArticleHeadline(**row) if row else None
+
+
+def collapse_near_duplicates(articles_qs: QuerySet[Article]) -> QuerySet[Article]:
+    """
+    Keeps one representative per near-duplicate cluster of the queryset: the
+    original if it is in the queryset, else the earliest published copy.
+
+    Each representative is annotated with `syndicated_by`, the titles of
+    every source in the queryset carrying the story (its own included).
+    """
+    cluster_id = Coalesce("duplicate_of_id", "id")
+    syndicated_by = (
+        articles_qs
+        .annotate(cluster_id=cluster_id)
+        .filter(cluster_id=OuterRef("cluster_id"))
+        .values("cluster_id")
+        .annotate(sources=ArrayAgg("source__title", distinct=True, default=[]))
+        .values("sources")
+    )
+    return (
+        articles_qs
+        .annotate(
+            cluster_id=cluster_id,
+            representative_id=Window(
+                FirstValue("id"),
+                partition_by=[cluster_id],
+                order_by=[F("duplicate_of_id").asc(nulls_first=True), "published_at", "id"],
+            ),
+        )
+        .filter(id=F("representative_id"))
+        .annotate(syndicated_by=Subquery(syndicated_by))
+    )
+
+
+def select_articles(
+    start_date: datetime,
+    end_date: datetime,
+    token_budget: Optional[int] = None,
+    limit: Optional[int] = None,
+    filter_sources: bool = False,
+) -> List[AgentArticle]:
+    """
+    Picks the agent window within a date range: near-duplicates collapsed,
+    then the best set of articles by source rank, relevance, recency and
+    novelty that fits the token budget (see selection.mmr_select).
+
+    Args:
+        start_date: Start of the date range (inclusive)
+        end_date: End of the date range (inclusive)
+        token_budget: Maximum estimated prompt tokens of the selected articles,
+            None for NEWS_SELECTION_TOKEN_BUDGET
+        limit: Optional maximum number of articles
+        filter_sources: If True, only consider trusted sources (Source.is_trusted)
+
+    Returns:
+        List of AgentArticle rows, newest first like every other article list
+        (their order becomes the agents' article indices)
+    """
+    token_budget = token_budget or settings.NEWS_SELECTION_TOKEN_BUDGET
+    articles = get_agent_articles(
+        get_articles_from_db(start_date, end_date, filter_sources, collapse_duplicates=True)
+    )
+    candidates = build_candidates(
+        articles, now=end_date, half_life_hours=settings.NEWS_SELECTION_RECENCY_HALF_LIFE_HOURS
+    )
+    selected = mmr_select(
+        candidates, token_budget, limit=limit, diversity=settings.NEWS_SELECTION_DIVERSITY
+    )
+    return sorted(
+        (candidate.article for candidate in selected), key=lambda article: article.published_at, reverse=True
+    )
@@ -1,8 +1,17 @@
+import datetime
 import os
+import time
+from collections import deque
+
 import requests
+from django.conf import settings
+from django.db import transaction
 from django.utils.dateparse import parse_datetime
 from django.utils import timezone
-from .models import Article, Source
+from core.constants import SOURCE_TITLES
+from .dedup import minhash_signature, lsh_buckets, estimate_jaccard, DUPLICATE_THRESHOLD
+from .models import Article, ArticleRawData, Source, FetchWatermark
+from .utils import append_to_archive
 
 url = "https://eventregistry.org/api/v1/article/"
 
@@ -13,6 +22,7 @@ def create_payload(
     api_key=os.getenv("EVENTREGISTRY_API_KEY"),
     date_start=None,
     date_end=None,
+    minimal=False,
 ):
     # Default to recent window if not provided, or handle None gracefully?
     # Existing code had hardcoded string. Let's default to a safe value or just use what's passed.
@@ -88,9 +98,47 @@ def create_payload(
         "includeSourceRanking": True,
         "apiKey": api_key,  # <- keep this secret
     }
+    if minimal:
+        # Burst polls only need what the pipelines read: no concept, link, duplicate or source enrichment
+        payload = {key: value for key, value in payload.items() if not key.startswith("include")}
     return payload
 
 
+class ApiRateBudget:
+    """
+    Sliding one-hour request budget for the Event Registry API, shared by the
+    regular and burst fetches of the process.
+    """
+
+    def __init__(self, max_requests_per_hour, clock=time.monotonic):
+        self.max_requests_per_hour = max_requests_per_hour
+        self.clock = clock
+        self._requests = deque()
+
+    def _prune(self, now):
+        while self._requests and now - self._requests[0] >= 3600:
+            self._requests.popleft()
+
+    def remaining(self):
+        self._prune(self.clock())
+        return self.max_requests_per_hour - len(self._requests)
+
+    def acquire(self):
+        """
+        Records a request if it fits the budget. Never waits: when the budget
+        is spent it returns False and the caller skips the request.
+        """
+        now = self.clock()
+        self._prune(now)
+        if len(self._requests) >= self.max_requests_per_hour:
+            return False
+        self._requests.append(now)
+        return True
+
+
+api_budget = ApiRateBudget(settings.EVENTREGISTRY_MAX_REQUESTS_PER_HOUR)
+
+
 def retrieve_articles(
     date_start, date_end, page_numbers=1, articles_count=5, api_key=None
 ):
@@ -109,6 +157,9 @@ def retrieve_articles(
 
         payload = create_payload(**payload_args)
         headers = {"Content-Type": "application/json"}
+        if not api_budget.acquire():
+            print(f"API budget exhausted, skipping page {page_number} and after")
+            break
         response = requests.post(url, json=payload, headers=headers)
         number_of_articles = len(response.json().get("articles", {}).get("results", []))
         if number_of_articles == 0:
@@ -121,6 +172,87 @@ def retrieve_articles(
     return total_data
 
 
+def retrieve_new_articles(watermark, date_end, articles_count=20, max_pages=3, api_key=None):
+    """
+    Retrieves only the articles published since the watermark, with the minimal payload.
+
+    Results are sorted newest first, so paging stops at the first page that
+    reaches back to the watermark. The API filters by day only; the delta is
+    cut at the exact watermark here. Articles published at the watermark
+    itself are kept, as some may not be stored yet (saving dedups by uri).
+
+    Returns:
+        (articles, complete): complete is False when paging stopped before
+        reaching the watermark (page limit, spent budget or a failed request)
+    """
+    new_articles = []
+    for page_number in range(1, max_pages + 1):
+        payload_args = {
+            "page_number": page_number,
+            "articles_count": articles_count,
+            "date_start": watermark,
+            "date_end": date_end,
+            "minimal": True,
+        }
+        if api_key:
+            payload_args["api_key"] = api_key
+
+        if not api_budget.acquire():
+            print("API budget exhausted, delta fetch cut short")
+            return new_articles, False
+        response = requests.post(url, json=create_payload(**payload_args), headers={"Content-Type": "application/json"})
+        if response.status_code != 200:
+            print(f"Delta fetch failed with status {response.status_code}")
+            return new_articles, False
+
+        results = response.json().get("articles", {}).get("results", [])
+        page_new = [
+            data for data in results
+            if data.get("dateTimePub") and parse_datetime(data["dateTimePub"]) >= watermark
+        ]
+        new_articles.extend(page_new)
+        if len(page_new) < len(results) or len(results) < articles_count:
+            return new_articles, True
+
+    print(f"Delta fetch stopped after {max_pages} pages of new articles")
+    return new_articles, False
+
+
+def poll_article_delta(stream="burst", articles_count=20):
+    """
+    Fetches and saves the articles published since the stream's watermark, then advances it.
+    The first poll of a stream starts from the newest stored article. A fetch
+    that stopped before reaching the watermark leaves it where it is, so the
+    next poll asks for the older articles again.
+
+    Returns:
+        (saved_count, updated_count)
+    """
+    now = timezone.now()
+    watermark = FetchWatermark.objects.filter(name=stream).first()
+    if watermark is None:
+        latest = (
+            Article.objects
+            .exclude(published_at__isnull=True)
+            .order_by("-published_at")
+            .values_list("published_at", flat=True)
+            .first()
+        )
+        watermark = FetchWatermark(
+            name=stream,
+            published_at=latest or now - datetime.timedelta(hours=1)
+        )
+
+    articles, complete = retrieve_new_articles(watermark.published_at, now, articles_count=articles_count)
+    saved, updated = save_articles(articles)
+
+    if complete:
+        published = [parse_datetime(data["dateTimePub"]) for data in articles]
+        watermark.published_at = max([watermark.published_at, *published])
+    watermark.save()
+    return saved, updated
+
+
 def save_articles(articles_data):
     """
     Takes a list of article dictionaries from the API and saves/updates them in the database.
@@ -135,42 +267,157 @@ def save_articles(articles_data):
 
         source = None
         if source_uri:
+            importance_rank = (source_data.get("ranking") or {}).get("importanceRank")
             source, _ = Source.objects.get_or_create(
                 uri=source_uri,
                 defaults={
                     "title": source_data.get("title"),
                     "data_type": source_data.get("dataType"),
                     "image": source_data.get("image"),
+                    "importance_rank": importance_rank,
+                    "is_trusted": source_data.get("title") in SOURCE_TITLES,
                 },
             )
+            # Ranks move over time; minimal (burst) payloads carry none
+            if importance_rank and source.importance_rank != importance_rank:
+                source.importance_rank = importance_rank
+                source.save(update_fields=["importance_rank"])
 
         # 2. Handle Article
         pub_date_str = data.get("dateTimePub")
         pub_date = parse_datetime(pub_date_str) if pub_date_str else None
 
+        defaults = {
+            "url": data.get("url"),
+            "title": data.get("title"),
+            "body": data.get("body"),
+            "lang": data.get("lang"),
+            "data_type": data.get("dataType"),
+            "source": source,
+            "sentiment": data.get("sentiment"),
+            "relevance": data.get("relevance"),
+            "image": data.get("image"),
+            "published_at": pub_date,
+            "authors": data.get("authors"),
+            "concepts": data.get("concepts"),
+            "categories": data.get("categories"),
+            "raw_data": data,
+        }
+        # A minimal (burst) payload lacks the enrichment: never let it overwrite a full record
+        create_defaults = defaults
+        if "concepts" not in data:
+            defaults = {
+                field: value for field, value in defaults.items()
+                if field not in ("authors", "concepts", "categories", "image", "raw_data")
+            }
+
         article, created = Article.objects.update_or_create(
             uri=data.get("uri"),
-            defaults={
-                "url": data.get("url"),
-                "title": data.get("title"),
-                "body": data.get("body"),
-                "lang": data.get("lang"),
-                "data_type": data.get("dataType"),
-                "source": source,
-                "sentiment": data.get("sentiment"),
-                "relevance": data.get("relevance"),
-                "image": data.get("image"),
-                "published_at": pub_date,
-                "authors": data.get("authors"),
-                "concepts": data.get("concepts"),
-                "categories": data.get("categories"),
-                "raw_data": data,
-            },
+            defaults=defaults,
+            create_defaults=create_defaults,
         )
 
+        index_near_duplicates(article)
+
         if created:
             saved_count += 1
         else:
             updated_count += 1
 
     return saved_count, updated_count
+
+
+def index_near_duplicates(article):
+    """
+    Stores the article's MinHash signature and LSH buckets and links it to the
+    earliest ingested near-duplicate published around the same time, if any.
+    Articles whose body did not change are left as they are.
+    """
+    signature = minhash_signature(article.body)
+    if signature == article.minhash:
+        return
+
+    article.minhash = signature
+    article.lsh_buckets = lsh_buckets(signature)
+    article.duplicate_of = None
+
+    if article.lsh_buckets and article.published_at:
+        window = datetime.timedelta(days=settings.NEWS_DUPLICATE_WINDOW_DAYS)
+        candidates = (
+            Article.objects
+            .filter(
+                id__lt=article.id,
+                lsh_buckets__overlap=article.lsh_buckets,
+                published_at__range=(article.published_at - window, article.published_at + window),
+            )
+            .only("id", "minhash", "duplicate_of_id")
+            .order_by("id")
+        )
+        for candidate in candidates:
+            if estimate_jaccard(signature, candidate.minhash) >= DUPLICATE_THRESHOLD:
+                article.duplicate_of_id = candidate.duplicate_of_id or candidate.id
+                break
+
+    article.save(update_fields=["minhash", "lsh_buckets", "duplicate_of"])
+
+
+def sync_trusted_sources(**kwargs):
+    """
+    Sets Source.is_trusted from SOURCE_TITLES, so the trusted-source filter is
+    an indexed flag instead of an IN list over titles. Runs after every migrate
+    (see NewsConfig.ready); new sources get the flag when they are first saved.
+    """
+    trusted = Source.objects.filter(title__in=SOURCE_TITLES, is_trusted=False).update(is_trusted=True)
+    untrusted = Source.objects.filter(is_trusted=True).exclude(title__in=SOURCE_TITLES).update(is_trusted=False)
+    return trusted, untrusted
+
+
+def prune_articles(cutoff, batch_size: int = 1000, archive_dir=None) -> int:
+    """
+    Deletes articles published before the cutoff, oldest first, one batch per
+    transaction. Articles still provided to or cited by an agent output are kept,
+    so prune agent outputs first (multi_agent_systems.services.prune_agent_outputs).
+
+    Args:
+        cutoff: Articles published before this datetime expire
+        batch_size: Articles deleted per transaction
+        archive_dir: If set, expired articles and their raw payloads are appended
+            to monthly `articles-YYYY-MM.jsonl.gz` archives there before deletion
+
+    Returns:
+        Number of articles deleted
+    """
+    expired = Article.objects.filter(
+        published_at__lt=cutoff,
+        summaries_as_input=None,
+        topic_analysis_groups=None,
+        citation_sources=None,
+        topic_citation_sources=None,
+    ).order_by("published_at", "id")
+
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            batch = list(expired.values_list("id", flat=True)[:batch_size])
+            if not batch:
+                break
+            if archive_dir:
+                _archive_articles(batch, archive_dir)
+            Article.objects.filter(id__in=batch).delete()
+        deleted += len(batch)
+    return deleted
+
+
+def _archive_articles(article_ids, archive_dir) -> None:
+    payloads = dict(ArticleRawData.objects.filter(article_id__in=article_ids).values_list("article_id", "payload"))
+    rows = Article.objects.filter(id__in=article_ids).order_by("published_at", "id").values(
+        "id", "uuid", "uri", "url", "title", "body", "lang", "data_type", "sentiment", "relevance",
+        "published_at", "source__uri", "raw_data_legacy",
+    )
+    records = []
+    for row in rows:
+        raw_data = row.pop("raw_data_legacy")
+        payload = payloads.get(row.pop("id"))
+        row["raw_data"] = ArticleRawData.unpack(payload) if payload is not None else raw_data
+        records.append((row["published_at"], row))
+    append_to_archive(archive_dir, "articles", records)
@@ -1,2 +1,421 @@
+from datetime import timedelta
+from io import StringIO
+from typing import List, Optional
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from multi_agent_systems.helpers import format_articles_for_agent
+from .dedup import DUPLICATE_THRESHOLD, estimate_jaccard, minhash_signature
+from .models import Article, ArticleRawData, FetchLog, FetchWatermark, Source
+from .selection import Candidate, build_candidates, estimate_tokens, mmr_select
+from .selectors import AgentArticle, collapse_near_duplicates, get_articles_from_db, select_articles
+from .services import ApiRateBudget, poll_article_delta, retrieve_articles, save_articles, sync_trusted_sources
+
+
+def make_articles(n: int, source: Optional[Source] = None, **overrides) -> List[Article]:
+    """
+    Creates n English Fed articles (article-0, article-1, ...), a minute apart,
+    newest first. Override values may be callables of the article's index.
+    """
+    if source is None:
+        source, _ = Source.objects.get_or_create(uri="apnews.com", defaults={"title": "Associated Press"})
+    now = timezone.now()
+    articles = []
+    for i in range(n):
+        fields = {
+            "uri": f"article-{i}",
+            "title": f"Fed story {i}",
+            "body": "The Fed held rates steady.",
+            "lang": "eng",
+            "source": source,
+            "published_at": now - timedelta(minutes=i),
+            **overrides,
+        }
+        articles.append(Article.objects.create(**{
+            field: value(i) if callable(value) else value for field, value in fields.items()
+        }))
+    return articles
+
+
+FED_STORY = (
+    "The Federal Reserve held its benchmark interest rate steady on Wednesday, keeping the federal funds "
+    "rate in a range of 4.25 to 4.5 percent as policymakers weighed cooling inflation against a labor market "
+    "that has remained resilient. Chair Jerome Powell told reporters that the committee was in no hurry to "
+    "adjust policy and would wait for more data before deciding on further cuts this year, adding that "
+    "tariffs could push prices higher in the coming months. Markets had widely expected the decision."
+)
+
+
+class MinHashTests(SimpleTestCase):
+
+    def test_near_identical_texts_are_duplicates(self):
+        # A syndicated copy with a reworded last sentence
+        copy = FED_STORY.replace("Markets had widely expected the decision.", "The decision was widely expected.")
+
+        self.assertEqual(estimate_jaccard(minhash_signature(FED_STORY), minhash_signature(FED_STORY)), 1.0)
+        self.assertGreaterEqual(
+            estimate_jaccard(minhash_signature(FED_STORY), minhash_signature(copy)), DUPLICATE_THRESHOLD
+        )
+
+    def test_unrelated_texts_are_not(self):
+        other = (
+            "Oil prices fell for a third straight session on Tuesday after OPEC members signalled they would "
+            "raise output next month, while a stronger dollar weighed on commodities priced in the currency."
+        )
+
+        self.assertLess(estimate_jaccard(minhash_signature(FED_STORY), minhash_signature(other)), 0.2)
+
+    def test_empty_text_has_no_signature(self):
+        self.assertEqual(minhash_signature(""), [])
+        self.assertEqual(estimate_jaccard([], minhash_signature(FED_STORY)), 0.0)
+
+
+def make_api_article(uri: str, source_title: str, minutes: float, body: str = FED_STORY, now=None) -> dict:
+    """An Event Registry article payload published `minutes` before now."""
+    published_at = (now or timezone.now()) - timedelta(minutes=minutes)
+    return {
+        "uri": uri,
+        "title": f"Fed holds rates ({source_title})",
+        "body": body,
+        "lang": "eng",
+        "dateTimePub": published_at.isoformat(),
+        "source": {"uri": f"{source_title.lower()}.example", "title": source_title},
+        "concepts": [],
+    }
+
+
+class NearDuplicateTests(TestCase):
+
+    def test_syndicated_copies_collapse_to_the_original(self):
+        save_articles([
+            make_api_article("original", "Associated Press", minutes=30),
+            make_api_article("copy", "Yahoo Finance", minutes=20),
+            # A third, edited copy: linked to the original, not to the first copy
+            make_api_article("second-copy", "MarketWatch", minutes=10, body=FED_STORY + " Stocks rose."),
+            make_api_article("other", "Reuters", minutes=5, body="Oil prices fell on OPEC output plans."),
+        ])
+        original = Article.objects.get(uri="original")
+
+        self.assertIsNone(original.duplicate_of_id)
+        self.assertEqual(Article.objects.get(uri="copy").duplicate_of, original)
+        self.assertEqual(Article.objects.get(uri="second-copy").duplicate_of, original)
+        self.assertIsNone(Article.objects.get(uri="other").duplicate_of_id)
+
+        representatives = {
+            article.uri: article for article in collapse_near_duplicates(Article.objects.all())
+        }
+        self.assertEqual(set(representatives), {"original", "other"})
+        self.assertEqual(
+            sorted(representatives["original"].syndicated_by),
+            ["Associated Press", "MarketWatch", "Yahoo Finance"],
+        )
+
+
+def make_candidate(name: str, quality: float, tokens: int = 100, text: str = "") -> Candidate:
+    return Candidate(article=name, quality=quality, tokens=tokens, shingles=set((text or name).split()))
+
+
+class MmrSelectionTests(SimpleTestCase):
+
+    def test_stops_at_the_token_budget(self):
+        candidates = [make_candidate(f"article-{i}", quality=1 - i / 10) for i in range(5)]
+
+        selected = mmr_select(candidates, token_budget=250, diversity=0)
+
+        self.assertEqual([c.article for c in selected], ["article-0", "article-1"])
+
+    def test_skips_articles_over_the_remaining_budget(self):
+        candidates = [
+            make_candidate("long", quality=1.0, tokens=300),
+            make_candidate("short", quality=0.5, tokens=100),
+        ]
+
+        self.assertEqual([c.article for c in mmr_select(candidates, token_budget=200)], ["short"])
+
+    def test_stops_at_the_limit(self):
+        candidates = [make_candidate(f"article-{i}", quality=1 - i / 10) for i in range(5)]
+
+        self.assertEqual(len(mmr_select(candidates, token_budget=10_000, limit=3)), 3)
+
+    def test_novel_article_beats_a_better_near_duplicate(self):
+        candidates = [
+            make_candidate("rates", quality=1.0, text="fed holds rates steady powell says"),
+            make_candidate("rates-copy", quality=0.9, text="fed holds rates steady powell said"),
+            make_candidate("jobs", quality=0.7, text="payrolls beat forecasts unemployment falls"),
+        ]
+
+        selected = mmr_select(candidates, token_budget=10_000, limit=2, diversity=0.5)
+
+        self.assertEqual([c.article for c in selected], ["rates", "jobs"])
+
+    def test_candidates_are_scored_by_rank_relevance_and_recency(self):
+        now = timezone.now()
+        articles = [
+            AgentArticle(
+                id=i, uuid=None, title="Fed", url=None, body="The Fed held rates.", source="AP",
+                source_importance_rank=rank, relevance=relevance, published_at=now - timedelta(hours=hours),
+            )
+            for i, (rank, relevance, hours) in enumerate([(1, 10, 0), (1000, 10, 0), (1, 5, 0), (1, 10, 12)])
+        ]
+
+        best, lower_rank, less_relevant, older = build_candidates(articles, now=now, half_life_hours=6)
+
+        self.assertAlmostEqual(best.quality, 1.0)
+        self.assertLess(lower_rank.quality, best.quality)
+        self.assertAlmostEqual(less_relevant.quality, 0.8)
+        self.assertAlmostEqual(older.quality, 0.7 + 0.3 * 0.25)
+
+
+class SelectArticlesTests(TestCase):
+
+    def test_selection_is_returned_newest_first(self):
+        # The oldest article is the most relevant, so it is picked first
+        articles = make_articles(3, relevance=lambda i: i + 1, body=lambda i: f"Story number {i} of the day.")
+
+        selected = select_articles(timezone.now() - timedelta(days=1), timezone.now())
+
+        self.assertEqual([article.id for article in selected], [article.id for article in articles])
+
+    def test_token_budget_default_is_read_at_run_time(self):
+        articles = make_articles(3, relevance=lambda i: i + 1, body=lambda i: f"Story number {i} of the day.")
+        start, end = timezone.now() - timedelta(days=1), timezone.now()
+        tokens = max(estimate_tokens(article) for article in select_articles(start, end))
+
+        with override_settings(NEWS_SELECTION_TOKEN_BUDGET=tokens):
+            selected = select_articles(start, end)
+
+        # Only the most relevant (oldest) article fits
+        self.assertEqual([article.id for article in selected], [articles[-1].id])
+
+
+class ApiRateBudgetTests(SimpleTestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.budget = ApiRateBudget(2, clock=lambda: self.now)
+
+    def test_spent_budget_is_refused_without_waiting(self):
+        self.assertTrue(self.budget.acquire())
+        self.now = 1800.0
+        self.assertTrue(self.budget.acquire())
+
+        self.assertFalse(self.budget.acquire())
+        self.assertEqual(self.budget.remaining(), 0)
+
+        # The first request leaves the one-hour window
+        self.now = 3600.0
+        self.assertEqual(self.budget.remaining(), 1)
+        self.assertTrue(self.budget.acquire())
+
+    def test_fetch_is_skipped_when_the_budget_is_spent(self):
+        self.budget.acquire()
+        self.budget.acquire()
+
+        with mock.patch("news.services.api_budget", self.budget), mock.patch("news.services.requests.post") as post:
+            articles = retrieve_articles(date_start="2026-10-18", date_end="2026-10-19", page_numbers=3)
+
+        self.assertEqual(articles, [])
+        post.assert_not_called()
+
+
+class PollArticleDeltaTests(TestCase):
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.watermark = FetchWatermark.objects.create(name="burst", published_at=self.now - timedelta(minutes=30))
+
+    def poll(self, pages, budget=10):
+        responses = [
+            mock.Mock(status_code=200, json=mock.Mock(return_value={"articles": {"results": page}}))
+            if isinstance(page, list) else mock.Mock(status_code=page)
+            for page in pages
+        ]
+        with (
+            mock.patch("news.services.api_budget", ApiRateBudget(budget)),
+            mock.patch("news.services.requests.post", side_effect=responses),
+        ):
+            return poll_article_delta(articles_count=2)
+
+    def article(self, uri, minutes):
+        return make_api_article(uri, "Associated Press", minutes=minutes, now=self.now, body=f"Story {uri}.")
+
+    def test_complete_fetch_advances_the_watermark(self):
+        saved, _ = self.poll([
+            [self.article("a", 1), self.article("b", 5)],
+            # Reaches back to the watermark: the article at the watermark itself is kept
+            [self.article("c", 30), self.article("old", 40)],
+        ])
+
+        self.assertEqual(saved, 3)
+        self.watermark.refresh_from_db()
+        self.assertEqual(self.watermark.published_at, self.now - timedelta(minutes=1))
+
+    def test_cut_short_fetch_keeps_the_watermark(self):
+        for pages, budget in [
+            ([[self.article("a", 1), self.article("b", 5)]], 1),  # Budget spent before page 2
+            ([[self.article("a", 1), self.article("b", 5)], 500], 10),  # Page 2 failed
+            ([[self.article(f"{page}{i}", page * 2 + i) for i in range(2)] for page in range(3)], 10),  # Page limit
+        ]:
+            with self.subTest(pages=len(pages), budget=budget):
+                self.poll(pages, budget)
+
+                self.assertTrue(Article.objects.filter(uri__in=["a", "00"]).exists())
+                self.watermark.refresh_from_db()
+                self.assertEqual(self.watermark.published_at, self.now - timedelta(minutes=30))
+
+
+class BurstPollTests(TestCase):
+
+    def test_stops_when_the_budget_is_spent(self):
+        budget = ApiRateBudget(0)
+        out = StringIO()
+
+        with (
+            mock.patch("news.management.commands.burst_poll.api_budget", budget),
+            mock.patch("news.management.commands.burst_poll.poll_article_delta") as poll,
+        ):
+            call_command("burst_poll", force=True, stdout=out)
+
+        poll.assert_not_called()
+        self.assertIn("API budget exhausted", out.getvalue())
+        self.assertEqual(FetchLog.objects.get().message, "Burst polling: 0 polls, 0 new articles")
+
+
+class TrustedSourceTests(TestCase):
+
+    def test_sync_follows_source_titles(self):
+        listed = Source.objects.create(uri="apnews.com", title="Associated Press")
+        delisted = Source.objects.create(uri="example.com", title="Example", is_trusted=True)
+
+        self.assertEqual(sync_trusted_sources(), (1, 1))
+        listed.refresh_from_db()
+        delisted.refresh_from_db()
+        self.assertTrue(listed.is_trusted)
+        self.assertFalse(delisted.is_trusted)
+        self.assertEqual(sync_trusted_sources(), (0, 0))
+
+
+class ArticleProjectionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        make_articles(
+            3,
+            source=Source.objects.create(uri="apnews.com", title="Associated Press", importance_rank=10),
+            body=lambda i: f"Story {i}: the Fed held rates steady.",
+            published_at=lambda i: cls.now - timedelta(hours=i),
+            raw_data={"body": "x" * 10_000},
+        )
+
+    def assertLean(self, queries):
+        for query in queries:
+            self.assertNotIn("raw_data", query["sql"])
+
+    def test_pipeline_reads_skip_raw_data(self):
+        with CaptureQueriesContext(connection) as queries:
+            articles = select_articles(self.now - timedelta(days=1), self.now)
+            formatted = format_articles_for_agent(get_articles_from_db(self.now - timedelta(days=1), self.now))
+        self.assertLean(queries)
+        self.assertEqual(len(queries), 2)
+
+        self.assertTrue(all(isinstance(article, AgentArticle) for article in articles))
+        self.assertEqual({article.source for article in articles}, {"Associated Press"})
+        self.assertEqual(articles[0].syndicated_by, ["Associated Press"])
+        self.assertEqual(len(formatted.articles), 3)
+
+    def test_latest_article_reads_two_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("latest_article"))
+        self.assertLean(queries)
+        self.assertEqual(response.json()["title"], "Fed story 0")
+
+
+class ArticleRawDataTests(TestCase):
+    payload = {"uri": "article-1", "body": "The Fed held rates steady.", "concepts": [{"label": "Fed"}] * 50}
+
+    def test_payload_is_stored_cold_and_rehydrated_lazily(self):
+        article = Article.objects.create(uri="article-1", raw_data=self.payload)
+
+        self.assertIsNone(Article.objects.values_list("raw_data_legacy", flat=True).get())
+        self.assertLess(len(ArticleRawData.objects.get().payload), len(str(self.payload)))
+        article = Article.objects.get(pk=article.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(article.raw_data, self.payload)
+            self.assertEqual(article.raw_data, self.payload)
+
+    def test_update_or_create_replaces_the_payload(self):
+        Article.objects.create(uri="article-1", raw_data={"old": True})
+        Article.objects.update_or_create(uri="article-1", defaults={"title": "Fed", "raw_data": self.payload})
+
+        self.assertEqual(Article.objects.get().raw_data, self.payload)
+        self.assertEqual(ArticleRawData.objects.count(), 1)
+
+    def test_archive_command_moves_inline_payloads(self):
+        for i in range(3):
+            Article.objects.create(uri=f"article-{i}")
+        Article.objects.update(raw_data_legacy=self.payload)
+        self.assertEqual(Article.objects.first().raw_data, self.payload)
+
+        call_command("archive_raw_data", batch_size=2, stdout=StringIO())
+
+        self.assertFalse(Article.objects.filter(raw_data_legacy__isnull=False).exists())
+        self.assertEqual(ArticleRawData.objects.count(), 3)
+        for article in Article.objects.all():
+            self.assertEqual(article.raw_data, self.payload)
+
+
+class ArticleSelectorPlanTests(TestCase):
+    """
+    The agent window selectors must stay index range scans as the article
+    table grows; the plans are checked on a generated table with fresh stats.
+    """
+    # Large enough that a sequential scan loses to the index by orders of magnitude
+    ROWS = 200_000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        trusted = Source.objects.create(uri="apnews.com", title="Associated Press", is_trusted=True)
+        other = Source.objects.create(uri="example.com", title="Example")
+        with connection.cursor() as cursor:
+            # One article a minute, a fifth of them not in English, a tenth from the trusted source
+            cursor.execute(
+                """
+                INSERT INTO news_article (uuid, uri, title, body, lang, source_id, published_at, minhash, lsh_buckets)
+                SELECT gen_random_uuid(), 'article-' || i, 'Story ' || i, 'The Fed held rates steady.',
+                       CASE WHEN i %% 5 = 0 THEN 'deu' ELSE 'eng' END,
+                       CASE WHEN i %% 10 = 1 THEN %s ELSE %s END,
+                       %s - make_interval(mins => i), '{}', '{}'
+                FROM generate_series(1, %s) AS i
+                """,
+                [trusted.pk, other.pk, cls.now, cls.ROWS],
+            )
+            cursor.execute("ANALYZE news_article, news_source")
+
+    def assertUsesWindowIndex(self, queryset):
+        # QuerySet.explain() cannot wrap the filtered window query of collapse_near_duplicates
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}", params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        self.assertIn("article_lang_published_idx", plan)
+        self.assertNotIn("Seq Scan on news_article", plan)
+
+    def test_window_uses_the_lang_published_index(self):
+        start = self.now - timedelta(hours=6)
+        self.assertUsesWindowIndex(get_articles_from_db(start, self.now))
+        self.assertUsesWindowIndex(get_articles_from_db(start, self.now, collapse_duplicates=True))
+
+    def test_trusted_sources_filter_uses_the_flag(self):
+        queryset = get_articles_from_db(self.now - timedelta(hours=6), self.now, filter_sources=True)
+        self.assertUsesWindowIndex(queryset)
+        self.assertNotIn("title", str(queryset.query).split("WHERE")[1])
+        # 360 minutes, one English trusted article in ten
+        self.assertEqual(queryset.count(), 36)
@@ -1,31 +1,78 @@
+import bisect
 import datetime
+import gzip
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 
 from core.constants import FOMC_CALENDAR
 
 
-def is_in_fomc_critical_window(now=None):
+_calendar_index = None
+
+
+def get_fomc_calendar_index():
     """
-    Checks if the given time (defaults to now) is within
-    24h before to 9h after an FOMC meeting.
+    Returns FOMC_CALENDAR as a sorted list of aware datetimes, built once,
+    so meeting lookups are a bisect instead of a scan.
+    """
+    global _calendar_index
+    if _calendar_index is None:
+        _calendar_index = sorted(
+            # Simple timezone awareness
+            timezone.make_aware(meeting_date) if timezone.is_naive(meeting_date) else meeting_date
+            for meeting_date in FOMC_CALENDAR
+        )
+    return _calendar_index
+
+
+def get_nearest_fomc_meeting(now=None):
+    """
+    Returns the FOMC meeting closest to the given time (defaults to now).
     """
     if now is None:
         now = timezone.now()
 
-    for meeting_date in FOMC_CALENDAR:
-        # Simple timezone awareness
-        if timezone.is_naive(meeting_date):
-            aware_meeting = timezone.make_aware(meeting_date)
-        else:
-            aware_meeting = meeting_date
+    index = get_fomc_calendar_index()
+    i = bisect.bisect_left(index, now)
+    candidates = index[max(i - 1, 0):i + 1]
+    return min(candidates, key=lambda meeting: abs(meeting - now))
 
-        window_start = aware_meeting - datetime.timedelta(hours=24)
-        window_end = aware_meeting + datetime.timedelta(hours=9)
 
-        if window_start <= now <= window_end:
-            return True
+def is_near_fomc_decision(now=None, before=datetime.timedelta(minutes=5), after=datetime.timedelta(hours=1)):
+    """
+    Checks if the given time (defaults to now) is within `before` ahead of
+    to `after` past an FOMC decision.
+    """
+    if now is None:
+        now = timezone.now()
 
-    return False
+    meeting = get_nearest_fomc_meeting(now)
+    return meeting - before <= now <= meeting + after
+
+
+def is_in_fomc_critical_window(now=None):
+    """
+    Checks if the given time (defaults to now) is within
+    24h before to 9h after an FOMC meeting.
+    """
+    return is_near_fomc_decision(now, before=datetime.timedelta(hours=24), after=datetime.timedelta(hours=9))
+
+
+def is_in_burst_window(now=None):
+    """
+    Checks if the given time (defaults to now) is within the burst polling
+    span around an FOMC decision (FOMC_BURST_MINUTES_BEFORE/AFTER).
+    """
+    return is_near_fomc_decision(
+        now,
+        before=datetime.timedelta(minutes=settings.FOMC_BURST_MINUTES_BEFORE),
+        after=datetime.timedelta(minutes=settings.FOMC_BURST_MINUTES_AFTER),
+    )
 
 
 def is_in_mock_critical_window(now=None):
@@ -37,3 +84,22 @@ def is_in_mock_critical_window(now=None):
         now = timezone.now()
 
     return now.minute % 5 == 0
+
+
+def append_to_archive(archive_dir, name: str, records) -> None:
+    """
+    Appends records to monthly gzip JSONL archives, `<name>-YYYY-MM.jsonl.gz`
+    in archive_dir. Each append adds a gzip member, which readers see as one stream.
+
+    Args:
+        records: Iterable of (datetime the record is filed under, JSON-serialisable dict)
+    """
+    by_month = defaultdict(list)
+    for filed_at, record in records:
+        by_month[filed_at.strftime("%Y-%m")].append(record)
+
+    Path(archive_dir).mkdir(parents=True, exist_ok=True)
+    for month, month_records in by_month.items():
+        with gzip.open(Path(archive_dir) / f"{name}-{month}.jsonl.gz", "at", encoding="utf-8") as archive:
+            for record in month_records:
+                archive.write(json.dumps(record, cls=DjangoJSONEncoder) + "\n")
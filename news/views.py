@@ -1,6 +1,6 @@
 from django.shortcuts import render
 from django.http import JsonResponse
-from .models import Article
+from .selectors import get_latest_article
 
 def home(request):
     """Render the main home page."""
@@ -8,7 +8,7 @@ def home(request):
 
 def latest_article(request):
     """Return the latest article as JSON."""
-    article = Article.objects.order_by("-published_at").first()
+    article = get_latest_article()
     if article:
         data = {
             "title": article.title,
@@ -7,6 +7,8 @@ from django.core.management import call_command
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 django.setup()
 
+from news.utils import is_in_burst_window
+
 
 def run_scheduler():
     print("--- 🔬 MOCK Scheduler Started ---")
@@ -15,8 +17,12 @@ def run_scheduler():
     while True:
         call_command("test_scheduler")
 
-        # Sleep for 1 minute for testing
-        time.sleep(60)
+        if is_in_burst_window():
+            # Around a decision: poll the delta every few seconds instead of idling
+            call_command("burst_poll", duration=60)
+        else:
+            # Sleep for 1 minute for testing
+            time.sleep(60)
 
 
 if __name__ == "__main__":